@@ -0,0 +1,57 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Builds a chain of 50,000 Select tools through the fluent API, once with every edit returning a copy and once
+# inside Workflow.batch(), and prints the time each takes.
+#
+# Run from the repository root with: python benchmarks/build_workflow.py
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pyx.workflow import Workflow
+from pyx.selecttool import SelectTool
+
+TOOL_COUNT = 50000
+
+
+def build(workflow: Workflow) -> Workflow:
+    for tool_id in range(1, TOOL_COUNT + 1):
+        workflow = workflow.add_tool(SelectTool(tool_id))
+        if tool_id > 1:
+            workflow = workflow.add_connection(tool_id - 1, 'Output', tool_id, 'Input')
+            workflow.tools[tool_id - 1] = workflow.tools[tool_id - 1].add_output(tool_id, 'Output', 'Input')
+            workflow.tools[tool_id] = workflow.tools[tool_id].add_input(tool_id - 1, 'Output', 'Input')
+    return workflow
+
+
+def main() -> None:
+    start = time.perf_counter()
+    build(Workflow())
+    print(f"Fluent copies: {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    workflow = Workflow()
+    with workflow.batch() as wf:
+        build(wf)
+    print(f"In place batch: {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
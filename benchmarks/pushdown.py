@@ -0,0 +1,75 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Reads the file written by read_csv.py three ways and prints the time each takes: every field then filtered the
+# way a Filter tool would, only the two fields a Select tool downstream keeps, and those two fields with the
+# filter checked by the reader, as the local engine does for the plan PlanOptimizer works out.
+#
+# Run from the repository root with: python benchmarks/pushdown.py [size in MB] [workers]
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pyx.csv_reader import CsvReader
+from pyx.plan_optimizer import ColumnSet
+from pyx.simple_filter import SimpleFilter
+from read_csv import BATCH_SIZE, DEFAULT_SIZE_MB, write_file
+
+CONDITION = {'Field': 'City', 'Operator': '=', 'Operands': {'Operand': 'Golden'}}
+FIELDS = ColumnSet(False, frozenset({'city', 'sales'}))
+
+
+def measure(name: str, read) -> None:
+    start = time.perf_counter()
+    records = read()
+    print(f"{name}: {records:,} records in {time.perf_counter() - start:.2f} s")
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE_MB
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    fd, filename = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        write_file(filename, size << 20)
+        condition = SimpleFilter(CONDITION)
+
+        def read(**kwargs) -> CsvReader:
+            return CsvReader(filename, code_page=65001, batch_size=BATCH_SIZE, workers=workers, **kwargs)
+
+        def filter_after_reading() -> int:
+            return sum(len(batch.filter(condition.mask(batch))) for batch in read().batches())
+
+        def prune() -> int:
+            return sum(len(batch.filter(condition.mask(batch))) for batch in read(fields=FIELDS.__contains__).batches())
+
+        def prune_and_filter() -> int:
+            reader = read(fields=FIELDS.__contains__, predicates=[condition.mask])
+            return sum(len(batch) for batch in reader.batches())
+
+        measure('all fields, filtered afterwards', filter_after_reading)
+        measure('two fields, filtered afterwards', prune)
+        measure('two fields, filtered while reading', prune_and_filter)
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# Writes a CSV file of customer-like records, then reads it back with the csv module, both row by row and gathered
+# into column batches the way CsvReader returns them, and with CsvReader, and prints the throughput of each in
+# MB/s. About one record in ten has a quoted field so both parsing paths are exercised.
+#
+# Run from the repository root with: python benchmarks/read_csv.py [size in MB] [workers]
+
+import csv
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pyx.csv_reader import CsvReader
+
+DEFAULT_SIZE_MB = 1024
+BATCH_SIZE = 65536
+CITIES = ['Denver', 'Boulder', 'Aurora', 'Lakewood', 'Golden', 'Fort Collins', 'Pueblo']
+
+
+def write_file(filename: str, size: int) -> None:
+    rng = random.Random(0)
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['CustomerID', 'Name', 'Address', 'City', 'State', 'Zip', 'Sales', 'JoinDate'])
+        record = 0
+        while f.tell() < size:
+            rows = list()
+            for _ in range(10000):
+                record += 1
+                address = f"{rng.randint(1, 9999)} Main St"
+                if rng.random() < 0.1:
+                    address += ', Suite ' + str(rng.randint(1, 500))
+                rows.append([record, f"Customer {record}", address, rng.choice(CITIES), 'CO',
+                             rng.randint(80000, 81999), f"{rng.random() * 10000:.2f}",
+                             f"20{rng.randint(10, 20)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}"])
+            writer.writerows(rows)
+
+
+def measure(name: str, size: int, read) -> None:
+    start = time.perf_counter()
+    records = read()
+    seconds = time.perf_counter() - start
+    print(f"{name}: {records:,} records in {seconds:.2f} s, {size / (1 << 20) / seconds:.1f} MB/s")
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE_MB
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    fd, filename = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        write_file(filename, size << 20)
+        size = os.path.getsize(filename)
+
+        def read_csv_module() -> int:
+            with open(filename, newline='', encoding='utf-8') as f:
+                return sum(1 for _ in csv.reader(f)) - 1
+
+        def read_csv_module_columns() -> int:
+            records = 0
+            with open(filename, newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader)
+                while True:
+                    rows = list(itertools.islice(reader, BATCH_SIZE))
+                    if not rows:
+                        return records
+                    columns = [list(column) for column in zip(*rows)]
+                    records += len(columns[0])
+
+        def read_csv_reader() -> int:
+            reader = CsvReader(filename, code_page=65001, batch_size=BATCH_SIZE, workers=workers)
+            return sum(len(batch) for batch in reader.batches())
+
+        measure('csv module, rows', size, read_csv_module)
+        measure('csv module, column batches', size, read_csv_module_columns)
+        measure('CsvReader', size, read_csv_reader)
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    main()
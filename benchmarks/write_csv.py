@@ -0,0 +1,97 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# Builds batches of customer-like records and writes them to a CSV file with the csv module, the way the engine
+# used to, and with CsvWriter, to one file and split over several, and prints the throughput of each in MB/s.
+#
+# Run from the repository root with: python benchmarks/write_csv.py [records] [workers]
+
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from pyx.csv_writer import CsvWriter
+from pyx.field_schema import Field, FieldSchema, FieldType
+from pyx.outputtool import OutputToolConfiguration
+from pyx.record_batch import RecordBatch, to_objects
+
+DEFAULT_RECORDS = 2000000
+BATCH_SIZE = 65536
+
+
+def make_batches(records: int):
+    rng = np.random.default_rng(0)
+    schema = FieldSchema([Field('CustomerID', FieldType.INT64), Field('Name', FieldType.V_STRING, 40),
+                          Field('Address', FieldType.V_STRING, 60), Field('Sales', FieldType.DOUBLE),
+                          Field('JoinDate', FieldType.DATE)])
+    cities = np.array(['Main St', 'Elm St, Suite 4', 'Oak Ave', 'Pine Rd'], dtype=object)
+    batches = list()
+    for start in range(0, records, BATCH_SIZE):
+        count = min(BATCH_SIZE, records - start)
+        ids = np.arange(start, start + count)
+        names = np.empty(count, dtype=object)
+        names[:] = [f"Customer {i}" for i in ids.tolist()]
+        batches.append(RecordBatch(schema, [ids, names, cities[rng.integers(0, len(cities), count)],
+                                            np.round(rng.random(count) * 10000, 2),
+                                            np.datetime64('2010-01-01') + rng.integers(0, 3650, count)]))
+    return batches
+
+
+def measure(name: str, directory: str, write) -> None:
+    start = time.perf_counter()
+    write()
+    seconds = time.perf_counter() - start
+    size = sum(entry.stat().st_size for entry in os.scandir(directory))
+    print(f"{name}: {size / (1 << 20):.0f} MB in {seconds:.2f} s, {size / (1 << 20) / seconds:.1f} MB/s")
+    for entry in os.scandir(directory):
+        os.remove(entry.path)
+
+
+def main() -> None:
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RECORDS
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    batches = make_batches(records)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'output.csv')
+
+        def write_csv_module() -> None:
+            with open(filename, 'w', encoding='latin-1', newline='') as f:
+                writer = csv.writer(f, lineterminator='\r\n')
+                writer.writerow(batches[0].schema.names())
+                for batch in batches:
+                    writer.writerows(zip(*[to_objects(c, as_text=True).tolist() for c in batch.columns]))
+
+        def write_csv_writer(multi_file: bool) -> None:
+            configuration = OutputToolConfiguration(output_file_name=filename, multi_file=multi_file,
+                                                    max_records=records // 8 if multi_file else -1)
+            with CsvWriter(configuration, workers=workers) as writer:
+                for batch in batches:
+                    writer.write(batch)
+
+        measure('csv module', directory, write_csv_module)
+        measure('CsvWriter, one file', directory, lambda: write_csv_writer(False))
+        measure('CsvWriter, eight files', directory, lambda: write_csv_writer(True))
+
+
+if __name__ == '__main__':
+    main()
@@ -19,6 +19,7 @@ from collections import OrderedDict
 from typing import List, Dict, Tuple, Any
 
 from .decorators import newobj
+from .property_values import as_list, is_true
 
 
 class AutofieldTool(Tool):
@@ -36,15 +37,16 @@ class AutofieldTool(Tool):
     def set_field(self, field: str, selected: bool) -> '__class__':
         """Sets the specified field to selected or not in the tool configuration.
         """
-        target: List[Any] = [f for f in self._fields if '@field' in f and f['@field'] == field]
+        fields: List[Dict[str, Any]] = self._fields
+        target: List[Any] = [f for f in fields if '@field' in f and f['@field'] == field]
 
         if target:
             for field in target:
                 field['@selected'] = str(selected)
         else:
-            self._fields.append(OrderedDict([('@field', field), ('@selected', str(selected))]))
+            fields.append(OrderedDict([('@field', field), ('@selected', str(selected))]))
+        self.properties['Configuration']['Fields']['Field'] = fields
 
-    @newobj
     def get_field_selection(self, field: str) -> bool:
         """Returns the selection status of the specified field.
 
@@ -53,7 +55,7 @@ class AutofieldTool(Tool):
         target: List[Any] = [f for f in self._fields if '@field' in f and f['@field'] == field]
 
         if target:
-            return '@selected' in target[0] and bool(target[0]['@selected'])
+            return '@selected' in target[0] and is_true(target[0]['@selected'])
         else:
             return False
 
@@ -68,13 +70,13 @@ class AutofieldTool(Tool):
         """Returns a list of all fields configured in the tool.
         """
         all: List[Tuple[str, bool]] = \
-            [(f['@field'], bool(f['@selected'])) for f in self._fields if '@field' in f and '@selected' in f]
+            [(f['@field'], is_true(f['@selected'])) for f in self._fields if '@field' in f and '@selected' in f]
 
         return all
 
     @property
-    def _fields(self) -> Dict[str, Any]:
+    def _fields(self) -> List[Dict[str, Any]]:
         if self.properties:
-            return self.properties['Configuration']['Fields']['Field']
+            return as_list(self.properties['Configuration']['Fields'].get('Field'))
         else:
             raise NameError('Properties does not contain Configuration > Fields > Field')
\ No newline at end of file
@@ -16,7 +16,10 @@
 
 from .tool import Tool
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+from .xml_writer import XmlWriter
 
 
 @dataclass
@@ -28,6 +31,20 @@ class Connection:
     origin_output: str = ''
     destination_tool_id: int = 0
     destination_input: str = ''
+    source: Optional[bytes] = field(default=None, compare=False, repr=False)
+    _source_values: Optional[Tuple[int, str, int, str]] = field(default=None, init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.source is not None:
+            self._source_values = self._values()
+
+    def _values(self) -> Tuple[int, str, int, str]:
+        return self.origin_tool_id, self.origin_output, self.destination_tool_id, self.destination_input
+
+    def is_modified(self) -> bool:
+        """Returns True if the connection was created in code or has changed since it was read from a file.
+        """
+        return self.source is None or self._values() != self._source_values
 
     def toxml(self) -> ET.Element:
         """Returns an XML representation of the connection.
@@ -45,4 +62,20 @@ class Connection:
         destination.set('ToolID', str(self.destination_tool_id))
         destination.set('Connection', self.destination_input)
 
-        return root
\ No newline at end of file
+        return root
+
+    def write_xml(self, writer: XmlWriter, depth: int = 0, preserve_source: bool = True) -> None:
+        """Writes the connection as an indented Connection element.
+
+        If preserve_source is True and the connection has not been modified since it was read, the XML it was
+        read from is copied verbatim instead.
+        """
+        if preserve_source and not self.is_modified():
+            writer.source(self.source, depth)
+            return
+
+        writer.start('Connection', {}, depth)
+        writer.empty('Origin', {'ToolID': str(self.origin_tool_id), 'Connection': self.origin_output}, depth + 1)
+        writer.empty('Destination', {'ToolID': str(self.destination_tool_id),
+                                     'Connection': self.destination_input}, depth + 1)
+        writer.end('Connection', depth)
\ No newline at end of file
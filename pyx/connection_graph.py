@@ -0,0 +1,140 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Dict, List, Iterable, Iterator, Union
+
+from .connection import Connection
+
+
+class ConnectionGraph:
+    """
+    The connections of a workflow, indexed by origin and destination tool ID.
+
+    Behaves like the list of connections it replaces: it can be iterated in insertion order, indexed, appended
+    to and removed from. In addition, the connections of a tool can be looked up and removed in time proportional
+    to the number of connections of that tool rather than the number in the workflow.
+
+    Connections are indexed by the tool IDs they had when they were added. To change the tools a connection
+    links, remove it and add it again. version changes whenever connections are added or removed.
+
+    Unlike a list, the graph holds each Connection object at most once. Equal connections can still be added as
+    separate objects, as add_connection does.
+    """
+
+    def __init__(self, connections: Iterable[Connection] = ()):
+        self._version: int = 0
+        self._connections: Dict[int, Connection] = dict({})
+        self._by_origin: Dict[int, Dict[int, Connection]] = dict({})
+        self._by_destination: Dict[int, Dict[int, Connection]] = dict({})
+        self.extend(connections)
+
+    def __iter__(self) -> Iterator[Connection]:
+        return iter(self._connections.values())
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def __contains__(self, connection: Connection) -> bool:
+        return id(connection) in self._connections or bool(self._matching(connection))
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Connection, List[Connection]]:
+        return list(self._connections.values())[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ConnectionGraph, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def append(self, connection: Connection) -> None:
+        """Adds a connection. Raises ValueError if this Connection object is already in the graph.
+        """
+        key: int = id(connection)
+        if key in self._connections:
+            raise ValueError(f"{connection!r} has already been added")
+        self._version += 1
+        self._connections[key] = connection
+        self._by_origin.setdefault(connection.origin_tool_id, dict({}))[key] = connection
+        self._by_destination.setdefault(connection.destination_tool_id, dict({}))[key] = connection
+
+    def extend(self, connections: Iterable[Connection]) -> None:
+        for connection in connections:
+            self.append(connection)
+
+    def remove(self, connection: Connection) -> None:
+        """Removes a connection, or the first connection equal to it. Raises ValueError if there is none.
+        """
+        if id(connection) not in self._connections:
+            matching: List[Connection] = self._matching(connection)
+            if not matching:
+                raise ValueError(f"{connection!r} is not in the workflow")
+            connection = matching[0]
+        self._discard(connection)
+
+    def remove_matching(self, origin_tool_id: int, origin_output: str,
+                        destination_tool_id: int, destination_input: str) -> List[Connection]:
+        """Removes every connection linking the given output and input, returning the connections removed.
+        """
+        removed: List[Connection] = self._matching(Connection(origin_tool_id, origin_output,
+                                                              destination_tool_id, destination_input))
+        for connection in removed:
+            self._discard(connection)
+        return removed
+
+    def remove_tool(self, tool_id: int) -> List[Connection]:
+        """Removes every connection to or from a tool, returning the connections removed.
+        """
+        removed: List[Connection] = list(self._by_origin.get(tool_id, {}).values())
+        removed.extend(c for c in self._by_destination.get(tool_id, {}).values() if c.origin_tool_id != tool_id)
+        for connection in removed:
+            self._discard(connection)
+        return removed
+
+    def clear(self) -> None:
+        self._version += 1
+        self._connections.clear()
+        self._by_origin.clear()
+        self._by_destination.clear()
+
+    def outgoing(self, tool_id: int) -> List[Connection]:
+        """Returns the connections from the outputs of a tool.
+        """
+        return list(self._by_origin.get(tool_id, {}).values())
+
+    def incoming(self, tool_id: int) -> List[Connection]:
+        """Returns the connections to the inputs of a tool.
+        """
+        return list(self._by_destination.get(tool_id, {}).values())
+
+    def _matching(self, connection: Connection) -> List[Connection]:
+        return [c for c in self._by_origin.get(connection.origin_tool_id, {}).values() if c == connection]
+
+    def _discard(self, connection: Connection) -> None:
+        key: int = id(connection)
+        self._version += 1
+        del self._connections[key]
+        for index, tool_id in ((self._by_origin, connection.origin_tool_id),
+                               (self._by_destination, connection.destination_tool_id)):
+            connections: Dict[int, Connection] = index[tool_id]
+            del connections[key]
+            if not connections:
+                del index[tool_id]
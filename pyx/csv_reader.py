@@ -0,0 +1,408 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import codecs
+import concurrent.futures
+import csv
+import io
+import itertools
+import mmap
+import os
+from collections import deque
+from typing import Deque, List, Any, Callable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .field_schema import Field, FieldSchema, FieldType
+from .inputtool import InputTool
+from .record_batch import RecordBatch, cast
+
+
+class CsvReader:
+    """
+    Reads a delimited text file into record batches, using the settings of an Input tool.
+
+    The file is memory mapped and split into chunks of about chunk_size bytes that end on a record boundary.
+    A boundary is a line break outside quotes, found by counting quote characters between line breaks, which
+    works because an escaped quote inside a quoted field is written as two. The chunks are parsed by a pool of
+    worker processes, a bounded number at a time, and come back in file order as columns: text by default, or
+    already converted to the types of schema if one is given. Records are split with str.split, apart from those
+    containing quotes, which are parsed with the csv module. Once record_limit records have been read no more
+    chunks are parsed.
+
+    Given fields, a function of a field name, only the fields for which it returns True are turned into columns.
+    Given predicates, functions that return a boolean mask for a batch, the workers only pass on the records for
+    which all of them are True, and record_limit counts the records that pass.
+
+    Files in encodings that are not a superset of ASCII, such as UTF-16, cannot be split on bytes and are read
+    in a single pass instead.
+    """
+    DEFAULT_CHUNK_SIZE: int = 16 * 1024 * 1024
+
+    def __init__(self, filename: str, delimiter: str = ',', code_page: int = 28591, header_row: bool = True,
+                 record_limit: int = -1, field_length: int = 254, ignore_quotes: str = 'DoubleQuotes',
+                 import_line: int = 1, schema: Optional[FieldSchema] = None, batch_size: int = 65536,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None,
+                 fields: Optional[Callable[[str], bool]] = None,
+                 predicates: Optional[List[Callable[[RecordBatch], np.ndarray]]] = None):
+        self._filename: str = filename
+        self._delimiter: str = parse_delimiter(delimiter)
+        self._encoding: str = encoding_for_code_page(code_page)
+        self._header_row: bool = header_row
+        self._record_limit: int = record_limit
+        self._field_length: int = field_length
+        self._quote: Optional[str] = {'DoubleQuotes': '"', 'SingleQuotes': "'"}.get(ignore_quotes)
+        self._import_line: int = max(import_line, 1)
+        self._types: Optional[FieldSchema] = schema
+        self._batch_size: int = batch_size
+        self._chunk_size: int = chunk_size
+        self._workers: int = workers or os.cpu_count() or 1
+        self._select: Optional[Callable[[str], bool]] = fields
+        self._predicates: List[Callable[[RecordBatch], np.ndarray]] = list(predicates or ())
+        self._schema: Optional[FieldSchema] = None
+        self._width: int = 0
+        self._keep: List[int] = list()
+
+    @staticmethod
+    def from_tool(tool: InputTool, filename: Optional[str] = None, **kwargs: Any) -> 'CsvReader':
+        """Creates a reader configured like an Input tool, optionally reading a different file.
+        """
+        return CsvReader(filename or tool.input_file_name, delimiter=tool.delimiter, code_page=tool.code_page,
+                         header_row=tool.header_row, record_limit=tool.record_limit,
+                         field_length=tool.field_length, ignore_quotes=tool.ignore_quotes,
+                         import_line=tool.import_line, **kwargs)
+
+    @property
+    def schema(self) -> Optional[FieldSchema]:
+        """The fields read from the file, available once reading has started.
+        """
+        return self._schema
+
+    def batches(self) -> Iterator[RecordBatch]:
+        """Yields the records of the file in batches of up to batch_size records. At least one batch, possibly
+        empty, is yielded if the file has a header.
+        """
+        if not _splittable(self._encoding):
+            yield from self._sequential()
+            return
+
+        with open(self._filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                start: int = 3 if data[:3] == codecs.BOM_UTF8 and self._encoding.startswith('utf') else 0
+                for _ in range(self._import_line - 1):
+                    start = _line_end(data, start)
+                header_end: int = self._record_end(data, start, start)
+                if header_end == start:
+                    return
+                names: List[str] = next(csv.reader(io.StringIO(data[start:header_end].decode(self._encoding)),
+                                                   **self._dialect()), [])
+                if self._header_row:
+                    start = header_end
+                else:
+                    names = [f"Field_{i + 1}" for i in range(len(names))]
+                self._schema = self._fields(names)
+                yield from self._read_chunks(data, start)
+
+    def _read_chunks(self, data: mmap.mmap, start: int) -> Iterator[RecordBatch]:
+        remaining: int = self._record_limit
+        size: int = len(data)
+        yielded: bool = False
+        arguments: Tuple[Any, ...] = (self._filename, self._encoding, self._delimiter, self._quote, self._schema,
+                                      self._width, self._keep, self._types, self._field_length, self._predicates)
+        with _executor(self._workers) as executor:
+            pending: Deque[concurrent.futures.Future] = deque()
+            position: int = start
+            while position < size or pending:
+                while position < size and len(pending) < self._workers * 2:
+                    end: int = self._record_end(data, min(position + self._chunk_size, size), position)
+                    pending.append(executor.submit(_parse_chunk, position, end, *arguments))
+                    position = end
+                batch: RecordBatch = pending.popleft().result()
+                if remaining >= 0:
+                    batch = batch.slice(0, remaining)
+                    remaining -= len(batch)
+                for offset in range(0, len(batch), self._batch_size):
+                    yield batch.slice(offset, offset + self._batch_size)
+                    yielded = True
+                if remaining == 0:
+                    for future in pending:
+                        future.cancel()
+                    break
+        if not yielded:
+            yield RecordBatch.empty(self._schema)
+
+    def _record_end(self, data: mmap.mmap, position: int, start: int) -> int:
+        """Returns the offset just past the first line break at or after position that is outside quotes,
+        counting quotes from start, which must be the beginning of a record.
+        """
+        size: int = len(data)
+        if position >= size:
+            return size
+        if self._quote is None:
+            return _line_end(data, position)
+        quote: bytes = self._quote.encode('ascii')
+        quotes: int = data[start:position].count(quote)
+        while position < size:
+            end: int = _line_end(data, position)
+            quotes += data[position:end].count(quote)
+            if quotes % 2 == 0:
+                return end
+            position = end
+        return size
+
+    def _fields(self, names: List[str]) -> FieldSchema:
+        """Returns the fields read from a file with the given header, noting which of its fields they are.
+        """
+        names = _unique_names(names)
+        self._width = len(names)
+        self._keep = [i for i, n in enumerate(names) if self._select is None or self._select(n)]
+        names = [names[i] for i in self._keep]
+        if self._types is None:
+            return FieldSchema(Field(n, FieldType.V_STRING, self._field_length) for n in names)
+        return FieldSchema(self._types.get(n) or Field(n, FieldType.V_STRING, self._field_length) for n in names)
+
+    def _dialect(self) -> dict:
+        return _dialect(self._delimiter, self._quote)
+
+    def _sequential(self) -> Iterator[RecordBatch]:
+        with open(self._filename, 'r', encoding=self._encoding, newline='') as f:
+            reader = csv.reader(f, **self._dialect())
+            for _ in range(self._import_line - 1):
+                next(reader, None)
+            first: Optional[List[str]] = next(reader, None)
+            if first is None:
+                return
+            names: List[str] = first if self._header_row else [f"Field_{i + 1}" for i in range(len(first))]
+            self._schema = self._fields(names)
+            rows: List[List[str]] = [] if self._header_row else [first]
+            remaining: int = self._record_limit
+            yielded: bool = False
+            for row in reader:
+                if remaining == 0:
+                    break
+                rows.append(row)
+                if len(rows) == self._batch_size:
+                    batch: RecordBatch = self._rows_batch(rows)
+                    rows = list()
+                    if remaining >= 0:
+                        batch = batch.slice(0, remaining)
+                        remaining -= len(batch)
+                    if len(batch):
+                        yield batch
+                        yielded = True
+            batch = self._rows_batch(rows if remaining else [])
+            if remaining >= 0:
+                batch = batch.slice(0, remaining)
+            if len(batch) or not yielded:
+                yield batch
+
+    def _rows_batch(self, rows: List[List[str]]) -> RecordBatch:
+        return _matching(_rows_batch(rows, self._schema, self._width, self._keep, self._types, self._field_length),
+                         self._predicates)
+
+
+def _parse_chunk(start: int, end: int, filename: str, encoding: str, delimiter: str, quote: Optional[str],
+                 schema: FieldSchema, width: int, keep: List[int], types: Optional[FieldSchema], field_length: int,
+                 predicates: List[Callable[[RecordBatch], np.ndarray]]) -> RecordBatch:
+    """Parses the records between two offsets of a file, keeping the fields at positions keep and the records
+    that pass predicates. Runs in a worker process.
+    """
+    return _matching(_parse_text(start, end, filename, encoding, delimiter, quote, schema, width, keep, types,
+                                 field_length), predicates)
+
+
+def _parse_text(start: int, end: int, filename: str, encoding: str, delimiter: str, quote: Optional[str],
+                schema: FieldSchema, width: int, keep: List[int], types: Optional[FieldSchema],
+                field_length: int) -> RecordBatch:
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        text: str = f.read(end - start).decode(encoding)
+    if '\r' in text:
+        text = text.replace('\r\n', '\n')
+    if text.endswith('\n'):
+        text = text[:-1]
+    if not text:
+        return _rows_batch([], schema, width, keep, types, field_length)
+
+    lines: List[str] = text.split('\n')
+    split: Optional[Tuple[List[str], List[Tuple[int, List[str]]]]] = (lines, list())
+    if '' in lines:
+        split = None
+    elif quote is not None and quote in text:
+        split = _quoted_records(lines, delimiter, quote, width)
+    if split is not None:
+        records, quoted = split
+        # Every record must have width fields, or the fields of a long one would shift into the next
+        if set(map(str.count, records, itertools.repeat(delimiter))) == {width - 1}:
+            values: List[str] = delimiter.join(records).split(delimiter) if delimiter != '\n' else records
+            longest: int = max(map(len, records))
+            for index, row in quoted:
+                values[index * width:(index + 1) * width] = row
+                longest = max(longest, max(map(len, row)))
+            columns: List[Any] = [values[i::width] for i in keep]
+            return _columns_batch(columns, len(records), schema, types, field_length if longest > field_length else 0)
+
+    rows: List[List[str]] = [row for row in csv.reader(io.StringIO(text), **_dialect(delimiter, quote)) if row]
+    return _rows_batch(rows, schema, width, keep, types, field_length)
+
+
+def _quoted_records(lines: List[str], delimiter: str, quote: str,
+                    width: int) -> Optional[Tuple[List[str], List[Tuple[int, List[str]]]]]:
+    """Parses the records of lines that contain quotes with the csv module and stands an empty record of the same
+    width in for each, so the plain records around them can still be split with str.split. Returns the records
+    and the parsed (index, fields) pairs, or None if a quoted record does not have width fields.
+    """
+    spans: List[Tuple[int, int]] = list()
+    position: int = 0
+    for i in [i for i, line in enumerate(lines) if quote in line]:
+        if i < position:
+            continue
+        end: int = i + 1
+        quotes: int = lines[i].count(quote)
+        while quotes % 2 and end < len(lines):
+            quotes += lines[end].count(quote)
+            end += 1
+        spans.append((i, end))
+        position = end
+
+    rows: List[List[str]] = list(csv.reader(['\n'.join(lines[i:end]) for i, end in spans],
+                                            **_dialect(delimiter, quote)))
+    if len(rows) != len(spans) or any(len(row) != width for row in rows):
+        return None
+
+    records: List[str] = list()
+    quoted: List[Tuple[int, List[str]]] = list()
+    placeholder: str = delimiter * (width - 1)
+    position = 0
+    for (i, end), row in zip(spans, rows):
+        records.extend(lines[position:i])
+        quoted.append((len(records), row))
+        records.append(placeholder)
+        position = end
+    records.extend(lines[position:])
+    return records, quoted
+
+
+def _rows_batch(rows: List[List[str]], schema: FieldSchema, width: int, keep: List[int],
+                types: Optional[FieldSchema], field_length: int) -> RecordBatch:
+    if all(len(row) == width for row in rows):
+        columns: List[Any] = [list(c) for c in zip(*rows)] if rows else [[] for _ in range(width)]
+        if len(keep) < width:
+            columns = [columns[i] for i in keep]
+    else:
+        columns = [[row[i] if i < len(row) else None for row in rows] for i in keep]
+    return _columns_batch(columns, len(rows), schema, types, field_length)
+
+
+def _matching(batch: RecordBatch, predicates: List[Callable[[RecordBatch], np.ndarray]]) -> RecordBatch:
+    """Returns the records of a batch that pass every predicate, copied into columns of their own.
+    """
+    if not predicates or not len(batch):
+        return batch
+    mask: np.ndarray = predicates[0](batch)
+    for predicate in predicates[1:]:
+        mask = mask & predicate(batch)
+    if mask.all():
+        return batch
+    return RecordBatch(batch.schema, [column[mask] for column in batch.columns])
+
+
+def _columns_batch(columns: List[List[Any]], count: int, schema: FieldSchema, types: Optional[FieldSchema],
+                   field_length: int) -> RecordBatch:
+    arrays: List[np.ndarray] = list()
+    for f, values in zip(schema, columns):
+        if field_length and f.type == FieldType.V_STRING and count and max(map(len, filter(None, values)),
+                                                                           default=0) > field_length:
+            values = [v if v is None else v[:field_length] for v in values]
+        array: np.ndarray = np.empty(count, dtype=object)
+        array[:] = values
+        arrays.append(array if types is None else cast(array, f.type))
+    return RecordBatch(schema, arrays)
+
+
+def _line_end(data: mmap.mmap, position: int) -> int:
+    end: int = data.find(b'\n', position)
+    return len(data) if end < 0 else end + 1
+
+
+def _splittable(encoding: str) -> bool:
+    """Whether text in an encoding can be split at newline bytes, which holds when ASCII is encoded as itself.
+    """
+    try:
+        return '\n",\''.encode(encoding) == b'\n",\''
+    except (LookupError, UnicodeEncodeError):
+        return False
+
+
+def _dialect(delimiter: str, quote: Optional[str]) -> dict:
+    if quote is None:
+        return dict(delimiter=delimiter, quoting=csv.QUOTE_NONE)
+    return dict(delimiter=delimiter, quotechar=quote, quoting=csv.QUOTE_MINIMAL)
+
+
+def _executor(workers: int):
+    if workers <= 1:
+        return _InlineExecutor()
+    return concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+
+
+class _InlineExecutor:
+    """
+    Runs submitted calls straight away, for reading without worker processes.
+    """
+
+    def __enter__(self) -> '_InlineExecutor':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    @staticmethod
+    def submit(function: Any, *args: Any) -> concurrent.futures.Future:
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        future.set_result(function(*args))
+        return future
+
+
+def encoding_for_code_page(code_page: Any) -> str:
+    """Returns the Python codec for a Windows code page number as used in Input and Output tools.
+    """
+    known = {'28591': 'latin-1', '65001': 'utf-8', '1200': 'utf-16-le', '1201': 'utf-16-be', '20127': 'ascii'}
+    code_page = str(code_page).strip()
+    return known.get(code_page, f"cp{code_page}")
+
+
+def parse_delimiter(value: str) -> str:
+    """Returns the delimiter character for the Delimeter setting of an Input or Output tool, which writes a tab
+    as \\t.
+    """
+    return {'\\t': '\t', 'tab': '\t', '\\0': '\0'}.get(value.lower(), value[:1] or ',')
+
+
+def _unique_names(names: List[str]) -> List[str]:
+    seen = set()
+    result: List[str] = list()
+    for name in names:
+        unique: str = name or 'Field'
+        suffix: int = 2
+        while unique.lower() in seen:
+            unique = f"{name or 'Field'}{suffix}"
+            suffix += 1
+        seen.add(unique.lower())
+        result.append(unique)
+    return result
@@ -0,0 +1,224 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import concurrent.futures
+import os
+import re
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Any, BinaryIO, Optional
+
+import numpy as np
+
+from .csv_reader import encoding_for_code_page, parse_delimiter
+from .field_schema import FieldSchema
+from .outputtool import OutputToolConfiguration
+from .record_batch import RecordBatch, to_objects
+
+
+class CsvWriter:
+    """
+    Writes record batches to delimited text files, using the settings of an Output tool.
+
+    Each batch is encoded as a whole: its columns are converted to text, quoted only if a column contains a
+    character that needs it, and joined into rows in a single pass. The encoded bytes are collected until
+    buffer_size bytes are pending and then written with one call. Encoding runs on a pool of worker threads;
+    the bytes of each file are still written in the order the batches were passed in.
+
+    max_records is applied by slicing batches, so it costs nothing per record. With multi_file set it is
+    the number of records per file instead: the records are split over output.csv, output1.csv, output2.csv and
+    so on, and files are written in parallel as batches for them come in.
+    """
+    DEFAULT_BUFFER_SIZE: int = 8 * 1024 * 1024
+
+    def __init__(self, configuration: OutputToolConfiguration, filename: Optional[str] = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE, workers: Optional[int] = None):
+        self._configuration: OutputToolConfiguration = configuration
+        self._filename: str = filename or configuration.output_file_name
+        self._buffer_size: int = buffer_size
+        self._workers: int = workers or os.cpu_count() or 1
+        self._encoding: str = encoding_for_code_page(configuration.code_page)
+        self._delimiter: str = parse_delimiter(configuration.delimiter)
+        self._special: re.Pattern = re.compile('[' + re.escape(self._delimiter + '"\r\n') + ']')
+        self._line_end: str = {'CRLF': '\r\n', 'LF': '\n', 'CR': '\r'}.get(configuration.line_end_style, '\r\n')
+        self._partitioned: bool = configuration.multi_file and configuration.max_records > 0
+        self._remaining: int = -1 if self._partitioned else configuration.max_records
+        self._files: List[_OutputFile] = list()
+        self._records: int = 0
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pending: Deque[concurrent.futures.Future] = deque()
+        if self._workers > 1:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self._workers)
+
+    @property
+    def configuration(self) -> OutputToolConfiguration:
+        return self._configuration
+
+    @property
+    def filenames(self) -> List[str]:
+        """The files written so far.
+        """
+        return [f.filename for f in self._files]
+
+    @property
+    def records(self) -> int:
+        """How many records have been passed on to be written.
+        """
+        return self._records
+
+    def __enter__(self) -> 'CsvWriter':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def write(self, batch: RecordBatch) -> None:
+        """Queues a batch to be written. Records past max_records are dropped.
+        """
+        if self._remaining >= 0:
+            batch = batch.slice(0, self._remaining)
+            self._remaining -= len(batch)
+        if not self._files:
+            self._files.append(self._open(batch.schema, self._filename))
+
+        size: int = self._configuration.max_records
+        offset: int = 0
+        while True:
+            file: _OutputFile = self._files[-1]
+            count: int = min(len(batch) - offset, size - file.records) if self._partitioned else len(batch) - offset
+            if count > 0 or offset == 0:
+                self._submit(file, batch.slice(offset, offset + count) if count < len(batch) else batch)
+                file.records += count
+                offset += count
+            if offset >= len(batch):
+                break
+            root, extension = os.path.splitext(self._filename)
+            self._files.append(self._open(batch.schema, f"{root}{len(self._files)}{extension}"))
+        self._records += len(batch)
+
+    def close(self) -> None:
+        """Waits for every queued batch to be written and closes the files.
+        """
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+            for file in self._files:
+                file.close()
+
+    def _open(self, schema: FieldSchema, filename: str) -> '_OutputFile':
+        header: bytes = b''
+        if self._configuration.write_bom and self._encoding.startswith('utf'):
+            header = '\ufeff'.encode(self._encoding)
+        if self._configuration.header_row:
+            header += self._encode([np.array([n], dtype=object) for n in schema.names()])
+        return _OutputFile(filename, header, self._buffer_size)
+
+    def _submit(self, file: '_OutputFile', batch: RecordBatch) -> None:
+        sequence: int = file.sequence
+        file.sequence += 1
+        if self._executor is None:
+            file.append(sequence, self._encode_batch(batch))
+            return
+        while len(self._pending) >= self._workers * 2:
+            self._pending.popleft().result()
+        self._pending.append(self._executor.submit(self._encode_into, file, sequence, batch))
+
+    def _encode_into(self, file: '_OutputFile', sequence: int, batch: RecordBatch) -> None:
+        file.append(sequence, self._encode_batch(batch))
+
+    def _encode_batch(self, batch: RecordBatch) -> bytes:
+        if not len(batch):
+            return b''
+        return self._encode([batch.column_at(i) for i in range(len(batch.schema))])
+
+    def _encode(self, columns: List[np.ndarray]) -> bytes:
+        """Encodes columns of equal length as delimited rows, each ending in a line break.
+        """
+        text: List[List[str]] = [self._text(c, len(columns) == 1) for c in columns]
+        if len(text) == 1:
+            rows: str = self._line_end.join(text[0])
+        else:
+            rows = self._line_end.join(map(self._delimiter.join, zip(*text)))
+        return (rows + self._line_end).encode(self._encoding)
+
+    def _text(self, column: np.ndarray, only: bool) -> List[str]:
+        """Returns the values of a column as text, quoted the way the csv module would quote them.
+        """
+        values: List[Any] = to_objects(column, as_text=True).tolist()
+        if None in values:
+            values = ['' if v is None else v for v in values]
+        if self._configuration.force_quotes:
+            return [_quote(v) for v in values]
+        if self._special.search('\0'.join(values)):
+            search = self._special.search
+            values = [_quote(v) if search(v) else v for v in values]
+        if only and '' in values:
+            # A record of one empty field is quoted so that it is not read back as a blank line
+            values = [v or '""' for v in values]
+        return values
+
+
+class _OutputFile:
+    """
+    One file being written, holding encoded batches until they can be written in order.
+    """
+
+    def __init__(self, filename: str, header: bytes, buffer_size: int):
+        self.filename: str = filename
+        self.records: int = 0
+        self.sequence: int = 0
+        self._buffer_size: int = buffer_size
+        self._next: int = 0
+        self._waiting: Dict[int, bytes] = dict({})
+        self._parts: List[bytes] = [header]
+        self._size: int = len(header)
+        self._lock: threading.Lock = threading.Lock()
+        self._file: BinaryIO = open(filename, 'wb')
+
+    def append(self, sequence: int, data: bytes) -> None:
+        """Adds the encoded batch with the given sequence number, writing out every batch that is now in order.
+        """
+        with self._lock:
+            self._waiting[sequence] = data
+            while self._next in self._waiting:
+                data = self._waiting.pop(self._next)
+                self._next += 1
+                self._parts.append(data)
+                self._size += len(data)
+            if self._size >= self._buffer_size:
+                self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+                self._file.close()
+                self._file = None
+
+    def _flush(self) -> None:
+        if self._parts:
+            self._file.write(b''.join(self._parts))
+            self._parts.clear()
+            self._size = 0
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
@@ -14,14 +14,33 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import threading
+from contextlib import contextmanager
 from functools import wraps
+from typing import Iterator
+
+_state = threading.local()
+
+
+@contextmanager
+def in_place() -> Iterator[None]:
+    """Makes methods decorated with newobj modify and return the object they are called on, in this thread.
+    """
+    _state.depth = getattr(_state, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _state.depth -= 1
 
 
 def newobj(method):
     @wraps(method)
     def inner(self, *args, **kwargs):
+        if getattr(_state, 'depth', 0):
+            method(self, *args, **kwargs)
+            return self
         obj = self.__class__.__new__(self.__class__)
         obj.__dict__ = self.__dict__.copy()
         method(obj, *args, **kwargs)
         return obj
-    return inner
\ No newline at end of file
+    return inner
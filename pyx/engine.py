@@ -0,0 +1,720 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Any, BinaryIO, Callable, Iterator, Optional, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from .autofieldtool import AutofieldTool
+from .csv_reader import CsvReader
+from .csv_writer import CsvWriter
+from .expression import parse, referenced_functions
+from .expression_compiler import CompiledExpression, compile_expression
+from .external_sort import ExternalSorter, read_block, write_block
+from .field_schema import Field, FieldSchema
+from .filtertool import FilterMode, FilterTool
+from .inputtool import InputTool
+from . import __version__
+from .outputtool import OutputTool
+from .plan_optimizer import ExecutionPlan, InputPlan, PlanOptimizer
+from .record_batch import RecordBatch, STRING_TYPES, cast
+from .result_cache import CachedResult, ResultCache, ResultWriter
+from .scheduler import DataflowScheduler, Inbox
+from .schema_propagation import select_fields
+from .selecttool import SelectTool
+from .simple_filter import SimpleFilter
+from .sorttool import SortTool
+from .type_inference import TypeInference
+from .tool import Tool
+
+if TYPE_CHECKING:
+    from .workflow import Workflow
+
+
+class EngineError(Exception):
+    """Raised when a workflow cannot be run by the local engine.
+    """
+    pass
+
+
+class UnsupportedToolError(EngineError):
+    """Raised when a workflow contains a tool, or a tool configuration, the local engine cannot run.
+    """
+    pass
+
+
+@dataclass
+class ExecutionResult:
+    """
+    What happened when a workflow was run by the local engine.
+
+    records holds the number of records each tool sent from each of its outputs, by tool ID and output name.
+    When the engine has a result cache, executed holds the IDs of the tools that were run rather than reused.
+    """
+    records: Dict[int, Dict[str, int]] = field(default_factory=dict)
+    seconds: float = 0.0
+    executed: List[int] = field(default_factory=list)
+
+
+class Operator:
+    """
+    Runs one tool of a workflow inside the local engine.
+
+    Batches are pushed into an operator through process() and it pushes its own results on to the operators
+    connected to its outputs through emit(), so a batch travels as far down the workflow as it can before the
+    next one is read. Once every connection into an input has finished, finish() is called; operators that hold
+    records back, such as Sort, send them then. After finish() the operator tells everything connected to its
+    outputs that it has finished in turn.
+
+    When the engine runs tools concurrently, each operator is attached to an inbox instead. Batches sent to it
+    then wait there until the scheduler has a thread process them.
+
+    An operator given a recorder also stores everything it sends in it, and commits it once it has finished.
+    """
+
+    def __init__(self, tool: Tool, engine: 'Engine'):
+        self._tool: Tool = tool
+        self._engine: Engine = engine
+        self._targets: Dict[str, List[Tuple['Operator', str]]] = dict({})
+        self._pending: Dict[str, int] = dict({})
+        self._records: Dict[str, int] = dict({})
+        self._inbox: Optional[Inbox] = None
+        self._recorder: Optional[ResultWriter] = None
+
+    @property
+    def tool(self) -> Tool:
+        return self._tool
+
+    @property
+    def recorder(self) -> Optional[ResultWriter]:
+        return self._recorder
+
+    @recorder.setter
+    def recorder(self, value: Optional[ResultWriter]) -> None:
+        self._recorder = value
+
+    @property
+    def records(self) -> Dict[str, int]:
+        """The number of records sent from each output so far.
+        """
+        return self._records
+
+    @property
+    def files(self) -> List[str]:
+        """The files the operator has written.
+        """
+        return list()
+
+    @property
+    def has_inputs(self) -> bool:
+        return bool(self._pending)
+
+    def connect(self, output: str, target: 'Operator', input: str) -> None:
+        self._targets.setdefault(output, list()).append((target, input))
+        target._pending[input] = target._pending.get(input, 0) + 1
+
+    def process(self, batch: RecordBatch, input: str) -> None:
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        pass
+
+    def emit(self, batch: RecordBatch, output: str = 'Output') -> None:
+        self._records[output] = self._records.get(output, 0) + len(batch)
+        if self._recorder is not None:
+            self._recorder.add(output, batch)
+        for target, input in self._targets.get(output, ()):
+            target.receive(batch, input)
+
+    def receive(self, batch: RecordBatch, input: str) -> None:
+        """Called by an operator upstream to send a batch to input. The same batch may be sent to several
+        operators, so it must not be modified.
+        """
+        if self._inbox is None:
+            self.process(batch, input)
+        else:
+            self._inbox.put((batch, input))
+
+    def end(self, input: str) -> None:
+        """Called by an operator upstream when it has sent everything it is going to send to input.
+        """
+        if self._inbox is None:
+            self._input_finished(input)
+        else:
+            self._inbox.put((None, input))
+
+    def close(self) -> None:
+        self.finish()
+        if self._recorder is not None:
+            self._recorder.commit(self._records, self.files)
+            self._recorder = None
+        for targets in self._targets.values():
+            for target, input in targets:
+                target.end(input)
+
+    def attach(self, inbox: Inbox) -> None:
+        """Makes batches sent to the operator wait in inbox until the scheduler hands them to handle().
+        """
+        self._inbox = inbox
+
+    def handle(self, message: Tuple[Optional[RecordBatch], str]) -> None:
+        """Processes a batch, or the end of an input if the batch is None, taken from the inbox.
+        """
+        batch, input = message
+        if batch is None:
+            self._input_finished(input)
+        else:
+            self.process(batch, input)
+
+    def _input_finished(self, input: str) -> None:
+        self._pending[input] -= 1
+        if not any(self._pending.values()):
+            self.close()
+
+
+class SourceOperator(Operator):
+    """
+    An operator that produces records rather than receiving them.
+    """
+
+    def batches(self) -> Iterator[RecordBatch]:
+        raise NotImplementedError
+
+    def run(self) -> None:
+        for batch in self.batches():
+            self.emit(batch)
+        self.close()
+
+
+class CachedOperator(SourceOperator):
+    """
+    Sends on the records a tool sent in an earlier run, from a result cache, instead of running the tool.
+    """
+
+    def __init__(self, tool: Tool, engine: 'Engine', result: CachedResult):
+        super().__init__(tool, engine)
+        self._result: CachedResult = result
+
+    def run(self) -> None:
+        for output, batch in self._result.batches():
+            self.emit(batch, output)
+        self.close()
+
+
+class CsvInputOperator(SourceOperator):
+    """
+    Reads a delimited text file configured in an Input tool, passing it on in batches of V_String fields.
+
+    Only the fields and records the engine's plan calls for are read; see PlanOptimizer.
+    """
+
+    def batches(self) -> Iterator[RecordBatch]:
+        tool: InputTool = self._tool
+        if tool.file_format != 0:
+            raise UnsupportedToolError(f"Tool {tool.tool_id}: only delimited text files can be read")
+        plan: InputPlan = self._engine.execution_plan.input(tool.tool_id)
+        filters: List[Tuple[int, SimpleFilter]] = list()
+        for filter_id, name in plan.filters:
+            try:
+                filters.append((filter_id, SimpleFilter(self._engine.workflow.tools[filter_id], self._engine.today,
+                                                        name)))
+            except ValueError as e:
+                raise UnsupportedToolError(f"Tool {filter_id}: {e}") from None
+        reader: CsvReader = CsvReader.from_tool(tool, self._engine.resolve_path(tool.input_file_name),
+                                                batch_size=self._engine.batch_size, workers=self._engine.workers,
+                                                fields=plan.columns.__contains__,
+                                                predicates=[f.mask for _, f in filters])
+        try:
+            yield from reader.batches()
+        except KeyError as e:
+            # Only the filters look fields up by name while reading
+            filter_id: int = next((i for i, f in filters if f.field.lower() == str(e.args[0]).lower()),
+                                  tool.tool_id)
+            raise EngineError(f"Tool {filter_id}: unknown field [{e.args[0]}]") from None
+
+
+class SelectOperator(Operator):
+    """
+    Selects, renames, reorders and changes the types of fields as configured in a Select tool.
+    """
+
+    def __init__(self, tool: Tool, engine: 'Engine'):
+        super().__init__(tool, engine)
+        self._plan: Optional[Tuple[FieldSchema, List[Tuple[int, Field]]]] = None
+        self._input: Optional[FieldSchema] = None
+
+    def process(self, batch: RecordBatch, input: str) -> None:
+        if self._plan is None or batch.schema != self._input:
+            pairs: List[Tuple[Field, Field]] = select_fields(self._tool.properties['Configuration'], batch.schema)
+            self._input = batch.schema
+            self._plan = (FieldSchema(output for _, output in pairs),
+                          [(batch.index(source.name), output) for source, output in pairs])
+
+        schema, plan = self._plan
+        columns: List[np.ndarray] = list()
+        for i, output in plan:
+            column: np.ndarray = batch.column_at(i)
+            source: Field = batch.schema[i]
+            if output.type != source.type:
+                column = cast(column, output.type)
+            if output.type in STRING_TYPES and (output.type != source.type or output.size < source.size):
+                column = _truncate(column, output)
+            columns.append(column)
+        self.emit(RecordBatch(schema, columns))
+
+
+class AutofieldOperator(Operator):
+    """
+    Changes string fields to the smallest type that holds all of their values, as an Autofield tool does.
+
+    The types depend on every record, so incoming batches are written to a temporary file while TypeInference
+    examines them and read back and converted once the input has finished. Memory use stays bounded by the
+    batch size. Only the string fields selected in the tool are examined.
+    """
+
+    def __init__(self, tool: Tool, engine: 'Engine'):
+        super().__init__(tool, engine)
+        self._spill: Optional[BinaryIO] = None
+        self._schema: Optional[FieldSchema] = None
+        self._inference: Optional[TypeInference] = None
+
+    def process(self, batch: RecordBatch, input: str) -> None:
+        if self._spill is None:
+            self._schema = batch.schema
+            self._spill = tempfile.TemporaryFile(dir=self._engine.temp_dir)
+            selection: Callable[[str], bool] = self._selection()
+            self._inference = TypeInference(batch.schema, [i for i, f in enumerate(batch.schema)
+                                                           if f.type in STRING_TYPES and selection(f.name)],
+                                            workers=self._engine.workers)
+        self._inference.add(batch)
+        write_block(self._spill, batch)
+
+    def finish(self) -> None:
+        if self._spill is None:
+            return
+        schema: FieldSchema = self._inference.schema()
+        changed: List[int] = [i for i in self._inference.fields if schema[i] != self._schema[i]]
+
+        self._spill.seek(0)
+        with self._spill:
+            while True:
+                batch: Optional[RecordBatch] = read_block(self._spill, self._schema)
+                if batch is None:
+                    break
+                columns: List[np.ndarray] = list(batch.columns)
+                for i in changed:
+                    columns[i] = cast(columns[i], schema[i].type)
+                self.emit(RecordBatch(schema, columns))
+        self._spill = None
+
+    def _selection(self) -> Callable[[str], bool]:
+        tool: AutofieldTool = self._tool
+        by_name: Dict[str, bool] = {name.lower(): selected for name, selected in tool.get_all_fields()}
+        default: bool = by_name.get('*unknown', True)
+        return lambda name: by_name.get(name.lower(), default)
+
+
+class FilterToolOperator(Operator):
+    """
+    Splits records between the True and False outputs of a Filter tool.
+
+    Custom expressions are compiled to array operations once per expression text and simple mode conditions
+    are evaluated by SimpleFilter. Both outputs are selections of the incoming batch by position, so records are
+    only copied when a tool downstream reads their fields. When the engine's plan has the condition checked while
+    the records are read, every record that arrives passes.
+    """
+
+    def __init__(self, tool: Tool, engine: 'Engine'):
+        super().__init__(tool, engine)
+        self._pushed: bool = tool.tool_id in engine.execution_plan.pushed
+        self._expression: Optional[CompiledExpression] = None
+        self._simple: Optional[SimpleFilter] = None
+        try:
+            if tool.filter_mode == FilterMode.CUSTOM:
+                self._expression = compile_expression(tool.expression)
+            else:
+                self._simple = SimpleFilter(tool, engine.today)
+        except ValueError as e:
+            raise UnsupportedToolError(f"Tool {tool.tool_id}: {e}") from None
+
+    def process(self, batch: RecordBatch, input: str) -> None:
+        if self._pushed:
+            self.emit(batch, 'True')
+            return
+        passed, failed = self.split(batch)
+        self.emit(batch.take(passed), 'True')
+        self.emit(batch.take(failed), 'False')
+
+    def split(self, batch: RecordBatch) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the positions of the records meeting the condition and of those that do not.
+        """
+        try:
+            if self._simple is not None:
+                return self._simple.split(batch)
+            mask: np.ndarray = self._expression.predicate(batch)
+        except KeyError as e:
+            raise EngineError(f"Tool {self._tool.tool_id}: unknown field [{e.args[0]}]") from None
+        return np.flatnonzero(mask), np.flatnonzero(~mask)
+
+
+class SortOperator(Operator):
+    """
+    Sorts records on the fields configured in a Sort tool.
+
+    Records are handed to an ExternalSorter, which spills sorted runs to disk once the engine's sort memory
+    budget is used up, and the merged result is passed on as a stream once the input has finished.
+    """
+
+    def __init__(self, tool: Tool, engine: 'Engine'):
+        super().__init__(tool, engine)
+        self._sorter: ExternalSorter = ExternalSorter(tool.sort_keys, engine.sort_memory_budget, engine.batch_size,
+                                                      tool.dictionary_order, engine.temp_dir)
+
+    def process(self, batch: RecordBatch, input: str) -> None:
+        self._sorter.add(batch)
+
+    def finish(self) -> None:
+        for batch in self._sorter.sorted():
+            self.emit(batch)
+
+
+class CsvOutputOperator(Operator):
+    """
+    Writes records to the delimited text file configured in an Output tool.
+    """
+
+    def __init__(self, tool: Tool, engine: 'Engine'):
+        super().__init__(tool, engine)
+        self._writer: Optional[CsvWriter] = None
+        self._files: List[str] = list()
+
+    @property
+    def files(self) -> List[str]:
+        return self._files
+
+    def process(self, batch: RecordBatch, input: str) -> None:
+        if self._writer is None:
+            self._writer = self._open()
+        self._writer.write(batch)
+
+    def finish(self) -> None:
+        if self._writer is None:
+            # Nothing was received, so write just the header rather than leave the file of an earlier run.
+            self._writer = self._open()
+            self._writer.write(RecordBatch.empty(self._input_schema()))
+        self._writer.close()
+        self._files = self._writer.filenames
+        self._writer = None
+
+    def _open(self) -> CsvWriter:
+        tool: OutputTool = self._tool
+        if tool.file_format != 0:
+            raise UnsupportedToolError(f"Tool {tool.tool_id}: only delimited text files can be written")
+        return CsvWriter(tool.configuration, self._engine.resolve_path(tool.output_file_name),
+                         workers=self._engine.workers)
+
+    def _input_schema(self) -> FieldSchema:
+        workflow: 'Workflow' = self._engine.workflow
+        for connection in workflow.connections_to(self._tool.tool_id):
+            schema: Optional[FieldSchema] = workflow.connection_schema(connection)
+            if schema is not None:
+                return schema
+        return FieldSchema()
+
+
+class Engine:
+    """
+    Runs workflows made of Input, Select, Autofield, Filter, Sort and Output tools locally, without Alteryx.
+
+    Each tool gets an Operator, wired up along the connections of the workflow. The inputs are then read in
+    topological order, each in batches of up to batch_size records that are pushed through every tool
+    downstream before the next batch is read. With threads above one the workflow is run as a dataflow graph
+    instead, on a pool of that many threads: tools pass batches on through bounded queues and a tool is given
+    a thread whenever batches are waiting for it, so independent branches run concurrently and a slow tool
+    holds back the tools feeding it. A batch sent to several tools is shared between them, not copied. Sort and
+    Autofield need all of their input before they can pass anything on: Autofield keeps it in a temporary file
+    and Sort spills it to disk once it outgrows its budget.
+
+    File names in Input and Output tools that are not absolute are taken relative to the folder of the workflow
+    file. Pass resolve_path to map them some other way, for example to run a workflow written on Windows.
+
+    Given a ResultCache, the engine stores what every tool sends and only runs the tools whose results are not
+    in the cache on the next run. Each result is kept under a key hashed from the tool's plugin and properties,
+    the keys of the tools connected to its inputs and, for Input tools, the modification time and size of the
+    file read, so changing a tool re-runs it and everything downstream of it. Cached results are replayed into
+    tools that run, and an Output tool is only skipped if the files it wrote are unchanged. Filters on periods
+    relative to today, or calling DateTimeToday or DateTimeNow, are also keyed on today's date.
+
+    Unless optimize is False, the workflow is run to the ExecutionPlan PlanOptimizer works out for it: Input tools
+    only parse the fields used downstream and leave out the records simple Filters would drop straight away.
+    Record counts then reflect the plan, so an Input tool counts only the records it read. explain() describes
+    the plan.
+    """
+    operators: Dict[type, type] = {
+        InputTool: CsvInputOperator,
+        SelectTool: SelectOperator,
+        AutofieldTool: AutofieldOperator,
+        FilterTool: FilterToolOperator,
+        SortTool: SortOperator,
+        OutputTool: CsvOutputOperator,
+    }
+
+    def __init__(self, workflow: 'Workflow', batch_size: int = 65536,
+                 resolve_path: Optional[Callable[[str], str]] = None, temp_dir: Optional[str] = None,
+                 sort_memory_budget: int = ExternalSorter.DEFAULT_MEMORY_BUDGET, workers: Optional[int] = None,
+                 threads: int = 1, queue_size: int = 4, cache: Optional[ResultCache] = None,
+                 optimize: bool = True):
+        self._workflow: Workflow = workflow
+        self._cache: Optional[ResultCache] = cache
+        self._optimize: bool = optimize
+        self._plan: Optional[ExecutionPlan] = None
+        self._workers: int = workers or os.cpu_count() or 1
+        self._threads: int = threads
+        self._queue_size: int = queue_size
+        self._batch_size: int = batch_size
+        self._sort_memory_budget: int = sort_memory_budget
+        self._resolve_path: Optional[Callable[[str], str]] = resolve_path
+        self._temp_dir: Optional[str] = temp_dir
+        self._today: date = date.today()
+
+    @property
+    def workflow(self) -> 'Workflow':
+        return self._workflow
+
+    @property
+    def today(self) -> date:
+        """The date relative dates in tool configurations are resolved against, fixed when a run starts.
+        """
+        return self._today
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def workers(self) -> int:
+        """How many processes may be used to parse input files.
+        """
+        return self._workers
+
+    @property
+    def threads(self) -> int:
+        """How many threads run tools. With more than one, tools share a pool of that many threads and exchange
+        batches through queues of up to queue_size batches.
+        """
+        return self._threads
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue_size
+
+    @property
+    def sort_memory_budget(self) -> int:
+        """About how many bytes of records each Sort tool holds in memory before spilling them to disk.
+        """
+        return self._sort_memory_budget
+
+    @property
+    def temp_dir(self) -> Optional[str]:
+        return self._temp_dir
+
+    @property
+    def cache(self) -> Optional[ResultCache]:
+        return self._cache
+
+    @property
+    def optimize(self) -> bool:
+        return self._optimize
+
+    @property
+    def execution_plan(self) -> ExecutionPlan:
+        """The plan of the current or last run, or of the workflow as it is now if it has not been run.
+        """
+        if self._plan is None:
+            self._plan = self.plan()
+        return self._plan
+
+    def plan(self) -> ExecutionPlan:
+        """Works out the plan the workflow would be run to now.
+        """
+        if not self._optimize:
+            return ExecutionPlan()
+        return PlanOptimizer(self._workflow).optimize()
+
+    def explain(self) -> str:
+        """Describes the plan the workflow would be run to now, one tool per line.
+        """
+        return self.plan().explain(self._workflow)
+
+    def resolve_path(self, path: str) -> str:
+        if self._resolve_path is not None:
+            return self._resolve_path(path)
+        if os.path.isabs(path) or not self._workflow.filename:
+            return path
+        return os.path.join(os.path.dirname(os.path.abspath(self._workflow.filename)), path)
+
+    def operator(self, tool: Tool) -> Operator:
+        """Creates the operator that runs a tool. Raises UnsupportedToolError if there is none.
+        """
+        operator_class: Optional[type] = self.operators.get(type(tool))
+        if operator_class is None:
+            raise UnsupportedToolError(f"Tool {tool.tool_id} ({tool.plugin}) cannot be run by the local engine")
+        return operator_class(tool, self)
+
+    def run(self) -> ExecutionResult:
+        started: float = time.perf_counter()
+        self._today = date.today()
+        self._plan = self.plan()
+        order: List[int] = self._workflow.topological_order()
+        keys: Dict[int, str] = self.keys(self._plan) if self._cache is not None else dict({})
+        cached: Dict[int, CachedResult] = self._cached(keys)
+        replayed: Set[int] = {c.origin_tool_id for c in self._workflow.connections
+                         if c.origin_tool_id in cached and c.destination_tool_id not in cached}
+        operators: Dict[int, Operator] = dict({})
+        for tool_id in order:
+            tool: Tool = self._workflow.tools[tool_id]
+            if tool_id in replayed:
+                operators[tool_id] = CachedOperator(tool, self, cached[tool_id])
+            elif tool_id not in cached:
+                operators[tool_id] = self.operator(tool)
+                if self._cache is not None:
+                    operators[tool_id].recorder = self._cache.writer(keys[tool_id])
+        for c in self._workflow.connections:
+            if c.destination_tool_id not in cached:
+                operators[c.origin_tool_id].connect(c.origin_output, operators[c.destination_tool_id],
+                                                    c.destination_input)
+
+        try:
+            if self._threads > 1:
+                self._run_concurrently([operators[tool_id] for tool_id in order if tool_id in operators])
+            else:
+                for tool_id in order:
+                    operator: Optional[Operator] = operators.get(tool_id)
+                    if isinstance(operator, SourceOperator):
+                        operator.run()
+                    elif operator is not None and not operator.has_inputs:
+                        operator.close()
+        finally:
+            for operator in operators.values():
+                if operator.recorder is not None:
+                    operator.recorder.abort()
+
+        records: Dict[int, Dict[str, int]] = {tool_id: dict(cached[tool_id].records) if tool_id in cached else
+                                              dict(operators[tool_id].records) for tool_id in order}
+        return ExecutionResult(records, time.perf_counter() - started,
+                               [tool_id for tool_id in order if tool_id not in cached])
+
+    def keys(self, plan: Optional[ExecutionPlan] = None) -> Dict[int, str]:
+        """Returns the key the result of each tool is cached under when run to plan, by default the plan for the
+        workflow as it is now, by tool ID.
+        """
+        plan = plan or self.plan()
+        keys: Dict[int, str] = dict({})
+        for tool_id in self._workflow.topological_order():
+            tool: Tool = self._workflow.tools[tool_id]
+            inputs: List[Tuple[str, str, str]] = sorted((c.destination_input, keys[c.origin_tool_id], c.origin_output)
+                                                        for c in self._workflow.connections_to(tool_id))
+            state: List[Any] = [__version__, tool.plugin, tool.properties, inputs]
+            if isinstance(tool, InputTool):
+                path: str = self.resolve_path(tool.input_file_name)
+                try:
+                    stat: os.stat_result = os.stat(path)
+                    state.append((path, stat.st_mtime_ns, stat.st_size))
+                except OSError:
+                    state.append((path, None, None))
+                reading: InputPlan = plan.input(tool_id)
+                filters: List[Any] = [(i, name, self._workflow.tools[i].properties) for i, name in reading.filters]
+                today: bool = any(_uses_today(self._workflow.tools[i]) for i, _ in reading.filters)
+                state.append((reading.columns.everything, sorted(reading.columns.names), filters,
+                              self._today.isoformat() if today else None))
+            elif isinstance(tool, OutputTool):
+                state.append(self.resolve_path(tool.output_file_name))
+            elif isinstance(tool, FilterTool) and _uses_today(tool):
+                state.append(self._today.isoformat())
+            text: str = json.dumps(state, sort_keys=True, default=str)
+            keys[tool_id] = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        return keys
+
+    def invalidate(self, tool_id: int) -> None:
+        """Removes the cached results of a tool and of every tool downstream of it, so that they run again.
+        """
+        if self._cache is None:
+            return
+        keys: Dict[int, str] = self.keys()
+        for i in {tool_id} | self._workflow.downstream(tool_id):
+            self._cache.remove(keys[i])
+
+    def _cached(self, keys: Dict[int, str]) -> Dict[int, CachedResult]:
+        """Returns the results that can be reused, by tool ID.
+        """
+        cached: Dict[int, CachedResult] = dict({})
+        if self._cache is None:
+            return cached
+        for tool_id, key in keys.items():
+            result: Optional[CachedResult] = self._cache.get(key)
+            if result is not None and all(_unchanged(path, stat) for path, stat in result.files.items()):
+                cached[tool_id] = result
+        return cached
+
+    def _run_concurrently(self, operators: List[Operator]) -> None:
+        scheduler: DataflowScheduler = DataflowScheduler(self._threads, self._queue_size)
+        tasks: List[Callable[[], None]] = list()
+        for operator in operators:
+            if isinstance(operator, SourceOperator):
+                tasks.append(operator.run)
+            elif operator.has_inputs:
+                operator.attach(scheduler.inbox(operator.handle))
+            else:
+                tasks.append(operator.close)
+        scheduler.run(tasks)
+
+
+def _uses_today(tool: FilterTool) -> bool:
+    """Returns True if the records a Filter tool passes depend on the day it runs: a simple condition on a period
+    relative to today, or an expression calling DateTimeToday or DateTimeNow.
+    """
+    try:
+        if tool.filter_mode == FilterMode.CUSTOM:
+            return not referenced_functions(parse(tool.expression)).isdisjoint(('datetimetoday', 'datetimenow'))
+        return SimpleFilter.uses_today(tool)
+    except (KeyError, ValueError):
+        return False
+
+
+def _truncate(column: np.ndarray, output: Field) -> np.ndarray:
+    if output.type not in STRING_TYPES or not output.size or column.dtype.kind != 'O':
+        return column
+    size: int = output.size
+    if all(v is None or len(v) <= size for v in column.tolist()):
+        return column
+    result: np.ndarray = np.empty(len(column), dtype=object)
+    result[:] = [v if v is None else v[:size] for v in column.tolist()]
+    return result
+
+
+def _unchanged(path: str, stat: Tuple[int, int]) -> bool:
+    try:
+        current: os.stat_result = os.stat(path)
+    except OSError:
+        return False
+    return (current.st_mtime_ns, current.st_size) == tuple(stat)
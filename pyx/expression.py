@@ -0,0 +1,640 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import math
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Callable, Iterator, Mapping, Optional, Set, Tuple
+
+# Token patterns, tried in order. Field references may contain anything but a closing bracket.
+_TOKENS = re.compile(r'''
+    (?P<space>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<field>\[[^\]]*\])
+  | (?P<string>"(?:[^"\\]|\\.|"")*"|'(?:[^'\\]|\\.|'')*')
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<operator><=|>=|<>|!=|==|&&|\|\||[-+*/%=<>!(),])
+''', re.VERBOSE | re.DOTALL)
+
+_KEYWORDS = frozenset(('and', 'or', 'not', 'in', 'if', 'then', 'elseif', 'else', 'endif', 'true', 'false'))
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression cannot be parsed or uses a function that is not supported.
+    """
+    pass
+
+
+@dataclass(frozen=True)
+class Literal:
+    value: Any
+
+
+@dataclass(frozen=True)
+class FieldRef:
+    name: str
+
+
+@dataclass(frozen=True)
+class Unary:
+    op: str
+    operand: Any
+
+
+@dataclass(frozen=True)
+class Binary:
+    op: str
+    left: Any
+    right: Any
+
+
+@dataclass(frozen=True)
+class InList:
+    operand: Any
+    values: Tuple[Any, ...]
+    negated: bool = False
+
+
+@dataclass(frozen=True)
+class Call:
+    name: str
+    args: Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Conditional:
+    """IF c1 THEN v1 ELSEIF c2 THEN v2 ... ELSE otherwise ENDIF, and IIF(c1, v1, otherwise).
+    """
+    branches: Tuple[Tuple[Any, Any], ...]
+    otherwise: Any
+
+
+class _Parser:
+    """
+    Recursive descent parser for the Alteryx expression language.
+
+    Precedence from lowest to highest: OR, AND, NOT, comparisons and IN, + and -, * / and %, unary minus.
+    Keywords and function names are case insensitive.
+    """
+
+    def __init__(self, text: str):
+        self._text: str = text
+        self._tokens: List[Tuple[str, str]] = self._tokenize(text)
+        self._position: int = 0
+
+    def parse(self) -> Any:
+        node: Any = self._or()
+        if self._peek()[0] != 'end':
+            self._fail(f"Unexpected '{self._peek()[1]}'")
+        return node
+
+    def _tokenize(self, text: str) -> List[Tuple[str, str]]:
+        tokens: List[Tuple[str, str]] = list()
+        position: int = 0
+        while position < len(text):
+            match = _TOKENS.match(text, position)
+            if match is None:
+                raise ExpressionError(f"Unexpected character '{text[position]}' at {position} in: {text}")
+            kind: str = match.lastgroup
+            if kind != 'space':
+                value: str = match.group()
+                if kind == 'name' and value.lower() in _KEYWORDS:
+                    kind, value = 'keyword', value.lower()
+                elif kind == 'operator' and value in ('&&', '||', '!'):
+                    kind, value = 'keyword', {'&&': 'and', '||': 'or', '!': 'not'}[value]
+                tokens.append((kind, value))
+            position = match.end()
+        tokens.append(('end', ''))
+        return tokens
+
+    def _peek(self) -> Tuple[str, str]:
+        return self._tokens[self._position]
+
+    def _next(self) -> Tuple[str, str]:
+        token: Tuple[str, str] = self._tokens[self._position]
+        self._position += 1
+        return token
+
+    def _accept(self, kind: str, value: str) -> bool:
+        if self._peek() == (kind, value):
+            self._position += 1
+            return True
+        return False
+
+    def _expect(self, kind: str, value: str) -> None:
+        if not self._accept(kind, value):
+            self._fail(f"Expected '{value.upper() if kind == 'keyword' else value}'")
+
+    def _fail(self, message: str) -> None:
+        found: str = self._peek()[1] or 'end of expression'
+        raise ExpressionError(f"{message} but found '{found}' in: {self._text}")
+
+    def _or(self) -> Any:
+        node: Any = self._and()
+        while self._accept('keyword', 'or'):
+            node = Binary('or', node, self._and())
+        return node
+
+    def _and(self) -> Any:
+        node: Any = self._not()
+        while self._accept('keyword', 'and'):
+            node = Binary('and', node, self._not())
+        return node
+
+    def _not(self) -> Any:
+        if self._accept('keyword', 'not'):
+            return Unary('not', self._not())
+        return self._comparison()
+
+    def _comparison(self) -> Any:
+        node: Any = self._additive()
+        while True:
+            kind, value = self._peek()
+            if kind == 'operator' and value in ('=', '==', '!=', '<>', '<', '<=', '>', '>='):
+                self._next()
+                op: str = {'==': '=', '<>': '!='}.get(value, value)
+                node = Binary(op, node, self._additive())
+            elif (kind, value) == ('keyword', 'in') or ((kind, value) == ('keyword', 'not') and
+                                                       self._tokens[self._position + 1] == ('keyword', 'in')):
+                negated: bool = self._accept('keyword', 'not')
+                self._expect('keyword', 'in')
+                self._expect('operator', '(')
+                values: List[Any] = [self._or()]
+                while self._accept('operator', ','):
+                    values.append(self._or())
+                self._expect('operator', ')')
+                node = InList(node, tuple(values), negated)
+            else:
+                return node
+
+    def _additive(self) -> Any:
+        node: Any = self._multiplicative()
+        while self._peek() in (('operator', '+'), ('operator', '-')):
+            node = Binary(self._next()[1], node, self._multiplicative())
+        return node
+
+    def _multiplicative(self) -> Any:
+        node: Any = self._unary()
+        while self._peek() in (('operator', '*'), ('operator', '/'), ('operator', '%')):
+            node = Binary(self._next()[1], node, self._unary())
+        return node
+
+    def _unary(self) -> Any:
+        if self._accept('operator', '-'):
+            return Unary('-', self._unary())
+        if self._accept('operator', '+'):
+            return self._unary()
+        return self._primary()
+
+    def _primary(self) -> Any:
+        kind, value = self._next()
+        if kind == 'number':
+            number: float = float(value)
+            return Literal(int(number) if re.fullmatch(r'\d+', value) else number)
+        if kind == 'string':
+            quote: str = value[0]
+            text: str = value[1:-1].replace(quote * 2, quote)
+            return Literal(re.sub(r'\\(.)', r'\1', text))
+        if kind == 'field':
+            return FieldRef(value[1:-1])
+        if kind == 'keyword' and value in ('true', 'false'):
+            return Literal(value == 'true')
+        if kind == 'keyword' and value == 'if':
+            return self._if()
+        if (kind, value) == ('operator', '('):
+            node: Any = self._or()
+            self._expect('operator', ')')
+            return node
+        if kind == 'name':
+            return self._call(value)
+        self._position -= 1
+        self._fail('Expected a value')
+
+    def _if(self) -> Any:
+        branches: List[Tuple[Any, Any]] = list()
+        condition: Any = self._or()
+        self._expect('keyword', 'then')
+        branches.append((condition, self._or()))
+        while self._accept('keyword', 'elseif'):
+            condition = self._or()
+            self._expect('keyword', 'then')
+            branches.append((condition, self._or()))
+        otherwise: Any = Literal(None)
+        if self._accept('keyword', 'else'):
+            otherwise = self._or()
+        self._expect('keyword', 'endif')
+        return Conditional(tuple(branches), otherwise)
+
+    def _call(self, name: str) -> Any:
+        name = name.lower()
+        self._expect('operator', '(')
+        args: List[Any] = list()
+        if not self._accept('operator', ')'):
+            args.append(self._or())
+            while self._accept('operator', ','):
+                args.append(self._or())
+            self._expect('operator', ')')
+        if name == 'iif':
+            if len(args) != 3:
+                raise ExpressionError(f"IIF takes 3 arguments in: {self._text}")
+            return Conditional(((args[0], args[1]),), args[2])
+        if name == 'null':
+            return Literal(None)
+        if name not in FUNCTIONS:
+            raise ExpressionError(f"Unsupported function '{name}' in: {self._text}")
+        return Call(name, tuple(args))
+
+
+def parse(text: str) -> Any:
+    """Parses an expression into a tree of Literal, FieldRef, Unary, Binary, InList, Call and Conditional nodes.
+    """
+    return _Parser(text).parse()
+
+
+def referenced_fields(node: Any) -> Set[str]:
+    """Returns the names of the fields an expression tree refers to.
+    """
+    return {n.name for n in _nodes(node) if isinstance(n, FieldRef)}
+
+
+def referenced_functions(node: Any) -> Set[str]:
+    """Returns the lower case names of the functions an expression tree calls.
+    """
+    return {n.name for n in _nodes(node) if isinstance(n, Call)}
+
+
+def _nodes(node: Any) -> Iterator[Any]:
+    stack: List[Any] = [node]
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, Unary):
+            stack.append(node.operand)
+        elif isinstance(node, Binary):
+            stack.extend((node.left, node.right))
+        elif isinstance(node, InList):
+            stack.append(node.operand)
+            stack.extend(node.values)
+        elif isinstance(node, Call):
+            stack.extend(node.args)
+        elif isinstance(node, Conditional):
+            for condition, value in node.branches:
+                stack.extend((condition, value))
+            stack.append(node.otherwise)
+
+
+def evaluate(node: Any, record: Mapping[str, Any]) -> Any:
+    """Evaluates an expression tree against one record, given as a mapping of lower case field names to values.
+
+    Nulls are None and propagate through arithmetic and functions. Comparisons involving a null are False,
+    except that two nulls are equal. Dates and times are ISO strings, as they are in Alteryx expressions.
+    """
+    if isinstance(node, Literal):
+        return node.value
+    if isinstance(node, FieldRef):
+        try:
+            return record[node.name.lower()]
+        except KeyError:
+            raise ExpressionError(f"Unknown field [{node.name}]") from None
+    if isinstance(node, Binary):
+        if node.op == 'and':
+            return _truth(evaluate(node.left, record)) and _truth(evaluate(node.right, record))
+        if node.op == 'or':
+            return _truth(evaluate(node.left, record)) or _truth(evaluate(node.right, record))
+        return BINARY[node.op](evaluate(node.left, record), evaluate(node.right, record))
+    if isinstance(node, Unary):
+        value: Any = evaluate(node.operand, record)
+        if node.op == 'not':
+            return not _truth(value)
+        return None if value is None else -_number(value)
+    if isinstance(node, Conditional):
+        for condition, result in node.branches:
+            if _truth(evaluate(condition, record)):
+                return evaluate(result, record)
+        return evaluate(node.otherwise, record)
+    if isinstance(node, InList):
+        value = evaluate(node.operand, record)
+        found: bool = any(_equal(value, evaluate(v, record)) for v in node.values)
+        return found != node.negated
+    if isinstance(node, Call):
+        return FUNCTIONS[node.name](*(evaluate(a, record) for a in node.args))
+    raise ExpressionError(f"Cannot evaluate {node!r}")
+
+
+def _truth(value: Any) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() not in ('', 'false', '0')
+    return bool(value)
+
+
+def _number(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _coerce(left: Any, right: Any) -> Tuple[Any, Any]:
+    """Brings a number and a string to a common type for comparison, comparing as text if the string is not a
+    number.
+    """
+    if isinstance(left, str) == isinstance(right, str):
+        return left, right
+    try:
+        if isinstance(left, str):
+            return float(left), right
+        return left, float(right)
+    except ValueError:
+        return _text(left), _text(right)
+
+
+def _equal(left: Any, right: Any) -> bool:
+    if left is None or right is None:
+        return left is None and right is None
+    left, right = _coerce(left, right)
+    return left == right
+
+
+def _compare(op: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    def compare(left: Any, right: Any) -> bool:
+        if left is None or right is None:
+            return False
+        left, right = _coerce(left, right)
+        return op(left, right)
+    return compare
+
+
+def _arithmetic(op: Callable[[Any, Any], Any]) -> Callable[[Any, Any], Any]:
+    def arithmetic(left: Any, right: Any) -> Any:
+        if left is None or right is None:
+            return None
+        try:
+            return op(_number(left), _number(right))
+        except ZeroDivisionError:
+            return None
+    return arithmetic
+
+
+def _add(left: Any, right: Any) -> Any:
+    if left is None or right is None:
+        return None
+    if isinstance(left, str) and isinstance(right, str):
+        return left + right
+    return _number(left) + _number(right)
+
+
+BINARY: Dict[str, Callable[[Any, Any], Any]] = {
+    '=': _equal,
+    '!=': lambda a, b: not _equal(a, b),
+    '<': _compare(lambda a, b: a < b),
+    '<=': _compare(lambda a, b: a <= b),
+    '>': _compare(lambda a, b: a > b),
+    '>=': _compare(lambda a, b: a >= b),
+    '+': _add,
+    '-': _arithmetic(lambda a, b: a - b),
+    '*': _arithmetic(lambda a, b: a * b),
+    '/': _arithmetic(lambda a, b: a / b),
+    '%': _arithmetic(lambda a, b: a % b),
+}
+
+
+def _nullable(function: Callable[..., Any]) -> Callable[..., Any]:
+    """Wraps a function so that it returns null when its first argument is null.
+    """
+    def wrapper(value: Any, *args: Any) -> Any:
+        return None if value is None else function(value, *args)
+    return wrapper
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else _to_string(value)
+
+
+def _to_string(value: Any, decimals: Any = None) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, float):
+        if decimals is not None:
+            return f"{value:.{int(decimals)}f}"
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+def _to_number(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        number: float = float(str(value).strip())
+    except ValueError:
+        return 0
+    return int(number) if number.is_integer() and abs(number) < 1 << 53 else number
+
+
+def _fold(value: str, case_insensitive: Any) -> str:
+    return value.lower() if case_insensitive is None or _truth(case_insensitive) else value
+
+
+def _contains(value: Any, target: Any, case_insensitive: Any = 1) -> Any:
+    if value is None or target is None:
+        return False
+    return _fold(_text(target), case_insensitive) in _fold(_text(value), case_insensitive)
+
+
+def _starts_with(value: Any, target: Any, case_insensitive: Any = 1) -> Any:
+    if value is None or target is None:
+        return False
+    return _fold(_text(value), case_insensitive).startswith(_fold(_text(target), case_insensitive))
+
+
+def _ends_with(value: Any, target: Any, case_insensitive: Any = 1) -> Any:
+    if value is None or target is None:
+        return False
+    return _fold(_text(value), case_insensitive).endswith(_fold(_text(target), case_insensitive))
+
+
+def _find_string(value: Any, target: Any) -> Any:
+    if value is None or target is None:
+        return -1
+    return _text(value).find(_text(target))
+
+
+def _substring(value: Any, start: Any, length: Any = None) -> Any:
+    text: str = _text(value)
+    start = max(int(_number(start)), 0)
+    return text[start:] if length is None else text[start:start + max(int(_number(length)), 0)]
+
+
+def _regex_match(value: Any, pattern: Any, case_insensitive: Any = 1) -> Any:
+    if value is None or pattern is None:
+        return False
+    flags: int = re.IGNORECASE if _truth(case_insensitive) else 0
+    return re.fullmatch(_text(pattern), _text(value), flags) is not None
+
+
+def _round(value: Any, multiple: Any = 1) -> Any:
+    multiple = _number(multiple)
+    if not multiple:
+        return None
+    return math.floor(_number(value) / multiple + 0.5) * multiple
+
+
+def _extreme(pick: Callable[..., Any]) -> Callable[..., Any]:
+    def extreme(*values: Any) -> Any:
+        present: List[Any] = [_number(v) for v in values if v is not None]
+        return pick(present) if present else None
+    return extreme
+
+
+_DATE_UNITS: Dict[str, str] = {
+    'year': 'years', 'years': 'years', 'month': 'months', 'months': 'months', 'day': 'days', 'days': 'days',
+    'hour': 'hours', 'hours': 'hours', 'minute': 'minutes', 'minutes': 'minutes', 'second': 'seconds',
+    'seconds': 'seconds',
+}
+
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """Parses a date or date time string in the yyyy-mm-dd hh:mm:ss form Alteryx uses, returning None if it is
+    not one.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+
+def _format_datetime(value: datetime, as_date: bool) -> str:
+    if as_date:
+        return value.strftime('%Y-%m-%d')
+    return value.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def add_period(value: datetime, count: int, units: str) -> datetime:
+    """Adds a number of years, months, days, hours, minutes or seconds to a date time. Adding months keeps the
+    day of the month where possible and otherwise uses the last day of the month.
+    """
+    units = _DATE_UNITS.get(units.lower(), units.lower())
+    if units in ('years', 'months'):
+        months: int = value.year * 12 + value.month - 1 + count * (12 if units == 'years' else 1)
+        year, month = divmod(months, 12)
+        month += 1
+        last_day: int = (date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)).day
+        return value.replace(year=year, month=month, day=min(value.day, last_day))
+    if units not in ('days', 'hours', 'minutes', 'seconds'):
+        raise ExpressionError(f"Unsupported date time units '{units}'")
+    return value + timedelta(**{units: count})
+
+
+def _datetime_add(value: Any, count: Any, units: Any) -> Any:
+    parsed: Optional[datetime] = parse_datetime(value)
+    if parsed is None or count is None or units is None:
+        return None
+    as_date: bool = isinstance(value, str) and len(value.strip()) == 10 and \
+        _DATE_UNITS.get(str(units).lower()) in ('years', 'months', 'days')
+    return _format_datetime(add_period(parsed, int(_number(count)), str(units)), as_date)
+
+
+def _datetime_diff(first: Any, second: Any, units: Any) -> Any:
+    a: Optional[datetime] = parse_datetime(first)
+    b: Optional[datetime] = parse_datetime(second)
+    if a is None or b is None or units is None:
+        return None
+    units = _DATE_UNITS.get(str(units).lower(), str(units).lower())
+    if units in ('years', 'months'):
+        months: int = (a.year - b.year) * 12 + a.month - b.month
+        if months > 0 and (a.day, a.time()) < (b.day, b.time()):
+            months -= 1
+        elif months < 0 and (a.day, a.time()) > (b.day, b.time()):
+            months += 1
+        return int(months / 12) if units == 'years' else months
+    seconds: float = (a - b).total_seconds()
+    divisor: int = {'days': 86400, 'hours': 3600, 'minutes': 60, 'seconds': 1}.get(units, 0)
+    if not divisor:
+        raise ExpressionError(f"Unsupported date time units '{units}'")
+    return int(seconds / divisor)
+
+
+def _datetime_part(attribute: str) -> Callable[[Any], Any]:
+    def part(value: Any) -> Any:
+        parsed: Optional[datetime] = parse_datetime(value)
+        return None if parsed is None else getattr(parsed, attribute)
+    return part
+
+
+def _to_date(value: Any) -> Any:
+    parsed: Optional[datetime] = parse_datetime(value)
+    return None if parsed is None else _format_datetime(parsed, True)
+
+
+def _to_datetime(value: Any) -> Any:
+    parsed: Optional[datetime] = parse_datetime(value)
+    return None if parsed is None else _format_datetime(parsed, False)
+
+
+# Functions callable from expressions, by lower case name. IIF and Null are handled by the parser.
+FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    'isnull': lambda value: value is None,
+    'isempty': lambda value: value is None or value == '',
+    'contains': _contains,
+    'startswith': _starts_with,
+    'endswith': _ends_with,
+    'findstring': _find_string,
+    'length': _nullable(lambda value: len(_text(value))),
+    'lowercase': _nullable(lambda value: _text(value).lower()),
+    'uppercase': _nullable(lambda value: _text(value).upper()),
+    'titlecase': _nullable(lambda value: _text(value).title()),
+    'trim': _nullable(lambda value, chars=None: _text(value).strip(chars)),
+    'trimleft': _nullable(lambda value, chars=None: _text(value).lstrip(chars)),
+    'trimright': _nullable(lambda value, chars=None: _text(value).rstrip(chars)),
+    'left': _nullable(lambda value, count: _text(value)[:max(int(_number(count)), 0)]),
+    'right': _nullable(lambda value, count: _text(value)[len(_text(value)) - max(int(_number(count)), 0):]),
+    'substring': _nullable(_substring),
+    'regex_match': _regex_match,
+    'tonumber': _to_number,
+    'tostring': _to_string,
+    'abs': _nullable(lambda value: abs(_number(value))),
+    'ceil': _nullable(lambda value: math.ceil(_number(value))),
+    'floor': _nullable(lambda value: math.floor(_number(value))),
+    'round': _nullable(_round),
+    'min': _extreme(min),
+    'max': _extreme(max),
+    'datetimenow': lambda: _format_datetime(datetime.now(), False),
+    'datetimetoday': lambda: _format_datetime(datetime.now(), True),
+    'datetimeadd': _datetime_add,
+    'datetimediff': _datetime_diff,
+    'datetimeyear': _datetime_part('year'),
+    'datetimemonth': _datetime_part('month'),
+    'datetimeday': _datetime_part('day'),
+    'datetimehour': _datetime_part('hour'),
+    'datetimeminutes': _datetime_part('minute'),
+    'datetimeseconds': _datetime_part('second'),
+    'todate': _to_date,
+    'todatetime': _to_datetime,
+}
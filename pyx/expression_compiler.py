@@ -0,0 +1,597 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from functools import lru_cache
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+import numpy as np
+
+from .expression import Binary, Call, Conditional, FieldRef, InList, Literal, Unary, evaluate, parse, \
+    referenced_fields
+from .record_batch import RecordBatch, null_mask, to_objects
+
+
+class _Fallback(Exception):
+    """Raised while evaluating a compiled expression when the values in a batch cannot be handled with array
+    operations, for example when a text field is compared with a number but holds values that are not numbers.
+    """
+    pass
+
+
+class _Vector:
+    """
+    The value of an expression for every record of a batch.
+
+    values is an array of numbers, booleans or fixed width strings, or a numpy scalar for constants, and nulls
+    is a boolean array that is True for null records, or None if there are none. The null constant has values
+    None and nulls True.
+    """
+    __slots__ = ('values', 'nulls')
+
+    def __init__(self, values: Any, nulls: Any = None):
+        self.values: Any = values
+        self.nulls: Any = nulls
+
+    @property
+    def kind(self) -> str:
+        if self.values is None:
+            return 'null'
+        kind: str = np.asarray(self.values).dtype.kind
+        if kind == 'U':
+            return 'str'
+        if kind == 'b':
+            return 'bool'
+        if kind in 'iuf':
+            return 'num'
+        raise _Fallback(f"Unsupported dtype {np.asarray(self.values).dtype}")
+
+    def is_null(self) -> Any:
+        """Returns True where the value is null, as an array or a plain bool.
+        """
+        if self.nulls is None:
+            return False
+        return self.nulls
+
+
+class _Context:
+    """
+    The batch an expression is being evaluated against, with its fields converted for array operations once.
+    """
+    __slots__ = ('batch', 'length', '_fields')
+
+    def __init__(self, batch: RecordBatch):
+        self.batch: RecordBatch = batch
+        self.length: int = len(batch)
+        self._fields: Dict[str, _Vector] = dict({})
+
+    def field(self, name: str) -> _Vector:
+        key: str = name.lower()
+        vector: Optional[_Vector] = self._fields.get(key)
+        if vector is None:
+            vector = self._fields[key] = _column_vector(self.batch.column(name))
+        return vector
+
+
+class CompiledExpression:
+    """
+    An Alteryx expression compiled to array operations over the columns of a RecordBatch.
+
+    The expression is parsed once and turned into a tree of functions, one per node, that each work on whole
+    columns at a time. Functions that have no array implementation, such as the DateTime and regex functions,
+    are evaluated a record at a time for the part of the expression they cover. If the values in a batch
+    cannot be handled with array operations at all, the whole batch is evaluated a record at a time instead,
+    so the result is always the same as expression.evaluate() would give.
+    """
+
+    def __init__(self, tree: Any):
+        self._tree: Any = tree
+        self._fields: List[str] = sorted(referenced_fields(tree))
+        self._function: Callable[[_Context], _Vector] = _compile(tree)
+
+    @property
+    def tree(self) -> Any:
+        return self._tree
+
+    @property
+    def fields(self) -> List[str]:
+        """The names of the fields the expression refers to.
+        """
+        return self._fields
+
+    def predicate(self, batch: RecordBatch) -> np.ndarray:
+        """Returns a boolean array that is True for the records for which the expression is true.
+        """
+        try:
+            with np.errstate(all='ignore'):
+                result: np.ndarray = _truth(self._function(_Context(batch)))
+            return np.broadcast_to(result, (len(batch),)).copy() if np.ndim(result) == 0 else result
+        except _Fallback:
+            values: List[Any] = _evaluate_records(self._tree, self._fields, batch)
+            return np.fromiter((_scalar_truth(v) for v in values), dtype=bool, count=len(values))
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text: str) -> CompiledExpression:
+    """Parses and compiles an expression, reusing the result for expressions compiled before.
+    """
+    return CompiledExpression(parse(text))
+
+
+@lru_cache(maxsize=256)
+def compile_tree(tree: Any) -> CompiledExpression:
+    """Compiles an expression tree built in code, reusing the result for equal trees compiled before.
+    """
+    return CompiledExpression(tree)
+
+
+def _column_vector(column: np.ndarray) -> _Vector:
+    nulls: np.ndarray = null_mask(column)
+    kind: str = column.dtype.kind
+    if kind in 'iufb':
+        return _Vector(column, nulls if nulls.any() else None)
+    if kind == 'M':
+        text: np.ndarray = np.char.replace(np.datetime_as_string(column), 'T', ' ')
+        return _Vector(np.where(nulls, '', text), nulls if nulls.any() else None)
+    values: List[Any] = column.tolist()
+    if not all(v is None or isinstance(v, str) for v in values):
+        raise _Fallback('Mixed values')
+    has_nulls: bool = bool(nulls.any())
+    return _Vector(np.array(['' if v is None else v for v in values] if has_nulls else values, dtype=str)
+                   if values else np.zeros(0, dtype='U1'), nulls if has_nulls else None)
+
+
+def _compile(node: Any) -> Callable[[_Context], _Vector]:
+    if isinstance(node, Literal):
+        vector: _Vector = _literal(node.value)
+        return lambda context: vector
+    if isinstance(node, FieldRef):
+        name: str = node.name
+        return lambda context: context.field(name)
+    if isinstance(node, Unary):
+        operand: Callable[[_Context], _Vector] = _compile(node.operand)
+        if node.op == 'not':
+            return lambda context: _Vector(~_truth(operand(context)))
+        return lambda context: _negate(operand(context))
+    if isinstance(node, Binary):
+        left: Callable[[_Context], _Vector] = _compile(node.left)
+        right: Callable[[_Context], _Vector] = _compile(node.right)
+        if node.op == 'and':
+            return lambda context: _Vector(_truth(left(context)) & _truth(right(context)))
+        if node.op == 'or':
+            return lambda context: _Vector(_truth(left(context)) | _truth(right(context)))
+        if node.op in _COMPARISONS:
+            comparison: Callable[[Any, Any], Any] = _COMPARISONS[node.op]
+            return lambda context: _compare(node.op, comparison, left(context), right(context))
+        return lambda context: _arithmetic(node.op, left(context), right(context))
+    if isinstance(node, InList):
+        return _compile_in(node)
+    if isinstance(node, Conditional):
+        return _compile_conditional(node)
+    if isinstance(node, Call) and node.name in _FUNCTIONS:
+        compiled: Optional[Callable[[_Context], _Vector]] = _FUNCTIONS[node.name](node)
+        if compiled is not None:
+            return compiled
+    return _compile_records(node)
+
+
+def _compile_records(node: Any) -> Callable[[_Context], _Vector]:
+    """Compiles part of an expression to be evaluated a record at a time.
+    """
+    fields: List[str] = sorted(referenced_fields(node))
+
+    def records(context: _Context) -> _Vector:
+        return _values_vector(_evaluate_records(node, fields, context.batch))
+    return records
+
+
+def _evaluate_records(node: Any, fields: List[str], batch: RecordBatch) -> List[Any]:
+    columns: Dict[str, List[Any]] = {name.lower(): to_objects(batch.column(name)).tolist() for name in fields}
+    record: Dict[str, Any] = dict({})
+    results: List[Any] = list()
+    for i in range(len(batch)):
+        for name, column in columns.items():
+            record[name] = column[i]
+        results.append(evaluate(node, record))
+    return results
+
+
+def _values_vector(values: List[Any]) -> _Vector:
+    """Turns the results of evaluating a record at a time back into a vector.
+    """
+    present: List[Any] = [v for v in values if v is not None]
+    nulls: Optional[np.ndarray] = None
+    if len(present) != len(values):
+        nulls = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+    if not present:
+        return _Vector(np.zeros(len(values), dtype=bool), nulls)
+    if all(isinstance(v, bool) for v in present):
+        return _Vector(np.array([bool(v) for v in values], dtype=bool), nulls)
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return _Vector(np.array([np.nan if v is None else v for v in values], dtype=np.float64), nulls)
+    if all(isinstance(v, str) for v in present):
+        return _Vector(np.array(['' if v is None else v for v in values], dtype=str), nulls)
+    raise _Fallback('Mixed results')
+
+
+def _literal(value: Any) -> _Vector:
+    if value is None:
+        return _Vector(None, True)
+    if isinstance(value, bool):
+        return _Vector(np.bool_(value))
+    if isinstance(value, (int, float)):
+        return _Vector(np.float64(value) if isinstance(value, float) else np.int64(value))
+    return _Vector(np.str_(value))
+
+
+def _or_nulls(*vectors: _Vector) -> Any:
+    result: Any = None
+    for v in vectors:
+        if v.nulls is None:
+            continue
+        result = v.nulls if result is None else result | v.nulls
+    return result
+
+
+def _truth(vector: _Vector) -> Any:
+    """Returns where a vector counts as true: not null and not false, zero, empty or the text false or 0.
+    """
+    kind: str = vector.kind
+    if kind == 'null':
+        return np.False_
+    if kind == 'bool':
+        result: Any = vector.values
+    elif kind == 'num':
+        result = vector.values != 0
+    else:
+        folded: Any = np.char.lower(np.char.strip(vector.values))
+        result = (folded != '') & (folded != 'false') & (folded != '0')
+    if vector.nulls is not None:
+        result = result & ~vector.nulls
+    return result
+
+
+def _scalar_truth(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() not in ('', 'false', '0')
+    return bool(value)
+
+
+def _numeric(vector: _Vector) -> Any:
+    """Returns the values of a vector as numbers, converting text that holds numbers.
+    """
+    kind: str = vector.kind
+    if kind in ('num', 'bool'):
+        return vector.values
+    if kind == 'str':
+        values: Any = vector.values if vector.nulls is None else np.where(vector.nulls, '0', vector.values)
+        try:
+            return np.char.strip(values).astype(np.float64)
+        except ValueError:
+            raise _Fallback('Text that is not a number') from None
+    raise _Fallback('Null')
+
+
+def _common(left: _Vector, right: _Vector) -> Tuple[Any, Any]:
+    """Brings two vectors to a type they can be compared in, the way expression comparisons do.
+    """
+    kinds: Tuple[str, str] = (left.kind, right.kind)
+    if kinds[0] == kinds[1] or kinds in (('num', 'bool'), ('bool', 'num')):
+        return left.values, right.values
+    if 'str' in kinds and ('num' in kinds):
+        return _numeric(left), _numeric(right)
+    raise _Fallback('Incompatible types')
+
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], Any]] = {
+    '=': np.equal,
+    '!=': np.not_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+
+def _compare(op: str, comparison: Callable[[Any, Any], Any], left: _Vector, right: _Vector) -> _Vector:
+    # Comparisons with a null are false, except that two nulls are equal
+    if left.values is None or right.values is None:
+        both: Any = left.is_null() & right.is_null()
+        return _Vector(both if op == '=' else ~np.asarray(both) if op == '!=' else np.False_)
+    a, b = _common(left, right)
+    result: Any = comparison(a, b)
+    nulls: Any = _or_nulls(left, right)
+    if nulls is not None:
+        if op in ('=', '!='):
+            both = left.is_null() & right.is_null()
+            equal: Any = (result if op == '=' else ~result) & ~nulls | both
+            result = equal if op == '=' else ~equal
+        else:
+            result = result & ~nulls
+    return _Vector(result)
+
+
+def _arithmetic(op: str, left: _Vector, right: _Vector) -> _Vector:
+    if left.values is None or right.values is None:
+        return _Vector(None, True)
+    if op == '+' and left.kind == 'str' and right.kind == 'str':
+        return _Vector(np.char.add(left.values, right.values), _or_nulls(left, right))
+    if left.kind not in ('num', 'bool') or right.kind not in ('num', 'bool'):
+        raise _Fallback('Arithmetic on text')
+    a: Any = left.values
+    b: Any = right.values
+    nulls: Any = _or_nulls(left, right)
+    if op == '+':
+        result: Any = a + b
+    elif op == '-':
+        result = a - b
+    elif op == '*':
+        result = a * b
+    else:
+        zero: Any = b == 0
+        safe: Any = np.where(zero, 1, b)
+        result = np.true_divide(a, safe) if op == '/' else np.mod(a, safe)
+        if np.any(zero):
+            nulls = zero if nulls is None else nulls | zero
+    return _Vector(result, nulls)
+
+
+def _negate(vector: _Vector) -> _Vector:
+    if vector.values is None:
+        return vector
+    return _Vector(-_numeric(vector), vector.nulls)
+
+
+def _compile_in(node: InList) -> Callable[[_Context], _Vector]:
+    operand: Callable[[_Context], _Vector] = _compile(node.operand)
+    values: List[Callable[[_Context], _Vector]] = [_compile(v) for v in node.values]
+    literals: List[Any] = [v.value for v in node.values if isinstance(v, Literal)]
+
+    def member(context: _Context) -> _Vector:
+        vector: _Vector = operand(context)
+        if len(literals) == len(values) and None not in literals and vector.values is not None:
+            kinds = {type(v) for v in literals}
+            if vector.kind == 'str' and kinds == {str} or vector.kind == 'num' and kinds <= {int, float}:
+                result: Any = np.isin(vector.values, literals)
+                if vector.nulls is not None:
+                    result &= ~vector.nulls
+                return _Vector(~result if node.negated else result)
+        result = np.False_
+        for value in values:
+            result = result | _compare('=', np.equal, vector, value(context)).values
+        return _Vector(~np.asarray(result) if node.negated else result)
+    return member
+
+
+def _compile_conditional(node: Conditional) -> Callable[[_Context], _Vector]:
+    branches: List[Tuple[Callable[[_Context], _Vector], Callable[[_Context], _Vector]]] = \
+        [(_compile(condition), _compile(value)) for condition, value in node.branches]
+    otherwise: Callable[[_Context], _Vector] = _compile(node.otherwise)
+
+    def conditional(context: _Context) -> _Vector:
+        conditions: List[Any] = list()
+        results: List[_Vector] = list()
+        for condition, value in branches:
+            conditions.append(np.broadcast_to(_truth(condition(context)), (context.length,)))
+            results.append(value(context))
+        results.append(otherwise(context))
+        kinds = {r.kind for r in results} - {'null'}
+        if len(kinds) > 1 and kinds != {'num', 'bool'}:
+            raise _Fallback('Branches of different types')
+        fill: Any = {'str': '', 'bool': False}.get(next(iter(kinds), 'num'), np.nan)
+        choices: List[Any] = [fill if r.values is None else r.values for r in results]
+        nulls: List[Any] = [r.is_null() for r in results]
+        chosen: Any = np.select(conditions, choices[:-1], choices[-1])
+        chosen_nulls: Any = np.select(conditions, nulls[:-1], nulls[-1])
+        return _Vector(chosen, chosen_nulls if np.any(chosen_nulls) else None)
+    return conditional
+
+
+def _constant(node: Any) -> Tuple[bool, Any]:
+    """Returns whether a node is a literal, and its value.
+    """
+    return isinstance(node, Literal), getattr(node, 'value', None)
+
+
+def _text_function(method: Callable[..., Any], *extra: Any) -> Callable[[Call], Any]:
+    """Compiles a function of one text argument and optional literal arguments to a numpy.char method.
+    """
+    def compile_call(node: Call) -> Any:
+        if len(node.args) > 1 + len(extra) or not all(_constant(a)[0] for a in node.args[1:]):
+            return None
+        argument: Callable[[_Context], _Vector] = _compile(node.args[0])
+        literals: List[Any] = [a.value for a in node.args[1:]]
+
+        def call(context: _Context) -> _Vector:
+            vector: _Vector = argument(context)
+            if vector.values is None:
+                return vector
+            if vector.kind != 'str':
+                raise _Fallback('Text function of a number')
+            return _Vector(method(vector.values, *literals), vector.nulls)
+        return call
+    return compile_call
+
+
+def _search(method: str) -> Callable[[Call], Any]:
+    """Compiles Contains, StartsWith and EndsWith with a literal target, which are false for nulls.
+    """
+    def compile_call(node: Call) -> Any:
+        if len(node.args) not in (2, 3) or not all(_constant(a)[0] for a in node.args[1:]):
+            return None
+        target: Any = node.args[1].value
+        case_insensitive: Any = node.args[2].value if len(node.args) == 3 else 1
+        if not isinstance(target, str):
+            return None
+        fold: bool = _scalar_truth(case_insensitive) or case_insensitive is None
+        target = target.lower() if fold else target
+        argument: Callable[[_Context], _Vector] = _compile(node.args[0])
+
+        def call(context: _Context) -> _Vector:
+            vector: _Vector = argument(context)
+            if vector.values is None:
+                return _Vector(np.False_)
+            if vector.kind != 'str':
+                raise _Fallback('Search in a number')
+            values: Any = np.char.lower(vector.values) if fold else vector.values
+            if method == 'contains':
+                result: Any = np.char.find(values, target) >= 0
+            elif method == 'startswith':
+                result = np.char.startswith(values, target)
+            else:
+                result = np.char.endswith(values, target)
+            if vector.nulls is not None:
+                result = result & ~vector.nulls
+            return _Vector(result)
+        return call
+    return compile_call
+
+
+def _null_test(empty: bool) -> Callable[[Call], Any]:
+    def compile_call(node: Call) -> Any:
+        if len(node.args) != 1:
+            return None
+        argument: Callable[[_Context], _Vector] = _compile(node.args[0])
+
+        def call(context: _Context) -> _Vector:
+            vector: _Vector = argument(context)
+            result: Any = vector.is_null()
+            if empty and vector.values is not None and vector.kind == 'str':
+                result = result | (vector.values == '')
+            return _Vector(np.asarray(result))
+        return call
+    return compile_call
+
+
+def _math(function: Callable[[Any], Any]) -> Callable[[Call], Any]:
+    def compile_call(node: Call) -> Any:
+        if len(node.args) != 1:
+            return None
+        argument: Callable[[_Context], _Vector] = _compile(node.args[0])
+
+        def call(context: _Context) -> _Vector:
+            vector: _Vector = argument(context)
+            if vector.values is None:
+                return vector
+            return _Vector(function(_numeric(vector)), vector.nulls)
+        return call
+    return compile_call
+
+
+def _compile_length(node: Call) -> Any:
+    if len(node.args) != 1:
+        return None
+    argument: Callable[[_Context], _Vector] = _compile(node.args[0])
+
+    def call(context: _Context) -> _Vector:
+        vector: _Vector = argument(context)
+        if vector.values is None:
+            return vector
+        if vector.kind != 'str':
+            raise _Fallback('Length of a number')
+        return _Vector(np.char.str_len(vector.values), vector.nulls)
+    return call
+
+
+def _compile_left(node: Call) -> Any:
+    if len(node.args) != 2 or not _constant(node.args[1])[0] or not isinstance(node.args[1].value, int):
+        return None
+    count: int = max(node.args[1].value, 0)
+    return _text_function(lambda values: values.astype(f'U{count}') if count else np.full(np.shape(values), ''))(
+        Call(node.name, node.args[:1]))
+
+
+def _compile_to_number(node: Call) -> Any:
+    if len(node.args) != 1:
+        return None
+    argument: Callable[[_Context], _Vector] = _compile(node.args[0])
+
+    def call(context: _Context) -> _Vector:
+        vector: _Vector = argument(context)
+        if vector.values is None:
+            return vector
+        return _Vector(_numeric(vector), vector.nulls)
+    return call
+
+
+def _compile_round(node: Call) -> Any:
+    if len(node.args) not in (1, 2):
+        return None
+    argument: Callable[[_Context], _Vector] = _compile(node.args[0])
+    multiple: Callable[[_Context], _Vector] = _compile(node.args[1]) if len(node.args) == 2 else \
+        (lambda context: _Vector(np.int64(1)))
+
+    def call(context: _Context) -> _Vector:
+        value: _Vector = argument(context)
+        step: _Vector = multiple(context)
+        if value.values is None or step.values is None:
+            return _Vector(None, True)
+        m: Any = _numeric(step)
+        zero: Any = m == 0
+        result: Any = np.floor(_numeric(value) / np.where(zero, 1, m) + 0.5) * m
+        nulls: Any = _or_nulls(value, step)
+        if np.any(zero):
+            nulls = zero if nulls is None else nulls | zero
+        return _Vector(result, nulls)
+    return call
+
+
+def _compile_extreme(pick: Callable[[Any, Any], Any]) -> Callable[[Call], Any]:
+    def compile_call(node: Call) -> Any:
+        if not node.args:
+            return None
+        arguments: List[Callable[[_Context], _Vector]] = [_compile(a) for a in node.args]
+
+        def call(context: _Context) -> _Vector:
+            result: Any = None
+            for argument in arguments:
+                vector: _Vector = argument(context)
+                if vector.values is None:
+                    continue
+                values: Any = np.asarray(_numeric(vector), dtype=np.float64)
+                if vector.nulls is not None:
+                    values = np.where(vector.nulls, np.nan, values)
+                result = values if result is None else pick(result, values)
+            if result is None:
+                return _Vector(None, True)
+            nulls: Any = np.isnan(result)
+            return _Vector(result, nulls if np.any(nulls) else None)
+        return call
+    return compile_call
+
+
+# Array implementations of expression functions, by lower case name. Each takes the Call node and returns a
+# compiled function, or None if that particular call has to be evaluated a record at a time.
+_FUNCTIONS: Dict[str, Callable[[Call], Any]] = {
+    'isnull': _null_test(False),
+    'isempty': _null_test(True),
+    'contains': _search('contains'),
+    'startswith': _search('startswith'),
+    'endswith': _search('endswith'),
+    'length': _compile_length,
+    'lowercase': _text_function(np.char.lower),
+    'uppercase': _text_function(np.char.upper),
+    'trim': _text_function(np.char.strip, None),
+    'trimleft': _text_function(np.char.lstrip, None),
+    'trimright': _text_function(np.char.rstrip, None),
+    'left': _compile_left,
+    'tonumber': _compile_to_number,
+    'abs': _math(np.abs),
+    'ceil': _math(np.ceil),
+    'floor': _math(np.floor),
+    'round': _compile_round,
+    'min': _compile_extreme(np.fmin),
+    'max': _compile_extreme(np.fmax),
+}
@@ -0,0 +1,272 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pickle
+import struct
+import sys
+import tempfile
+from typing import List, Any, BinaryIO, Iterator, Optional
+
+import numpy as np
+
+from .field_schema import FieldSchema
+from .record_batch import RecordBatch, null_mask, to_objects
+from .sorttool import SortKey
+
+_COUNT = struct.Struct('<q')
+_TEXT = frozenset((str, type(None)))
+
+
+class ExternalSorter:
+    """
+    Sorts a stream of record batches that may not fit in memory.
+
+    Batches are collected until they hold about memory_budget bytes. They are then sorted and written to a
+    temporary file as a run, in blocks of up to batch_size records stored column by column: fixed width columns
+    as their raw bytes and text as one UTF-8 string with offsets and a null bitmap. Once all input has been added
+    the runs are merged and the result is produced as a stream of batches. If everything fits in the budget no
+    files are written at all.
+
+    The merge reads one block of each run at a time. All records that sort before the last record read from
+    every run that has more to read cannot be followed by anything still on disk, so they are sorted together,
+    passed on, and the runs that ran short are read further. The sort is stable throughout.
+    """
+    DEFAULT_MEMORY_BUDGET: int = 256 * 1024 * 1024
+
+    def __init__(self, keys: List[SortKey], memory_budget: int = DEFAULT_MEMORY_BUDGET, batch_size: int = 65536,
+                 dictionary_order: bool = False, temp_dir: Optional[str] = None):
+        self._keys: List[SortKey] = keys
+        self._memory_budget: int = memory_budget
+        self._batch_size: int = batch_size
+        self._dictionary_order: bool = dictionary_order
+        self._temp_dir: Optional[str] = temp_dir
+        self._batches: List[RecordBatch] = list()
+        self._size: int = 0
+        self._runs: List[BinaryIO] = list()
+        self._spilled: int = 0
+        self._schema: Optional[FieldSchema] = None
+
+    @property
+    def runs(self) -> int:
+        """The number of runs written to disk so far.
+        """
+        return self._spilled
+
+    def add(self, batch: RecordBatch) -> None:
+        if self._schema is None:
+            self._schema = batch.schema
+        self._batches.append(batch)
+        self._size += estimate_size(batch)
+        if self._size >= self._memory_budget:
+            self._spill()
+
+    def sorted(self) -> Iterator[RecordBatch]:
+        """Yields every record added, in sorted order, in batches of up to batch_size records.
+        """
+        if self._schema is None:
+            return
+        if not self._runs:
+            records: RecordBatch = RecordBatch.concat(self._batches)
+            self._batches = list()
+            order: np.ndarray = sort_order(records, self._keys, self._dictionary_order)
+            for start in range(0, max(len(order), 1), self._batch_size):
+                yield records.take(order[start:start + self._batch_size])
+            return
+
+        if self._batches:
+            self._spill()
+        try:
+            yield from self._merge()
+        finally:
+            for run in self._runs:
+                run.close()
+            self._runs = list()
+
+    def _spill(self) -> None:
+        records: RecordBatch = RecordBatch.concat(self._batches)
+        self._batches = list()
+        self._size = 0
+        order: np.ndarray = sort_order(records, self._keys, self._dictionary_order)
+        run: BinaryIO = tempfile.TemporaryFile(dir=self._temp_dir)
+        for start in range(0, len(order), self._batch_size):
+            write_block(run, records.take(order[start:start + self._batch_size]))
+        run.seek(0)
+        self._runs.append(run)
+        self._spilled += 1
+
+    def _merge(self) -> Iterator[RecordBatch]:
+        schema: FieldSchema = self._schema
+        pending: List[Optional[RecordBatch]] = [None] * len(self._runs)
+        more: List[bool] = [True] * len(self._runs)
+        for i, run in enumerate(self._runs):
+            pending[i] = read_block(run, schema)
+            more[i] = pending[i] is not None
+
+        while True:
+            present: List[int] = [i for i, batch in enumerate(pending) if batch is not None and len(batch)]
+            if not present:
+                return
+            # Candidates are concatenated in run order, so the stable sort keeps equal records in input order
+            candidates: RecordBatch = RecordBatch.concat([pending[i] for i in present])
+            ends: np.ndarray = np.cumsum([len(pending[i]) for i in present])
+            ranks: List[np.ndarray] = sort_ranks(candidates, self._keys, self._dictionary_order)
+            order: np.ndarray = np.lexsort(ranks[::-1])
+
+            limited: List[int] = [n for n, i in enumerate(present) if more[i]]
+            if limited:
+                position: np.ndarray = np.empty(len(order), dtype=np.int64)
+                position[order] = np.arange(len(order))
+                # The smallest of the last records read from runs with more to come bounds what can be passed on
+                frontier: int = int(min(position[ends[n] - 1] for n in limited))
+                key: np.ndarray = np.array([r[order[frontier]] for r in ranks])
+                sorted_keys: np.ndarray = np.array([r[order[:frontier + 1]] for r in ranks])
+                cut: int = int(np.argmax((sorted_keys == key[:, None]).all(axis=0)))
+            else:
+                cut = len(order)
+
+            emitted: np.ndarray = order[:cut]
+            for start in range(0, cut, self._batch_size):
+                yield candidates.take(emitted[start:start + self._batch_size])
+
+            kept: np.ndarray = np.ones(len(order), dtype=bool)
+            kept[emitted] = False
+            starts: np.ndarray = ends - np.array([len(pending[i]) for i in present])
+            for n, i in enumerate(present):
+                rest: np.ndarray = np.flatnonzero(kept[starts[n]:ends[n]])
+                left: RecordBatch = pending[i].take(rest)
+                if more[i] and (n in limited and position[ends[n] - 1] == frontier or not len(left)):
+                    block: Optional[RecordBatch] = read_block(self._runs[i], schema)
+                    if block is None:
+                        more[i] = False
+                    else:
+                        left = RecordBatch.concat([left, block]) if len(left) else block
+                pending[i] = left
+
+
+def sort_order(batch: RecordBatch, keys: List[SortKey], dictionary_order: bool = False) -> np.ndarray:
+    """Returns the positions of the records of batch in sorted order. The sort is stable.
+    """
+    if not keys:
+        return np.arange(len(batch))
+    return np.lexsort(sort_ranks(batch, keys, dictionary_order)[::-1])
+
+
+def sort_ranks(batch: RecordBatch, keys: List[SortKey], dictionary_order: bool = False) -> List[np.ndarray]:
+    """Returns integer arrays, most significant first, whose lexicographic order is the sort order of the
+    records of batch.
+
+    Nulls come before other values when sorting ascending and after them descending. In dictionary order text is
+    compared ignoring case first, then by character code.
+    """
+    result: List[np.ndarray] = list()
+    for key in keys:
+        column: np.ndarray = batch.column(key.field)
+        if dictionary_order and column.dtype.kind == 'O':
+            folded: np.ndarray = to_objects(column)
+            folded[:] = [v if v is None else str(v).casefold() for v in folded.tolist()]
+            ranks: List[np.ndarray] = [column_ranks(folded), column_ranks(column)]
+        else:
+            ranks = [column_ranks(column)]
+        result.extend(r if key.ascending else -r for r in ranks)
+    return result
+
+
+def column_ranks(column: np.ndarray) -> np.ndarray:
+    """Returns the rank of each value in a column, with 0 for nulls and 1 for the smallest value.
+    """
+    ranks: np.ndarray = np.zeros(len(column), dtype=np.int64)
+    if column.dtype.kind in 'iub':
+        _, inverse = np.unique(column, return_inverse=True)
+        return inverse.reshape(-1) + 1
+    if column.dtype.kind in 'fM':
+        present: np.ndarray = ~(np.isnan(column) if column.dtype.kind == 'f' else np.isnat(column))
+        kept: np.ndarray = column[present]
+    else:
+        present = ~null_mask(column)
+        kept = column[present].astype(str)
+    if present.any():
+        _, inverse = np.unique(kept, return_inverse=True)
+        ranks[present] = inverse.reshape(-1) + 1
+    return ranks
+
+
+def estimate_size(batch: RecordBatch) -> int:
+    """Estimates the memory held by the records of a batch, sampling the values of object columns.
+    """
+    total: int = 0
+    count: int = len(batch)
+    for column in batch.columns:
+        total += column.nbytes
+        if column.dtype.kind == 'O' and count:
+            sample: List[Any] = column[::max(count // 64, 1)].tolist()
+            total += sum(sys.getsizeof(v) for v in sample) * count // len(sample)
+    return total
+
+
+def write_block(stream: BinaryIO, batch: RecordBatch) -> None:
+    """Writes a batch to a binary stream, column by column.
+    """
+    stream.write(_COUNT.pack(len(batch)))
+    for column in batch.columns:
+        if column.dtype.kind in 'biufM':
+            dtype: bytes = column.dtype.str.encode('ascii')
+            stream.write(b'F' + bytes((len(dtype),)) + dtype)
+            stream.write(np.ascontiguousarray(column).tobytes())
+            continue
+        values: List[Any] = column.tolist()
+        if set(map(type, values)) <= _TEXT:
+            nulls: np.ndarray = null_mask(column)
+            texts: List[str] = ['' if v is None else v for v in values] if nulls.any() else values
+            offsets: np.ndarray = np.zeros(len(texts) + 1, dtype=np.int64)
+            np.cumsum(np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)), out=offsets[1:])
+            data: bytes = ''.join(texts).encode('utf-8', 'surrogatepass')
+            stream.write(b'S' + _COUNT.pack(len(data)))
+            stream.write(np.packbits(nulls).tobytes())
+            stream.write(offsets.tobytes())
+            stream.write(data)
+        else:
+            data = pickle.dumps(column, protocol=pickle.HIGHEST_PROTOCOL)
+            stream.write(b'P' + _COUNT.pack(len(data)) + data)
+
+
+def read_block(stream: BinaryIO, schema: FieldSchema) -> Optional[RecordBatch]:
+    """Reads a batch written by write_block, or returns None at the end of the stream.
+    """
+    header: bytes = stream.read(_COUNT.size)
+    if not header:
+        return None
+    count: int = _COUNT.unpack(header)[0]
+    columns: List[np.ndarray] = list()
+    for _ in range(len(schema)):
+        kind: bytes = stream.read(1)
+        if kind == b'F':
+            dtype: np.dtype = np.dtype(stream.read(stream.read(1)[0]).decode('ascii'))
+            columns.append(np.frombuffer(stream.read(count * dtype.itemsize), dtype=dtype).copy())
+        elif kind == b'S':
+            size: int = _COUNT.unpack(stream.read(_COUNT.size))[0]
+            nulls: np.ndarray = np.unpackbits(np.frombuffer(stream.read((count + 7) // 8), dtype=np.uint8),
+                                              count=count).astype(bool)
+            offsets: List[int] = np.frombuffer(stream.read((count + 1) * 8), dtype=np.int64).tolist()
+            text: str = stream.read(size).decode('utf-8', 'surrogatepass')
+            column: np.ndarray = np.empty(count, dtype=object)
+            column[:] = [text[offsets[i]:offsets[i + 1]] for i in range(count)]
+            if nulls.any():
+                column[nulls] = None
+            columns.append(column)
+        else:
+            size = _COUNT.unpack(stream.read(_COUNT.size))[0]
+            columns.append(pickle.loads(stream.read(size)))
+    return RecordBatch(schema, columns)
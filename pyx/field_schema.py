@@ -0,0 +1,178 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+from .property_values import as_list
+
+
+class FieldType(Enum):
+    BOOL = 'Bool'
+    BYTE = 'Byte'
+    INT16 = 'Int16'
+    INT32 = 'Int32'
+    INT64 = 'Int64'
+    FIXED_DECIMAL = 'FixedDecimal'
+    FLOAT = 'Float'
+    DOUBLE = 'Double'
+    STRING = 'String'
+    WSTRING = 'WString'
+    V_STRING = 'V_String'
+    V_WSTRING = 'V_WString'
+    DATE = 'Date'
+    TIME = 'Time'
+    DATETIME = 'DateTime'
+    BLOB = 'Blob'
+    SPATIAL_OBJ = 'SpatialObj'
+    UNKNOWN = 'Unknown'
+
+    def __str__(self) -> str:
+        return self.value
+
+    @staticmethod
+    def parse(value: Optional[str]) -> 'FieldType':
+        try:
+            return FieldType(value)
+        except ValueError:
+            return FieldType.UNKNOWN
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    A field in the records passed along a connection, as described by a RecordInfo Field element.
+
+    size is the length of string and blob fields and the precision of FixedDecimal fields, whose scale is kept
+    in scale.
+    """
+    name: str = ''
+    type: FieldType = FieldType.UNKNOWN
+    size: int = 0
+    scale: int = 0
+    source: str = ''
+
+    @staticmethod
+    def from_attributes(attributes: Dict[str, str]) -> 'Field':
+        """Creates a field from the attributes of a Field element, with or without xmltodict's @ prefixes.
+        """
+        def get(name: str) -> Optional[str]:
+            value: Optional[str] = attributes.get(name)
+            return value if value is not None else attributes.get('@' + name)
+
+        size, _, scale = (get('size') or '').partition('.')
+        return Field(name=get('name') or '', type=FieldType.parse(get('type')), size=_int(size), scale=_int(scale),
+                     source=get('source') or '')
+
+
+class FieldSchema:
+    """
+    The ordered, immutable list of fields on one output of a tool.
+
+    Fields can be looked up by position or by name, and names are matched the way Alteryx matches them,
+    ignoring case.
+    """
+    __slots__ = ('_fields', '_index')
+
+    def __init__(self, fields: Iterable[Field] = ()):
+        self._fields: Tuple[Field, ...] = tuple(fields)
+        self._index: Optional[Dict[str, int]] = None
+
+    @property
+    def fields(self) -> Tuple[Field, ...]:
+        return self._fields
+
+    def names(self) -> List[str]:
+        return [f.name for f in self._fields]
+
+    def get(self, name: str) -> Optional[Field]:
+        if self._index is None:
+            self._index = dict({})
+            for i, f in enumerate(self._fields):
+                self._index.setdefault(f.name.lower(), i)
+        i: Optional[int] = self._index.get(name.lower())
+        return self._fields[i] if i is not None else None
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            f: Optional[Field] = self.get(key)
+            if f is None:
+                raise KeyError(key)
+            return f
+        return self._fields[key]
+
+    def __iter__(self) -> Iterator[Field]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FieldSchema) and self._fields == other._fields
+
+    def __hash__(self) -> int:
+        return hash(self._fields)
+
+    def __repr__(self) -> str:
+        return f"FieldSchema({', '.join(f'{f.name}:{f.type}' for f in self._fields)})"
+
+    def select(self, names: Iterable[str]) -> 'FieldSchema':
+        """Returns a schema with only the named fields, in the order given. Names not in the schema are ignored.
+        """
+        return FieldSchema(f for f in (self.get(name) for name in names) if f is not None)
+
+    def replace(self, name: str, **changes: Any) -> 'FieldSchema':
+        """Returns a schema in which the named field has the given attributes changed.
+        """
+        return FieldSchema(replace(f, **changes) if f.name.lower() == name.lower() else f for f in self._fields)
+
+    @staticmethod
+    def from_meta_info(meta_info: Any) -> Dict[str, 'FieldSchema']:
+        """Returns the schema of each output described by a MetaInfo value as parsed by xmltodict.
+
+        Outputs are keyed by the connection attribute of their MetaInfo element, which defaults to 'Output'.
+        """
+        schemas: Dict[str, FieldSchema] = dict({})
+        for item in as_list(meta_info):
+            if not isinstance(item, dict):
+                continue
+            record_info: Any = item.get('RecordInfo')
+            fields: List[Any] = as_list(record_info.get('Field')) if isinstance(record_info, dict) else []
+            schemas[item.get('@connection') or 'Output'] = \
+                FieldSchema(Field.from_attributes(f) for f in fields if isinstance(f, dict))
+        return schemas
+
+    @staticmethod
+    def from_properties_xml(xml: bytes) -> Dict[str, 'FieldSchema']:
+        """Returns the schema of each output described by the MetaInfo elements of a Properties element.
+        """
+        schemas: Dict[str, FieldSchema] = dict({})
+        for item in ET.fromstring(xml).iterfind('MetaInfo'):
+            schemas[item.get('connection') or 'Output'] = \
+                FieldSchema(Field.from_attributes(f.attrib) for f in item.iterfind('RecordInfo/Field'))
+        return schemas
+
+
+def _int(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return 0
@@ -15,10 +15,14 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from .tool import Tool
-from typing import Dict, Any
+from typing import Dict, Any, Type, TypeVar
 from enum import Enum
 from datetime import datetime
 
+from .property_values import get_text, set_text, is_true
+
+E = TypeVar('E', bound=Enum)
+
 
 class FilterMode(Enum):
     SIMPLE = 'Simple'
@@ -84,32 +88,35 @@ class FilterTool(Tool):
 
     @property
     def filter_mode(self) -> FilterMode:
-        return FilterMode(self._configuration['Mode']['#text'])
+        return FilterMode(get_text(self._configuration.get('Mode')))
 
     @filter_mode.setter
     def filter_mode(self, value: FilterMode) -> None:
-        self._configuration['Mode']['#text'] = str(value)
+        self._configuration['Mode'] = set_text(self._configuration.get('Mode'), str(value))
 
     @property
     def operator(self) -> FilterOperator:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter operator when not in simple mode')
         else:
-            return FilterOperator(self._config_simple['Operator']['#text'])
+            # xmltodict unescapes the operator, while the enum values are written as they appear in the file
+            text: str = get_text(self._config_simple.get('Operator'))
+            return FilterOperator(text.replace('>', '&gt;').replace('<', '&lt;'))
 
     @operator.setter
     def operator(self, value: FilterOperator) -> None:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot set filter operator when not in simple mode')
         else:
-            self._config_simple['Operator']['#text'] = str(value)
+            self._config_simple['Operator'] = set_text(self._config_simple.get('Operator'),
+                                                       str(value).replace('&gt;', '>').replace('&lt;', '<'))
 
     @property
     def field(self) -> str:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter field when not in simple mode')
         else:
-            return self._config_simple['Field']['#text']
+            return get_text(self._config_simple.get('Field'))
 
     @field.setter
     def field(self, value: str) -> None:
@@ -118,129 +125,126 @@ class FilterTool(Tool):
         else:
             if value == '':
                 raise ValueError('Filter field cannot be empty.')
-            self._config_simple['Field']['#text'] = value
+            self._config_simple['Field'] = set_text(self._config_simple.get('Field'), value)
 
     @property
     def operand(self) -> str:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter operand when not in simple mode')
         else:
-            return self._config_simple['Operands']['Operand']['#text']
+            return self._get_operand('Operand')
 
     @operand.setter
     def operand(self, value: str) -> None:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot set filter operand when not in simple mode')
         else:
-            self._config_simple['Operands']['Operand']['#text'] = value
+            self._set_operand('Operand', value)
 
     @property
     def ignore_time_in_datetime(self) -> bool:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter ignore time in datetime flag when not in simple mode')
         else:
-            return bool(self._config_simple['Operands']['IgnoreTimeInDateTime']['#text'])
+            return is_true(self._get_operand('IgnoreTimeInDateTime', 'True'))
 
     @ignore_time_in_datetime.setter
     def ignore_time_in_datetime(self, value: bool) -> None:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot set filter ignore time in datetime flag  when not in simple mode')
         else:
-            self._config_simple['Operands']['IgnoreTimeInDateTime']['#text'] = str(value)
+            self._set_operand('IgnoreTimeInDateTime', str(value))
 
     @property
     def date_type(self) -> FilterDateType:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter date type when not in simple mode')
         else:
-            return FilterDateType(self._config_simple['Operands']['DateType']['#text'])
+            return _parse(FilterDateType, self._get_operand('DateType'), FilterDateType.FIXED)
 
     @date_type.setter
     def date_type(self, value: FilterDateType) -> None:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter date type when not in simple mode')
         else:
-            self._config_simple['Operands']['DateType']['#text'] = str(value)
+            self._set_operand('DateType', str(value))
 
     @property
     def period_date(self) -> datetime:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter period date when not in simple mode')
         else:
-            return datetime.strptime(self._config_simple['Operands']['PeriodDate']['#text'],
-                                     '%Y-%m-%d %H:%M:%S')
+            return _parse_datetime(self._get_operand('PeriodDate'))
 
     @period_date.setter
     def period_date(self, value: datetime) -> None:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot set filter period date when not in simple mode')
         else:
-            self._config_simple['Operands']['PeriodDate']['#text'] = value.strftime('%Y-%m-%d %H:%M:%S')
+            self._set_operand('PeriodDate', value.strftime('%Y-%m-%d %H:%M:%S'))
 
     @property
     def period_type(self) -> FilterPeriodType:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter period type when not in simple mode')
         else:
-            return FilterPeriodType(self._config_simple['Operands']['PeriodType']['#text'])
+            return _parse(FilterPeriodType, self._get_operand('PeriodType'), FilterPeriodType.DAYS)
 
     @period_type.setter
     def period_type(self, value: FilterPeriodType) -> None:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter period type when not in simple mode')
         else:
-            self._config_simple['Operands']['PeriodType']['#text'] = str(value)
+            self._set_operand('PeriodType', str(value))
 
     @property
     def period_count(self) -> int:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter period count when not in simple mode')
         else:
-            return int(self._config_simple['Operands']['PeriodCount']['#text'])
+            return int(self._get_operand('PeriodCount') or 1)
 
     @period_count.setter
     def period_count(self, value: int) -> None:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter period count when not in simple mode')
         else:
-            self._config_simple['Operands']['PeriodCount']['#text'] = str(value)
+            self._set_operand('PeriodCount', str(value))
 
     @property
     def start_date(self) -> datetime:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter start date when not in simple mode')
         else:
-            return datetime.strptime(self._config_simple['Operands']['StartDate']['#text'],
-                                     '%Y-%m-%d %H:%M:%S')
+            return _parse_datetime(self._get_operand('StartDate'))
 
     @start_date.setter
     def start_date(self, value: datetime) -> None:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot set filter start date when not in simple mode')
         else:
-            self._config_simple['Operands']['StartDate']['#text'] = value.strftime('%Y-%m-%d %H:%M:%S')
+            self._set_operand('StartDate', value.strftime('%Y-%m-%d %H:%M:%S'))
 
     @property
     def end_date(self) -> datetime:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot get filter start date when not in simple mode')
         else:
-            return datetime.strptime(self._config_simple['Operands']['EndDate']['#text'],
-                                     '%Y-%m-%d %H:%M:%S')
+            return _parse_datetime(self._get_operand('EndDate'))
 
     @end_date.setter
     def end_date(self, value: datetime) -> None:
         if self.filter_mode != FilterMode.SIMPLE:
             raise RuntimeWarning('Cannot set filter end date when not in simple mode')
         else:
-            self._config_simple['Operands']['EndDate']['#text'] = value.strftime('%Y-%m-%d %H:%M:%S')
+            self._set_operand('EndDate', value.strftime('%Y-%m-%d %H:%M:%S'))
 
     @property
     def expression(self) -> str:
         if self.filter_mode != FilterMode.CUSTOM:
             raise RuntimeWarning('Cannot get filter expression when not in custom mode')
         else:
-            return self._configuration['Expression']['#text']
+            return get_text(self._configuration.get('Expression'))
 
     @expression.setter
     def expression(self, value: str) -> None:
@@ -249,7 +253,7 @@ class FilterTool(Tool):
         else:
             if value == '':
                 raise ValueError('Filter expression cannot be empty.')
-            self._configuration['Expression']['#text'] = value
+            self._configuration['Expression'] = set_text(self._configuration.get('Expression'), value)
 
     @property
     def _configuration(self) -> Dict[str, Any]:
@@ -265,3 +269,29 @@ class FilterTool(Tool):
         else:
             raise NameError('Properties does not contain Configuration > Simple')
 
+    def _get_operand(self, name: str, default: str = '') -> str:
+        return get_text((self._config_simple.get('Operands') or dict({})).get(name), default)
+
+    def _set_operand(self, name: str, value: str) -> None:
+        if not self._config_simple.get('Operands'):
+            self._config_simple['Operands'] = dict({})
+        operands: Dict[str, Any] = self._config_simple['Operands']
+        operands[name] = set_text(operands.get(name), value)
+
+
+def _parse(enum: Type[E], text: str, default: E) -> E:
+    """Returns the member of enum named by text, ignoring case and a trailing s, or default if text is empty.
+    """
+    if not text.strip():
+        return default
+    wanted: str = text.strip().lower().rstrip('s')
+    for member in enum:
+        if member.value.lower().rstrip('s') == wanted:
+            return member
+    raise ValueError(f"'{text}' is not a valid {enum.__name__}")
+
+
+def _parse_datetime(text: str) -> datetime:
+    """Parses a date or date time in the yyyy-mm-dd hh:mm:ss form Alteryx writes.
+    """
+    return datetime.fromisoformat(text.strip())
@@ -17,6 +17,7 @@
 from typing import Dict, Any
 
 from .tool import Tool
+from .property_values import get_text, set_text, is_true
 
 
 class InputTool(Tool):
@@ -34,99 +35,109 @@ class InputTool(Tool):
 
     @property
     def input_file_name(self) -> str:
-        return self._file_config['#text']
+        return get_text(self._file_config)
 
     @input_file_name.setter
     def input_file_name(self, value: str) -> None:
-        self._file_config['#text'] = value
+        self.properties['Configuration']['File'] = set_text(self._file_config, value)
 
     @property
     def record_limit(self) -> int:
-        return int(self._file_config['@RecordLimit'])
+        """The most records to read, or -1 to read them all.
+        """
+        value: str = self._file_config.get('@RecordLimit') or ''
+        return int(value) if value.strip() else -1
 
     @record_limit.setter
     def record_limit(self, value: int) -> None:
-        self._file_config['@RecordLimit'] = str(value)
+        self._file_config['@RecordLimit'] = str(value) if value >= 0 else ''
 
     @property
     def search_sub_dirs(self) -> bool:
-        return bool(self._file_config['SearchSubDirs'])
+        return is_true(self._file_config['@SearchSubDirs'])
 
     @search_sub_dirs.setter
     def search_sub_dirs(self, value: bool) -> None:
-        self._file_config['SearchSubDirs'] = str(value)
+        self._file_config['@SearchSubDirs'] = str(value)
 
     @property
     def file_format(self) -> int:
-        return int(self._file_config['FileFormat'])
+        return int(self._file_config['@FileFormat'])
 
     @file_format.setter
     def file_format(self, value: int) -> None:
-        self._file_config['FileFormat'] = str(value)
+        self._file_config['@FileFormat'] = str(value)
 
     @property
     def code_page(self) -> int:
-        return int(self._format_specific_options['CodePage']['#text'])
+        return int(self._get_option('CodePage'))
 
     @code_page.setter
     def code_page(self, value: int) -> None:
-        self._format_specific_options['CodePage']['#text'] = str(value)
+        self._set_option('CodePage', str(value))
 
     @property
     def delimiter(self) -> str:
-        return self._format_specific_options['Delimeter']['#text']
+        return self._get_option('Delimeter')
 
     @delimiter.setter
     def delimiter(self, value: str) -> None:
-        self._format_specific_options['Delimeter']['#text'] = value
+        self._set_option('Delimeter', value)
 
     @property
     def ignore_errors(self) -> bool:
-        return bool(self._format_specific_options['IgnoreErrors']['#text'])
+        return is_true(self._get_option('IgnoreErrors'))
 
     @ignore_errors.setter
     def ignore_errors(self, value: bool) -> None:
-        self._format_specific_options['IgnoreErrors']['#text'] = str(value)
+        self._set_option('IgnoreErrors', str(value))
 
     @property
     def field_length(self) -> int:
-        return int(self._format_specific_options['FieldLen']['#text'])
+        return int(self._get_option('FieldLen'))
 
     @field_length.setter
     def field_length(self, value: int) -> None:
-        self._format_specific_options['FieldLen']['#text'] = str(value)
+        self._set_option('FieldLen', str(value))
 
     @property
     def allow_shared_write(self) -> bool:
-        return bool(self._format_specific_options['AllowShareWrite']['#text'])
+        return is_true(self._get_option('AllowShareWrite'))
 
     @allow_shared_write.setter
     def allow_shared_write(self, value: bool) -> None:
-        self._format_specific_options['AllowShareWrite']['#text'] = str(value)
+        self._set_option('AllowShareWrite', str(value))
 
     @property
     def header_row(self) -> bool:
-        return bool(self._format_specific_options['HeaderRow']['#text'])
+        return is_true(self._get_option('HeaderRow'))
 
     @header_row.setter
     def header_row(self, value: bool) -> None:
-        self._format_specific_options['HeaderRow']['#text'] = str(value)
+        self._set_option('HeaderRow', str(value))
 
     @property
     def ignore_quotes(self) -> str:
-        return self._format_specific_options['IgnoreQuotes']['#text']
+        return self._get_option('IgnoreQuotes')
 
     @ignore_quotes.setter
     def ignore_quotes(self, value: str) -> None:
-        self._format_specific_options['IgnoreQuotes']['#text'] = value
+        self._set_option('IgnoreQuotes', value)
 
     @property
     def import_line(self) -> int:
-        return int(self._format_specific_options['ImportLine']['#text'])
+        return int(self._get_option('ImportLine'))
 
     @import_line.setter
     def import_line(self, value: int) -> None:
-        self._format_specific_options['ImportLine']['#text'] = str(value)
+        self._set_option('ImportLine', str(value))
+
+    def _get_option(self, name: str) -> str:
+        return get_text(self._format_specific_options[name])
+
+    def _set_option(self, name: str, value: str) -> None:
+        options: Dict[str, Any] = self._format_specific_options
+        options[name] = set_text(options.get(name), value)
 
     @property
     def _file_config(self) -> Dict[str, Any]:
@@ -141,3 +152,4 @@ class InputTool(Tool):
             return self.properties['Configuration']['FormatSpecificOptions']
         else:
             raise NameError('Properties does not contain Configuration > FormatSpecificOptions')
+
@@ -15,7 +15,8 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from .tool import Tool
-from typing import Dict, List
+from .property_values import get_text, set_text, is_true
+from typing import Dict, List, Any
 from dataclasses import dataclass
 
 
@@ -23,6 +24,9 @@ from dataclasses import dataclass
 class OutputToolConfiguration:
     """
     Contains configuration information for an OutputTool isntance.
+
+    max_records of -1 means no limit. With multi_file set, max_records is instead the size of each file, and
+    the records are split over as many files as needed.
     """
     output_file_name: str = ''
     max_records: int = -1 
@@ -47,4 +51,141 @@ class OutputTool(Tool):
         self.engine_dll = 'AlteryxBasePluginsEngine.dll'
         self.engine_dll_entry_point = 'AlteryxDbFileOutput'
 
-        super()._can_have_output(False)
\ No newline at end of file
+        super()._can_have_output(False)
+
+    @property
+    def configuration(self) -> OutputToolConfiguration:
+        """The settings of the tool, with defaults for any that are missing.
+        """
+        defaults: OutputToolConfiguration = OutputToolConfiguration()
+        return OutputToolConfiguration(output_file_name=self.output_file_name, max_records=self.max_records,
+                                       file_format=self.file_format,
+                                       line_end_style=self._get_option('LineEndStyle', defaults.line_end_style),
+                                       delimiter=self._get_option('Delimeter', defaults.delimiter),
+                                       force_quotes=is_true(self._get_option('ForceQuotes', defaults.force_quotes)),
+                                       header_row=is_true(self._get_option('HeaderRow', defaults.header_row)),
+                                       code_page=int(self._get_option('CodePage', defaults.code_page)),
+                                       write_bom=is_true(self._get_option('WriteBOM', defaults.write_bom)),
+                                       multi_file=self.multi_file)
+
+    @configuration.setter
+    def configuration(self, value: OutputToolConfiguration) -> None:
+        self.output_file_name = value.output_file_name
+        self.max_records = value.max_records
+        self.file_format = value.file_format
+        self.line_end_style = value.line_end_style
+        self.delimiter = value.delimiter
+        self.force_quotes = value.force_quotes
+        self.header_row = value.header_row
+        self.code_page = value.code_page
+        self.write_bom = value.write_bom
+        self.multi_file = value.multi_file
+
+    @property
+    def output_file_name(self) -> str:
+        return get_text(self._file_config)
+
+    @output_file_name.setter
+    def output_file_name(self, value: str) -> None:
+        self.properties['Configuration']['File'] = set_text(self._file_config, value)
+
+    @property
+    def max_records(self) -> int:
+        """The most records to write, or -1 to write them all.
+        """
+        value: str = self._file_config.get('@MaxRecords') or ''
+        return int(value) if value.strip() else -1
+
+    @max_records.setter
+    def max_records(self, value: int) -> None:
+        self._file_config['@MaxRecords'] = str(value) if value >= 0 else ''
+
+    @property
+    def file_format(self) -> int:
+        return int(self._file_config.get('@FileFormat') or 0)
+
+    @file_format.setter
+    def file_format(self, value: int) -> None:
+        self._file_config['@FileFormat'] = str(value)
+
+    @property
+    def line_end_style(self) -> str:
+        return self._get_option('LineEndStyle')
+
+    @line_end_style.setter
+    def line_end_style(self, value: str) -> None:
+        self._set_option('LineEndStyle', value)
+
+    @property
+    def delimiter(self) -> str:
+        return self._get_option('Delimeter')
+
+    @delimiter.setter
+    def delimiter(self, value: str) -> None:
+        self._set_option('Delimeter', value)
+
+    @property
+    def force_quotes(self) -> bool:
+        return is_true(self._get_option('ForceQuotes'))
+
+    @force_quotes.setter
+    def force_quotes(self, value: bool) -> None:
+        self._set_option('ForceQuotes', str(value))
+
+    @property
+    def header_row(self) -> bool:
+        return is_true(self._get_option('HeaderRow'))
+
+    @header_row.setter
+    def header_row(self, value: bool) -> None:
+        self._set_option('HeaderRow', str(value))
+
+    @property
+    def code_page(self) -> int:
+        return int(self._get_option('CodePage'))
+
+    @code_page.setter
+    def code_page(self, value: int) -> None:
+        self._set_option('CodePage', str(value))
+
+    @property
+    def write_bom(self) -> bool:
+        return is_true(self._get_option('WriteBOM'))
+
+    @write_bom.setter
+    def write_bom(self, value: bool) -> None:
+        self._set_option('WriteBOM', str(value))
+
+    @property
+    def multi_file(self) -> bool:
+        multi_file: Any = self.properties['Configuration'].get('MultiFile')
+        return isinstance(multi_file, dict) and is_true(multi_file.get('@value'))
+
+    @multi_file.setter
+    def multi_file(self, value: bool) -> None:
+        self.properties['Configuration']['MultiFile'] = {'@value': str(value)}
+
+    def _get_option(self, name: str, default: Any = None) -> str:
+        options: Any = self.properties['Configuration'].get('FormatSpecificOptions')
+        if default is not None and not (isinstance(options, dict) and name in options):
+            return str(default)
+        return get_text(self._format_specific_options[name])
+
+    def _set_option(self, name: str, value: str) -> None:
+        options: Dict[str, Any] = self._format_specific_options
+        options[name] = set_text(options.get(name), value)
+
+    @property
+    def _file_config(self) -> Dict[str, Any]:
+        if self.properties:
+            return self.properties['Configuration']['File']
+        else:
+            raise NameError('Properties does not contain Configuration > File')
+
+    @property
+    def _format_specific_options(self) -> Dict[str, Any]:
+        if self.properties:
+            options: Any = self.properties['Configuration'].get('FormatSpecificOptions')
+            if isinstance(options, dict):
+                return options
+        raise NameError('Properties does not contain Configuration > FormatSpecificOptions')
@@ -0,0 +1,249 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, FrozenSet, Iterable, Optional, Set, Tuple, TYPE_CHECKING
+
+from .autofieldtool import AutofieldTool
+from .connection import Connection
+from .expression_compiler import compile_expression
+from .filtertool import FilterMode, FilterTool
+from .inputtool import InputTool
+from .property_values import as_list, is_true
+from .selecttool import SelectTool
+from .sorttool import SortTool
+
+if TYPE_CHECKING:
+    from .workflow import Workflow
+
+
+@dataclass(frozen=True)
+class ColumnSet:
+    """
+    The fields one tool needs from an input, by lower case name: every field except those in names if
+    everything is True, only those in names otherwise.
+    """
+    everything: bool = True
+    names: FrozenSet[str] = frozenset()
+
+    def __contains__(self, name: str) -> bool:
+        return (name.lower() in self.names) != self.everything
+
+    def union(self, other: 'ColumnSet') -> 'ColumnSet':
+        if self.everything and other.everything:
+            return ColumnSet(True, self.names & other.names)
+        if self.everything or other.everything:
+            excluded, included = (self, other) if self.everything else (other, self)
+            return ColumnSet(True, excluded.names - included.names)
+        return ColumnSet(False, self.names | other.names)
+
+    def describe(self) -> str:
+        names: str = ', '.join(sorted(self.names))
+        if self.everything:
+            return f"all fields except {names}" if names else 'all fields'
+        return names or 'no fields'
+
+
+def _only(names: Iterable[str]) -> ColumnSet:
+    return ColumnSet(False, frozenset(n.lower() for n in names))
+
+
+@dataclass
+class InputPlan:
+    """
+    How the file of an Input tool is read: which of its fields are parsed, and the simple mode Filter tools
+    whose conditions records have to pass to be read at all, by tool ID with the name the field they test has
+    in the file.
+    """
+    columns: ColumnSet = ColumnSet()
+    filters: List[Tuple[int, str]] = field(default_factory=list)
+
+
+@dataclass
+class ExecutionPlan:
+    """
+    The changes the local engine makes to how a workflow is run, as worked out by PlanOptimizer.
+
+    inputs holds the plan for each Input tool and pushed maps each Filter tool whose condition is checked while
+    reading to the Input tool that checks it. Such a Filter passes every record it gets to its True output.
+    """
+    inputs: Dict[int, InputPlan] = field(default_factory=dict)
+    pushed: Dict[int, int] = field(default_factory=dict)
+
+    def input(self, tool_id: int) -> InputPlan:
+        return self.inputs.get(tool_id) or InputPlan()
+
+    def explain(self, workflow: 'Workflow') -> str:
+        """Returns a description of the plan, one line per tool in the order the tools are run.
+        """
+        lines: List[str] = list()
+        for tool_id in workflow.topological_order():
+            tool = workflow.tools[tool_id]
+            sources: str = ', '.join(f"{c.origin_tool_id}.{c.origin_output}"
+                                     for c in workflow.connections_to(tool_id))
+            line: str = f"{tool_id} {type(tool).__name__}" + (f" <- {sources}" if sources else '')
+            if tool_id in self.inputs:
+                plan: InputPlan = self.inputs[tool_id]
+                line += f": read {plan.columns.describe()}"
+                for filter_id, name in plan.filters:
+                    line += f"; keep records where {_describe(workflow.tools[filter_id], name)} (from tool {filter_id})"
+            elif tool_id in self.pushed:
+                line += f": condition checked while reading tool {self.pushed[tool_id]}"
+            lines.append(line)
+        return '\n'.join(lines)
+
+
+class PlanOptimizer:
+    """
+    Works out an ExecutionPlan for a workflow before it is run by the local engine.
+
+    Projection: the fields each tool needs from its input are worked out from the tools downstream of it, from
+    the outputs back to the inputs. A Select tool needs the fields it keeps, or every field but those it drops
+    if it keeps unknown fields; a Filter or Sort tool needs the fields in its condition or sort keys as well as
+    whatever the tools after it need; Autofield passes on what the tools after it need, and any other tool needs
+    everything. Input tools then only parse the fields something downstream needs.
+
+    Selection: a simple mode Filter whose False output is not connected is checked while its file is read
+    when the records reach it from an Input tool unchanged, that is through nothing but Sort tools, Select tools
+    that neither retype nor resize the field tested, and other such Filters, each of which sends its records
+    to no other tool. Input tools with a record limit are left alone, since the limit applies before the filter.
+    """
+
+    def __init__(self, workflow: 'Workflow'):
+        self._workflow: 'Workflow' = workflow
+
+    def optimize(self) -> ExecutionPlan:
+        plan: ExecutionPlan = ExecutionPlan()
+        order: List[int] = self._workflow.topological_order()
+        for tool_id in order:
+            if isinstance(self._workflow.tools[tool_id], InputTool):
+                plan.inputs[tool_id] = InputPlan()
+
+        for tool_id in order:
+            pushed: Optional[Tuple[int, str]] = self._pushdown(tool_id, plan)
+            if pushed is not None:
+                input_id, name = pushed
+                plan.inputs[input_id].filters.append((tool_id, name))
+                plan.pushed[tool_id] = input_id
+
+        needed: Dict[int, ColumnSet] = dict({})
+        for tool_id in reversed(order):
+            needed[tool_id] = self._needed(tool_id, needed)
+            if tool_id in plan.inputs:
+                plan.inputs[tool_id].columns = self._outputs_need(tool_id, 'Output', needed)
+        return plan
+
+    def _needed(self, tool_id: int, needed: Dict[int, ColumnSet]) -> ColumnSet:
+        """Returns the fields a tool needs from its input, given what every tool after it needs.
+        """
+        tool = self._workflow.tools[tool_id]
+        configuration: Dict[str, Any] = tool.properties.get('Configuration') or {}
+        if isinstance(tool, SelectTool):
+            entries: List[Dict[str, str]] = as_list((configuration.get('SelectFields') or {}).get('SelectField'))
+            by_name: Dict[str, bool] = {e.get('@field', '').lower(): is_true(e.get('@selected', 'True'))
+                                        for e in entries}
+            if by_name.pop('*unknown', True):
+                return ColumnSet(True, frozenset(n for n, selected in by_name.items() if not selected))
+            return ColumnSet(False, frozenset(n for n, selected in by_name.items() if selected))
+        if isinstance(tool, FilterTool):
+            try:
+                if tool.filter_mode == FilterMode.CUSTOM:
+                    fields: List[str] = compile_expression(tool.expression).fields
+                else:
+                    fields = [tool.field]
+            except (KeyError, ValueError):
+                return ColumnSet()
+            return _only(fields).union(self._outputs_need(tool_id, 'True', needed)).union(
+                self._outputs_need(tool_id, 'False', needed))
+        if isinstance(tool, SortTool):
+            return _only(k.field for k in tool.sort_keys).union(self._outputs_need(tool_id, 'Output', needed))
+        if isinstance(tool, AutofieldTool):
+            return self._outputs_need(tool_id, 'Output', needed)
+        return ColumnSet()
+
+    def _outputs_need(self, tool_id: int, output: str, needed: Dict[int, ColumnSet]) -> ColumnSet:
+        """Returns the fields the tools connected to an output need from it.
+        """
+        result: ColumnSet = ColumnSet(False)
+        for c in self._workflow.connections_from(tool_id):
+            if c.origin_output == output:
+                result = result.union(needed[c.destination_tool_id])
+        return result
+
+    def _pushdown(self, tool_id: int, plan: ExecutionPlan) -> Optional[Tuple[int, str]]:
+        """Returns the Input tool a Filter's condition can be checked by, with the name the field it tests has
+        in the file, or None if it cannot be moved.
+        """
+        tool = self._workflow.tools[tool_id]
+        if not isinstance(tool, FilterTool):
+            return None
+        try:
+            if tool.filter_mode != FilterMode.SIMPLE:
+                return None
+            name: str = tool.field
+        except (KeyError, ValueError):
+            return None
+        if any(c.origin_output == 'False' for c in self._workflow.connections_from(tool_id)):
+            return None
+
+        current: int = tool_id
+        while True:
+            incoming: List[Connection] = self._workflow.connections_to(current)
+            if len(incoming) != 1:
+                return None
+            origin: int = incoming[0].origin_tool_id
+            if len(self._workflow.connections_from(origin)) != 1:
+                return None
+            upstream = self._workflow.tools[origin]
+            if isinstance(upstream, InputTool):
+                if upstream.record_limit >= 0:
+                    return None
+                return origin, name
+            if isinstance(upstream, SelectTool):
+                source: Optional[str] = _select_source(upstream.properties.get('Configuration') or {}, name)
+                if source is None:
+                    return None
+                name = source
+            elif not isinstance(upstream, SortTool) and origin not in plan.pushed:
+                return None
+            current = origin
+
+
+def _select_source(configuration: Dict[str, Any], name: str) -> Optional[str]:
+    """Returns the input field a Select tool passes on unchanged, bar its name, as name, or None if there is
+    none or it is retyped or resized.
+    """
+    entries: List[Dict[str, str]] = as_list((configuration.get('SelectFields') or {}).get('SelectField'))
+    keep_unknown: bool = True
+    listed: Set[str] = set()
+    for e in entries:
+        field_name: str = e.get('@field', '')
+        listed.add(field_name.lower())
+        if field_name.lower() == '*unknown':
+            keep_unknown = is_true(e.get('@selected', 'True'))
+            continue
+        if not is_true(e.get('@selected', 'True')):
+            continue
+        if (e.get('@rename') or field_name).lower() == name.lower():
+            return None if e.get('@type') or e.get('@size') else field_name
+    if keep_unknown and name.lower() not in listed:
+        return name
+    return None
+
+
+def _describe(tool: FilterTool, name: str) -> str:
+    operator: str = str(tool.operator).replace('&gt;', '>').replace('&lt;', '<')
+    return f"[{name}] {operator}" + (f" \"{tool.operand}\"" if tool.operand else '')
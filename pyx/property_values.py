@@ -0,0 +1,46 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import List, Any
+
+
+def get_text(value: Any, default: str = '') -> str:
+    """Returns the text of an element, which xmltodict gives as a plain string unless it has attributes.
+    """
+    if isinstance(value, dict):
+        value = value.get('#text')
+    return default if value is None else str(value)
+
+
+def set_text(element: Any, value: str) -> Any:
+    """Returns element with its text replaced by value, keeping any attributes it has.
+    """
+    if isinstance(element, dict):
+        element['#text'] = value
+        return element
+    return value
+
+
+def as_list(value: Any) -> List[Any]:
+    """Returns the elements of a value xmltodict gives as a single item when there is only one, as a list.
+    """
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def is_true(value: Any) -> bool:
+    return str(value).strip().lower() == 'true'
@@ -0,0 +1,322 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import re
+from typing import Dict, List, Any, Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+from .field_schema import Field, FieldSchema, FieldType
+
+INTEGER_TYPES = frozenset((FieldType.BYTE, FieldType.INT16, FieldType.INT32, FieldType.INT64))
+FLOAT_TYPES = frozenset((FieldType.FIXED_DECIMAL, FieldType.FLOAT, FieldType.DOUBLE))
+NUMERIC_TYPES = INTEGER_TYPES | FLOAT_TYPES
+STRING_TYPES = frozenset((FieldType.STRING, FieldType.WSTRING, FieldType.V_STRING, FieldType.V_WSTRING))
+DATE_TYPES = frozenset((FieldType.DATE, FieldType.DATETIME))
+
+_NUMBER = re.compile(r'\s*[+-]?(\d+\.?\d*([eE][+-]?\d+)?|\.\d+([eE][+-]?\d+)?)\s*')
+_INTEGER = re.compile(r'\s*[+-]?\d+\s*')
+
+
+def numpy_dtype(field_type: FieldType) -> np.dtype:
+    """Returns the dtype used for columns of a field type.
+
+    Integer fields are held as int64 and switch to float64 when they contain nulls, decimals as float64, dates
+    as datetime64 and everything else as Python objects. Nulls are None, NaN or NaT depending on the dtype.
+    """
+    if field_type in INTEGER_TYPES:
+        return np.dtype(np.int64)
+    if field_type in FLOAT_TYPES:
+        return np.dtype(np.float64)
+    if field_type == FieldType.BOOL:
+        return np.dtype(bool)
+    if field_type == FieldType.DATE:
+        return np.dtype('datetime64[D]')
+    if field_type == FieldType.DATETIME:
+        return np.dtype('datetime64[s]')
+    return np.dtype(object)
+
+
+def null_mask(column: np.ndarray) -> np.ndarray:
+    """Returns a boolean array that is True where a column holds a null.
+    """
+    if column.dtype.kind == 'f':
+        return np.isnan(column)
+    if column.dtype.kind == 'M':
+        return np.isnat(column)
+    if column.dtype.kind == 'O':
+        return np.equal(column, None)
+    return np.zeros(len(column), dtype=bool)
+
+
+def cast(column: np.ndarray, field_type: FieldType) -> np.ndarray:
+    """Converts a column to the representation of field_type, turning values that cannot be converted into nulls.
+    """
+    target: np.dtype = numpy_dtype(field_type)
+    if column.dtype == target:
+        return column
+
+    if column.dtype.kind == 'O':
+        values: List[Any] = column.tolist()
+        if field_type in INTEGER_TYPES:
+            integers: Optional[np.ndarray] = _to_integers(values)
+            if integers is not None:
+                return integers
+        if field_type in NUMERIC_TYPES:
+            numbers: np.ndarray = np.array([_to_float(v) for v in values], dtype=np.float64)
+            return _integral(numbers) if field_type in INTEGER_TYPES else numbers
+        if field_type == FieldType.BOOL:
+            flags: List[Optional[bool]] = [_to_bool(v) for v in values]
+            if None in flags:
+                return np.array(flags, dtype=object)
+            return np.array(flags, dtype=bool)
+        if field_type in DATE_TYPES:
+            return np.array([_to_datetime(v, target) for v in values], dtype=target)
+        return np.array([None if v is None else str(v) for v in values], dtype=object)
+
+    if field_type in STRING_TYPES or target.kind == 'O':
+        return to_objects(column, as_text=True)
+    if column.dtype.kind == 'M':
+        return column.astype(target) if target.kind == 'M' else to_objects(column, as_text=True)
+    if field_type in INTEGER_TYPES:
+        if column.dtype.kind in 'iub':
+            return column.astype(np.int64)
+        return _integral(column.astype(np.float64))
+    return column.astype(target)
+
+
+def to_objects(column: np.ndarray, as_text: bool = False) -> np.ndarray:
+    """Returns a column as an object array with None for nulls, optionally converting every value to text.
+
+    Dates become ISO strings, with a space between date and time as Alteryx writes them, and whole numbers
+    in float columns lose their fractional part.
+    """
+    nulls: np.ndarray = null_mask(column)
+    whole: Optional[np.ndarray] = None
+    if column.dtype.kind == 'M':
+        text: np.ndarray = np.datetime_as_string(column)
+        values: List[Any] = [v.replace('T', ' ') for v in text.tolist()]
+    elif column.dtype.kind == 'f' and as_text:
+        values = list(map(repr, column.tolist()))
+        finite: np.ndarray = np.isfinite(column)
+        whole = np.zeros(len(column), dtype=bool)
+        np.equal(np.trunc(column, where=finite, out=np.zeros(len(column))), column, out=whole, where=finite)
+        whole &= np.abs(column, where=finite, out=np.full(len(column), np.inf)) < 1e16
+    elif column.dtype.kind == 'b' and as_text:
+        values = ['True' if v else 'False' for v in column.tolist()]
+    elif column.dtype.kind in 'iu' and as_text:
+        values = list(map(str, column.tolist()))
+    elif as_text:
+        values = [v if isinstance(v, str) else str(v) for v in column.tolist()]
+    else:
+        values = column.tolist()
+    result: np.ndarray = np.empty(len(values), dtype=object)
+    result[:] = values
+    if whole is not None and whole.any():
+        result[whole] = list(map(str, column[whole].astype(np.int64).tolist()))
+    if nulls.any():
+        result[nulls] = None
+    return result
+
+
+class RecordBatch:
+    """
+    A block of records held as one numpy array per field.
+
+    Batches are what the local engine passes between tools. They are treated as immutable: operations return
+    new batches, which share column arrays with the original wherever possible.
+
+    A batch can also be a selection of the records of another: take() and filter() only record the positions
+    of the records they keep, and a column is gathered from the original the first time it is asked for. Tools
+    that only look at a few fields of a filtered batch then never copy the others.
+    """
+    __slots__ = ('_schema', '_columns', '_selection', '_gathered')
+
+    def __init__(self, schema: FieldSchema, columns: Sequence[np.ndarray], selection: Optional[np.ndarray] = None):
+        if len(schema) != len(columns):
+            raise ValueError(f"Schema has {len(schema)} fields but {len(columns)} columns were given")
+        self._schema: FieldSchema = schema
+        self._columns: List[np.ndarray] = list(columns)
+        self._selection: Optional[np.ndarray] = selection
+        self._gathered: Dict[int, np.ndarray] = dict({})
+
+    def __reduce__(self):
+        return RecordBatch, (self._schema, self.columns)
+
+    @property
+    def schema(self) -> FieldSchema:
+        return self._schema
+
+    @property
+    def columns(self) -> List[np.ndarray]:
+        return [self.column_at(i) for i in range(len(self._columns))]
+
+    @property
+    def selection(self) -> Optional[np.ndarray]:
+        """The positions of the records of this batch in the columns it shares, or None if it has its own.
+        """
+        return self._selection
+
+    def __len__(self) -> int:
+        if self._selection is not None:
+            return len(self._selection)
+        return len(self._columns[0]) if self._columns else 0
+
+    def __repr__(self) -> str:
+        return f"RecordBatch({len(self)} records, {self._schema!r})"
+
+    def column_at(self, i: int) -> np.ndarray:
+        """Returns the column of the i-th field, gathering it from the shared columns if this is a selection.
+        """
+        if self._selection is None:
+            return self._columns[i]
+        column: Optional[np.ndarray] = self._gathered.get(i)
+        if column is None:
+            column = self._gathered[i] = self._columns[i][self._selection]
+        return column
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns the column of a field, matching its name ignoring case. Raises KeyError if there is none.
+        """
+        return self.column_at(self.index(name))
+
+    def index(self, name: str) -> int:
+        for i, f in enumerate(self._schema):
+            if f.name.lower() == name.lower():
+                return i
+        raise KeyError(name)
+
+    def filter(self, mask: np.ndarray) -> 'RecordBatch':
+        """Returns the records where mask is True.
+        """
+        return self.take(np.flatnonzero(mask))
+
+    def take(self, indices: np.ndarray) -> 'RecordBatch':
+        """Returns the records at the given positions, in that order, without copying any columns.
+        """
+        if self._selection is not None:
+            indices = self._selection[indices]
+        return RecordBatch(self._schema, self._columns, indices)
+
+    def slice(self, start: int, stop: int) -> 'RecordBatch':
+        if self._selection is not None:
+            return RecordBatch(self._schema, self._columns, self._selection[start:stop])
+        return RecordBatch(self._schema, [column[start:stop] for column in self._columns])
+
+    def rows(self) -> Iterable[tuple]:
+        """Yields each record as a tuple of Python values with None for nulls.
+        """
+        return zip(*(to_objects(column).tolist() for column in self.columns))
+
+    @staticmethod
+    def empty(schema: FieldSchema) -> 'RecordBatch':
+        return RecordBatch(schema, [np.empty(0, dtype=numpy_dtype(f.type)) for f in schema])
+
+    @staticmethod
+    def from_columns(fields: Iterable[Field], columns: Iterable[Union[np.ndarray, List[Any]]]) -> 'RecordBatch':
+        """Creates a batch from lists or arrays of values, converting each to the representation of its field.
+        """
+        fields = list(fields)
+        arrays: List[np.ndarray] = list()
+        for f, values in zip(fields, columns):
+            if not isinstance(values, np.ndarray):
+                array: np.ndarray = np.empty(len(values), dtype=object)
+                array[:] = list(values)
+                values = array
+            arrays.append(cast(values, f.type))
+        return RecordBatch(FieldSchema(fields), arrays)
+
+    @staticmethod
+    def concat(batches: List['RecordBatch']) -> 'RecordBatch':
+        """Joins batches with the same fields into one. Columns with different dtypes are joined as objects.
+        """
+        if len(batches) == 1:
+            return batches[0]
+        schema: FieldSchema = batches[0].schema
+        columns: List[np.ndarray] = list()
+        for i in range(len(schema)):
+            parts: List[np.ndarray] = [b.column_at(i) for b in batches]
+            if len({p.dtype for p in parts}) > 1:
+                parts = [_widen(p, parts) for p in parts]
+            columns.append(np.concatenate(parts))
+        return RecordBatch(schema, columns)
+
+
+def _widen(column: np.ndarray, parts: List[np.ndarray]) -> np.ndarray:
+    kinds = {p.dtype.kind for p in parts}
+    if kinds <= {'i', 'f'}:
+        return column.astype(np.float64)
+    return to_objects(column)
+
+
+def _to_integers(values: List[Any]) -> Optional[np.ndarray]:
+    """Returns values as int64, parsed exactly, if every one is a whole number that fits, or None otherwise.
+
+    Columns with nulls or decimals go through float64 instead, which only holds integers exactly up to 2^53.
+    """
+    try:
+        return np.array([_to_int(v) for v in values], dtype=np.int64)
+    except (ValueError, OverflowError):
+        return None
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and _INTEGER.fullmatch(value):
+        return int(value)
+    raise ValueError(value)
+
+
+def _integral(numbers: np.ndarray) -> np.ndarray:
+    """Returns whole numbers as int64, or as float64 truncated towards zero if there are nulls.
+    """
+    numbers = np.trunc(numbers)
+    if np.isnan(numbers).any():
+        return numbers
+    return numbers.astype(np.int64)
+
+
+def _to_float(value: Any) -> float:
+    if value is None:
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and _NUMBER.fullmatch(value):
+        return float(value)
+    return np.nan
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        text: str = value.strip().lower()
+        if text in ('true', 't', 'yes', '1'):
+            return True
+        if text in ('false', 'f', 'no', '0'):
+            return False
+        return None
+    return bool(value)
+
+
+def _to_datetime(value: Any, dtype: np.dtype) -> Any:
+    if value is None:
+        return np.datetime64('NaT')
+    try:
+        return np.datetime64(str(value).strip().replace(' ', 'T')).astype(dtype)
+    except ValueError:
+        return np.datetime64('NaT')
@@ -0,0 +1,218 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import pickle
+import struct
+import tempfile
+from typing import Dict, List, BinaryIO, Iterator, Optional, Tuple
+
+from .external_sort import read_block, write_block
+from .field_schema import FieldSchema
+from .record_batch import RecordBatch
+
+_OUTPUT = struct.Struct('<H')
+_TRAILER = struct.Struct('<q')
+
+
+class CachedResult:
+    """
+    The records one tool sent from each of its outputs in an earlier run, as stored in a ResultCache.
+
+    files holds the path, mtime and size of every file the tool wrote, so that a result can be rejected if
+    they have changed since.
+    """
+
+    def __init__(self, path: str, end: int, outputs: List[str], schemas: List[Optional[FieldSchema]],
+                 records: Dict[str, int], files: Dict[str, Tuple[int, int]]):
+        self._path: str = path
+        self._end: int = end
+        self._outputs: List[str] = outputs
+        self._schemas: List[Optional[FieldSchema]] = schemas
+        self._records: Dict[str, int] = records
+        self._files: Dict[str, Tuple[int, int]] = files
+
+    @property
+    def records(self) -> Dict[str, int]:
+        return self._records
+
+    @property
+    def files(self) -> Dict[str, Tuple[int, int]]:
+        return self._files
+
+    def batches(self) -> Iterator[Tuple[str, RecordBatch]]:
+        """Yields each stored batch with the name of the output it was sent from, in the order they were sent.
+        """
+        with open(self._path, 'rb') as f:
+            while f.tell() < self._end:
+                index: int = _OUTPUT.unpack(f.read(_OUTPUT.size))[0]
+                yield self._outputs[index], read_block(f, self._schemas[index])
+
+
+class ResultWriter:
+    """
+    Stores the batches a tool sends while it runs. Nothing is visible in the cache until commit() is called.
+    """
+
+    def __init__(self, cache: 'ResultCache', key: str):
+        self._cache: ResultCache = cache
+        self._key: str = key
+        self._outputs: List[str] = list()
+        self._schemas: List[Optional[FieldSchema]] = list()
+        fd, self._temp = tempfile.mkstemp(dir=cache.directory, suffix='.tmp')
+        self._file: Optional[BinaryIO] = os.fdopen(fd, 'wb')
+
+    def add(self, output: str, batch: RecordBatch) -> None:
+        if output not in self._outputs:
+            self._outputs.append(output)
+            self._schemas.append(batch.schema)
+        index: int = self._outputs.index(output)
+        self._file.write(_OUTPUT.pack(index))
+        write_block(self._file, batch)
+
+    def commit(self, records: Dict[str, int], files: List[str]) -> None:
+        """Finishes the entry and moves it into place, recording the current mtime and size of files.
+        """
+        stats: Dict[str, Tuple[int, int]] = dict({})
+        for path in files:
+            stat: os.stat_result = os.stat(path)
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+        try:
+            end: int = self._file.tell()
+            pickle.dump((self._key, self._outputs, self._schemas, dict(records), stats), self._file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+            self._file.write(_TRAILER.pack(end))
+            self._file.close()
+            self._file = None
+            os.replace(self._temp, self._cache.entry(self._key))
+        except BaseException:
+            self.abort()
+            raise
+        self._cache.evict()
+
+    def abort(self) -> None:
+        """Discards everything stored so far.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        try:
+            os.remove(self._temp)
+        except OSError:
+            pass
+
+
+class ResultCache:
+    """
+    On-disk cache of the records each tool of a workflow produced when run by the local engine.
+
+    An entry is stored under a key that identifies a tool, its configuration and everything upstream of it; see
+    Engine for how keys are made. Each entry is a single file holding the batches the tool sent, as written by
+    write_block, followed by the schema and record count of each output. Reading an entry marks it as recently
+    used, and the least recently used entries are removed whenever the cache grows beyond max_size bytes.
+    """
+    DEFAULT_MAX_SIZE: int = 4 * 1024 * 1024 * 1024
+    SUFFIX: str = '.pyxr'
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE):
+        self._directory: str = directory
+        self._max_size: int = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Returns the result stored under key, or None if there is no valid entry.
+        """
+        path: str = self.entry(key)
+        try:
+            with open(path, 'rb') as f:
+                f.seek(-_TRAILER.size, os.SEEK_END)
+                end: int = _TRAILER.unpack(f.read(_TRAILER.size))[0]
+                f.seek(end)
+                stored_key, outputs, schemas, records, files = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, struct.error):
+            return None
+
+        if stored_key != key:
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return CachedResult(path, end, outputs, schemas, records, files)
+
+    def writer(self, key: str) -> ResultWriter:
+        """Returns a writer that stores a new result under key when it is committed.
+        """
+        return ResultWriter(self, key)
+
+    def remove(self, key: str) -> None:
+        try:
+            os.remove(self.entry(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """Removes every entry from the cache.
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def entry(self, key: str) -> str:
+        """Returns the path of the file the entry for key is stored in.
+        """
+        return os.path.join(self._directory, key + self.SUFFIX)
+
+    def evict(self) -> None:
+        """Removes least recently used entries until the cache is within its size limit.
+        """
+        entries: List[Tuple[float, int, str]] = self._entries()
+        total: int = sum(size for _, size, _ in entries)
+        if total <= self._max_size:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self._max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries: List[Tuple[float, int, str]] = list()
+        with os.scandir(self._directory) as it:
+            for entry in it:
+                if entry.name.endswith(self.SUFFIX):
+                    try:
+                        stat: os.stat_result = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
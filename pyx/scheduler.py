@@ -0,0 +1,170 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import concurrent.futures
+import threading
+from collections import deque
+from typing import Deque, List, Any, Callable, Optional
+
+
+class SchedulerCancelled(Exception):
+    """Raised inside a task that was waiting on an inbox when another task failed.
+    """
+    pass
+
+
+class Inbox:
+    """
+    A bounded queue of messages for one consumer of a DataflowScheduler, which hands them to handler.
+
+    Messages are handled one at a time and in order, by a job the scheduler queues whenever messages arrive
+    while nobody is handling them. put() holds the sender back while the queue is full. If nothing is handling
+    the queue at that point, the sender handles the oldest message itself to make room, so a consumer never
+    needs a thread of its own to keep its senders moving.
+    """
+
+    def __init__(self, scheduler: 'DataflowScheduler', size: int, handler: Callable[[Any], None]):
+        self._scheduler: DataflowScheduler = scheduler
+        self._size: int = size
+        self._handler: Callable[[Any], None] = handler
+        self._messages: Deque[Any] = deque()
+        self._changed: threading.Condition = threading.Condition()
+        self._active: bool = False
+        self._scheduled: bool = False
+
+    def put(self, message: Any) -> None:
+        with self._changed:
+            while len(self._messages) >= self._size:
+                self._scheduler.check()
+                if not self._active:
+                    self._active = True
+                    self._changed.release()
+                    try:
+                        self._drain(1)
+                    finally:
+                        self._changed.acquire()
+                else:
+                    self._changed.wait(DataflowScheduler.POLL_SECONDS)
+            self._messages.append(message)
+            if not self._active and not self._scheduled:
+                self._scheduled = True
+                self._scheduler.submit(self._job)
+
+    def _job(self) -> None:
+        with self._changed:
+            self._scheduled = False
+            if self._active or not self._messages:
+                return
+            self._active = True
+        self._drain()
+
+    def _drain(self, limit: int = -1) -> None:
+        """Handles up to limit messages, or all of them, once this thread has claimed the inbox.
+        """
+        try:
+            while limit:
+                with self._changed:
+                    if not self._messages:
+                        break
+                    message: Any = self._messages.popleft()
+                    self._changed.notify_all()
+                self._scheduler.check()
+                self._handler(message)
+                limit -= 1
+        finally:
+            with self._changed:
+                self._active = False
+                self._changed.notify_all()
+                if self._messages and not self._scheduled:
+                    self._scheduled = True
+                    self._scheduler.submit(self._job)
+
+
+class DataflowScheduler:
+    """
+    Runs the tasks of a dataflow graph on a pool of threads, exchanging messages through bounded inboxes.
+
+    The initial tasks, such as reading the inputs, and the jobs that hand the messages in each inbox to its
+    consumer all share the pool, so at most threads of them run at once however large the graph is. Nothing
+    waits on an empty inbox: a consumer only gets a job when it has messages. A sender facing a full inbox
+    handles messages from it itself when its consumer is idle, and otherwise waits for the thread handling it,
+    which is always making progress since the graph has no cycles. If a task fails, everything still waiting
+    is cancelled and the first error is raised by run().
+    """
+    POLL_SECONDS: float = 0.1
+
+    def __init__(self, threads: int, queue_size: int):
+        self._threads: int = max(threads, 1)
+        self._queue_size: int = max(queue_size, 1)
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pending: int = 0
+        self._done: threading.Condition = threading.Condition()
+        self._error: Optional[BaseException] = None
+        self._failed: threading.Event = threading.Event()
+
+    @property
+    def threads(self) -> int:
+        return self._threads
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue_size
+
+    def inbox(self, handler: Callable[[Any], None]) -> Inbox:
+        return Inbox(self, self._queue_size, handler)
+
+    def run(self, tasks: List[Callable[[], None]]) -> None:
+        """Runs every task, and every job the tasks lead to, to completion, raising the first error raised.
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self._threads) as executor:
+            self._executor = executor
+            for task in tasks:
+                self.submit(task)
+            with self._done:
+                while self._pending and not self._failed.is_set():
+                    self._done.wait()
+        self._executor = None
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, job: Callable[[], None]) -> None:
+        """Queues a job to run on the pool.
+        """
+        with self._done:
+            self._pending += 1
+        self._executor.submit(self._run, job)
+
+    def check(self) -> None:
+        """Raises SchedulerCancelled if a task has failed.
+        """
+        if self._failed.is_set():
+            raise SchedulerCancelled()
+
+    def _run(self, job: Callable[[], None]) -> None:
+        try:
+            if not self._failed.is_set():
+                job()
+        except SchedulerCancelled:
+            pass
+        except BaseException as e:
+            with self._done:
+                if self._error is None:
+                    self._error = e
+            self._failed.set()
+        finally:
+            with self._done:
+                self._pending -= 1
+                self._done.notify_all()
@@ -0,0 +1,194 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from dataclasses import replace
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from .autofieldtool import AutofieldTool
+from .connection_graph import ConnectionGraph
+from .field_schema import Field, FieldSchema, FieldType
+from .filtertool import FilterTool
+from .property_values import as_list, is_true
+from .selecttool import SelectTool
+from .sorttool import SortTool
+from .tool import Tool
+
+
+class SchemaPropagator:
+    """
+    Works out the fields on each output of the tools in a workflow, keeping the results between queries.
+
+    Select, Autofield, Filter and Sort tools get their output fields from the fields on their input and their
+    configuration, so they stay correct when MetaInfo is missing or was written before the tool or anything
+    upstream of it changed. Every other tool, and any of those four without a known input, uses its MetaInfo.
+
+    Schemas are computed on demand, visiting only the tools upstream of the one asked about that have not been
+    computed yet. When a tool is invalidated, the schemas of it and everything downstream of it are dropped the
+    next time a schema is asked for, and only those are computed again.
+    """
+
+    def __init__(self):
+        self._schemas: Dict[int, Dict[str, FieldSchema]] = dict({})
+        self._invalid: Set[int] = set()
+
+    def invalidate(self, tool_id: int) -> None:
+        """Marks the schemas of a tool, and of every tool downstream of it, as out of date.
+        """
+        if self._schemas:
+            self._invalid.add(tool_id)
+
+    def clear(self) -> None:
+        self._schemas.clear()
+        self._invalid.clear()
+
+    def schemas(self, tool_id: int, tools: Dict[int, Tool], connections: ConnectionGraph) -> Dict[str, FieldSchema]:
+        """Returns the schema of each output of a tool, keyed by output name.
+        """
+        self._drop_invalid(connections)
+        if tool_id not in self._schemas:
+            self._compute(tool_id, tools, connections)
+        return dict(self._schemas.get(tool_id, {}))
+
+    def _drop_invalid(self, connections: ConnectionGraph) -> None:
+        stack: List[int] = list(self._invalid)
+        self._invalid.clear()
+        seen: Set[int] = set(stack)
+        while stack:
+            tool_id: int = stack.pop()
+            self._schemas.pop(tool_id, None)
+            for c in connections.outgoing(tool_id):
+                if c.destination_tool_id not in seen:
+                    seen.add(c.destination_tool_id)
+                    stack.append(c.destination_tool_id)
+
+    def _compute(self, tool_id: int, tools: Dict[int, Tool], connections: ConnectionGraph) -> None:
+        # Depth first over the inputs that are not known yet, computing each tool once all of its inputs are. An
+        # input that is still being expanded when it is met again is part of a cycle and is left out.
+        expanding: Set[int] = set()
+        stack: List[Tuple[int, bool]] = [(tool_id, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if current in self._schemas:
+                continue
+            if expanded:
+                expanding.discard(current)
+                inputs: Dict[str, FieldSchema] = dict({})
+                for c in connections.incoming(current):
+                    schema: Optional[FieldSchema] = self._schemas.get(c.origin_tool_id, {}).get(c.origin_output)
+                    if schema is not None:
+                        inputs.setdefault(c.destination_input, schema)
+                self._schemas[current] = self._outputs(tools[current], inputs)
+                continue
+            if current in expanding or current not in tools:
+                continue
+            expanding.add(current)
+            stack.append((current, True))
+            for c in connections.incoming(current):
+                if c.origin_tool_id not in self._schemas and c.origin_tool_id not in expanding:
+                    stack.append((c.origin_tool_id, False))
+
+    def _outputs(self, tool: Tool, inputs: Dict[str, FieldSchema]) -> Dict[str, FieldSchema]:
+        schema: Optional[FieldSchema] = inputs.get('Input')
+        if schema is not None:
+            try:
+                if isinstance(tool, SelectTool):
+                    return {'Output': self._select(tool, schema)}
+                if isinstance(tool, AutofieldTool):
+                    return {'Output': self._autofield(tool, schema)}
+                if isinstance(tool, FilterTool):
+                    return {'True': schema, 'False': schema}
+                if isinstance(tool, SortTool):
+                    return {'Output': schema}
+            except (KeyError, TypeError, AttributeError):
+                pass
+        return tool.output_schemas()
+
+    @staticmethod
+    def _select(tool: SelectTool, schema: FieldSchema) -> FieldSchema:
+        return FieldSchema(output for _, output in select_fields(tool.properties['Configuration'], schema))
+
+    @staticmethod
+    def _autofield(tool: AutofieldTool, schema: FieldSchema) -> FieldSchema:
+        # The types Autofield picks depend on the data, so they can only come from MetaInfo. Fields it has no
+        # MetaInfo for keep the type they had on the input.
+        recorded: Optional[FieldSchema] = tool.output_schemas().get('Output')
+        if recorded is None:
+            return schema
+        fields: Any = tool.properties['Configuration']['Fields']
+        entries: List[Dict[str, str]] = as_list(fields.get('Field')) if isinstance(fields, dict) else []
+        by_name: Dict[str, Dict[str, str]] = {e.get('@field', '').lower(): e for e in entries}
+        unknown: Optional[Dict[str, str]] = by_name.get('*unknown')
+        default: bool = unknown is None or is_true(unknown.get('@selected'))
+
+        result: List[Field] = list()
+        for f in schema:
+            entry: Optional[Dict[str, str]] = by_name.get(f.name.lower())
+            selected: bool = is_true(entry.get('@selected')) if entry is not None else default
+            known: Optional[Field] = recorded.get(f.name) if selected else None
+            result.append(Field(f.name, known.type, known.size, known.scale, f.source) if known is not None else f)
+        return FieldSchema(result)
+
+
+def select_fields(configuration: Dict[str, Any], schema: FieldSchema) -> List[Tuple[Field, Field]]:
+    """Returns the fields a Select tool configuration passes on from schema, in output order, as pairs of the
+    input field and the field it becomes.
+    """
+    listing: Any = configuration.get('SelectFields') or {}
+    entries: List[Dict[str, str]] = as_list(listing.get('SelectField'))
+    by_name: Dict[str, Dict[str, str]] = {e.get('@field', '').lower(): e for e in entries}
+    unknown: Optional[Dict[str, str]] = by_name.get('*unknown')
+    keep_unknown: bool = unknown is None or is_true(unknown.get('@selected'))
+
+    order_changed: Any = configuration.get('OrderChanged')
+    if isinstance(order_changed, dict) and is_true(order_changed.get('@value')):
+        listed: Set[str] = set(by_name)
+        names: List[str] = list()
+        for e in entries:
+            name: str = e.get('@field', '')
+            if name.lower() == '*unknown':
+                names.extend(f.name for f in schema if f.name.lower() not in listed)
+            else:
+                names.append(name)
+        if unknown is None:
+            names.extend(f.name for f in schema if f.name.lower() not in listed)
+    else:
+        names = schema.names()
+
+    fields: List[Tuple[Field, Field]] = list()
+    for name in names:
+        f: Optional[Field] = schema.get(name)
+        if f is None:
+            continue
+        entry: Optional[Dict[str, str]] = by_name.get(name.lower())
+        if entry is None:
+            if keep_unknown:
+                fields.append((f, f))
+            continue
+        if not is_true(entry.get('@selected', 'True')):
+            continue
+        changes: Dict[str, Any] = dict({})
+        if entry.get('@rename'):
+            changes['name'] = entry['@rename']
+        if entry.get('@type'):
+            changes['type'] = FieldType.parse(entry['@type'])
+        if entry.get('@size'):
+            size, _, scale = entry['@size'].partition('.')
+            if size.isdigit():
+                changes['size'] = int(size)
+            if scale.isdigit():
+                changes['scale'] = int(scale)
+        fields.append((f, replace(f, **changes) if changes else f))
+    return fields
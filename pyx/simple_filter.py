@@ -0,0 +1,287 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+import numpy as np
+
+from .expression import Binary, Call, FieldRef, Literal, Unary, add_period
+from .expression_compiler import CompiledExpression, compile_tree
+from .filtertool import FilterDateType, FilterOperator, FilterPeriodType, FilterTool
+from .record_batch import RecordBatch, null_mask
+
+_COMPARISONS: Dict[FilterOperator, Tuple[str, Callable[[Any, Any], Any]]] = {
+    FilterOperator.EQUAL: ('=', np.equal),
+    FilterOperator.NOT_EQUAL: ('!=', np.not_equal),
+    FilterOperator.LESS_THAN: ('<', np.less),
+    FilterOperator.LESS_THAN_OR_EQUAL: ('<=', np.less_equal),
+    FilterOperator.GREATER_THAN: ('>', np.greater),
+    FilterOperator.GREATER_THAN_OR_EQUAL: ('>=', np.greater_equal),
+}
+
+_DATE_OPERATORS: Tuple[FilterOperator, ...] = \
+    (FilterOperator.DATE_RANGE, FilterOperator.PERIOD_AFTER, FilterOperator.PERIOD_BEFORE)
+
+
+class SimpleFilter:
+    """
+    Evaluates the simple mode condition of a Filter tool over whole columns.
+
+    Each operator has an implementation for the types of column it applies to: comparisons work directly on
+    numbers, dates and text, and the date operators parse a text column into datetime64 once per batch. Today,
+    Yesterday and Tomorrow and the ends of periods are worked out once, from the date given when the filter
+    is created, so every batch of a run is filtered against the same dates. Combinations with no direct
+    implementation, such as IsTrue on a text field, are evaluated through the equivalent expression, so the
+    results are always the same as those of condition().
+
+    field overrides the field the tool tests, for conditions checked while reading a file whose field has
+    another name. Raises ValueError if the tool's configuration cannot be read.
+    """
+
+    def __init__(self, tool: FilterTool, today: Optional[date] = None, field: Optional[str] = None):
+        self._operator: FilterOperator = tool.operator
+        self._field: str = field or tool.field
+        self._operand: str = tool.operand
+        self._ignore_time: bool = tool.ignore_time_in_datetime
+        self._range: Optional[Tuple[datetime, datetime, bool]] = None
+        if self._operator in _DATE_OPERATORS:
+            self._range = _date_range(tool, today or date.today())
+        self._fallback: Optional[CompiledExpression] = None
+
+    @staticmethod
+    def uses_today(tool: FilterTool) -> bool:
+        """Returns True if the condition of a tool depends on the date the filter is created on, because it tests
+        for a period relative to today, yesterday or tomorrow.
+        """
+        return tool.operator in (FilterOperator.PERIOD_AFTER, FilterOperator.PERIOD_BEFORE) and \
+            tool.date_type in _RELATIVE_DATES
+
+    @property
+    def field(self) -> str:
+        return self._field
+
+    def condition(self) -> Any:
+        """Returns the expression tree equivalent to the filter.
+        """
+        target: Any = FieldRef(self._field)
+        operand: Literal = Literal(self._operand)
+        if self._operator in _COMPARISONS:
+            return Binary(_COMPARISONS[self._operator][0], target, operand)
+        if self._operator in (FilterOperator.IS_NULL, FilterOperator.IS_NOT_NULL):
+            test: Any = Call('isnull', (target,))
+            return Unary('not', test) if self._operator == FilterOperator.IS_NOT_NULL else test
+        if self._operator in (FilterOperator.IS_EMPTY, FilterOperator.IS_NOT_EMPTY):
+            test = Call('isempty', (target,))
+            return Unary('not', test) if self._operator == FilterOperator.IS_NOT_EMPTY else test
+        if self._operator in (FilterOperator.CONTAINS, FilterOperator.DOES_NOT_CONTAIN):
+            test = Call('contains', (target, operand))
+            return Unary('not', test) if self._operator == FilterOperator.DOES_NOT_CONTAIN else test
+        if self._operator in (FilterOperator.IS_TRUE, FilterOperator.IS_FALSE):
+            test = Binary('=', Call('tostring', (target,)), Literal('1'))
+            return test if self._operator == FilterOperator.IS_TRUE else Unary('not', test)
+
+        start, end, end_inclusive = self._range
+        value: Any = Call('todate' if self._ignore_time else 'todatetime', (target,))
+        text: Callable[[datetime], Literal] = \
+            lambda d: Literal(d.strftime('%Y-%m-%d' if self._ignore_time else '%Y-%m-%d %H:%M:%S'))
+        low: Any = Binary('>' if self._operator == FilterOperator.PERIOD_BEFORE else '>=', value, text(start))
+        high: Any = Binary('<=' if end_inclusive else '<', value, text(end))
+        return Binary('and', low, high)
+
+    def mask(self, batch: RecordBatch) -> np.ndarray:
+        """Returns a boolean array that is True for the records that pass the filter.
+        """
+        column: np.ndarray = batch.column(self._field)
+        if self._range is not None:
+            result: Optional[np.ndarray] = self._in_range(column)
+        elif self._operator in _COMPARISONS:
+            result = self._compare(column)
+        else:
+            result = _OPERATORS[self._operator](self, column)
+        if result is None:
+            if self._fallback is None:
+                self._fallback = compile_tree(self.condition())
+            return self._fallback.predicate(batch)
+        return result
+
+    def split(self, batch: RecordBatch) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the positions of the records that pass the filter and of those that do not.
+        """
+        passed: np.ndarray = self.mask(batch)
+        return np.flatnonzero(passed), np.flatnonzero(~passed)
+
+    def _compare(self, column: np.ndarray) -> Optional[np.ndarray]:
+        # As in expressions, a null is not equal to anything but compares unequal to everything
+        comparison: Callable[[Any, Any], Any] = _COMPARISONS[self._operator][1]
+        kind: str = column.dtype.kind
+        if kind in 'iuf':
+            try:
+                operand: Any = float(self._operand)
+            except ValueError:
+                return None
+            values: np.ndarray = column
+        elif kind == 'M':
+            # Expressions compare dates as text, which orders them the same way only if the operand is written
+            # exactly as the column's values are
+            try:
+                operand = np.datetime64(self._operand.replace(' ', 'T')).astype(column.dtype)
+            except ValueError:
+                return None
+            if np.datetime_as_string(operand).replace('T', ' ') != self._operand:
+                return None
+            values = column
+        elif kind == 'O':
+            if self._operator in (FilterOperator.EQUAL, FilterOperator.NOT_EQUAL):
+                equal: np.ndarray = np.asarray(column == self._operand, dtype=bool)
+                return equal if self._operator == FilterOperator.EQUAL else ~equal
+            values = _strings(column)
+            if values is None:
+                return None
+            operand = self._operand
+        else:
+            return None
+
+        nulls: np.ndarray = null_mask(column)
+        if self._operator == FilterOperator.NOT_EQUAL:
+            return ~(np.equal(values, operand) & ~nulls)
+        return comparison(values, operand) & ~nulls
+
+    def _in_range(self, column: np.ndarray) -> Optional[np.ndarray]:
+        values: Optional[np.ndarray] = _datetimes(column)
+        if values is None:
+            return None
+        start, end, end_inclusive = self._range
+        unit: str = 'D' if self._ignore_time else 's'
+        values = values.astype(f'datetime64[{unit}]')
+        low: np.datetime64 = np.datetime64(start).astype(f'datetime64[{unit}]')
+        high: np.datetime64 = np.datetime64(end).astype(f'datetime64[{unit}]')
+        above: np.ndarray = values > low if self._operator == FilterOperator.PERIOD_BEFORE else values >= low
+        below: np.ndarray = values <= high if end_inclusive else values < high
+        return above & below
+
+    def _null(self, column: np.ndarray) -> Optional[np.ndarray]:
+        nulls: np.ndarray = null_mask(column)
+        return ~nulls if self._operator == FilterOperator.IS_NOT_NULL else nulls
+
+    def _empty(self, column: np.ndarray) -> Optional[np.ndarray]:
+        empty: np.ndarray = null_mask(column)
+        if column.dtype.kind == 'O':
+            empty |= np.asarray(column == '', dtype=bool)
+        return ~empty if self._operator == FilterOperator.IS_NOT_EMPTY else empty
+
+    def _contains(self, column: np.ndarray) -> Optional[np.ndarray]:
+        if column.dtype.kind != 'O':
+            return None
+        values: Optional[np.ndarray] = _strings(column)
+        if values is None:
+            return None
+        found: np.ndarray = (np.char.find(np.char.lower(values), self._operand.lower()) >= 0) & ~null_mask(column)
+        return ~found if self._operator == FilterOperator.DOES_NOT_CONTAIN else found
+
+    def _true(self, column: np.ndarray) -> Optional[np.ndarray]:
+        if column.dtype.kind == 'b':
+            true: np.ndarray = column
+        elif column.dtype.kind in 'iuf':
+            true = column == 1
+        else:
+            return None
+        return true if self._operator == FilterOperator.IS_TRUE else ~true
+
+
+_OPERATORS: Dict[FilterOperator, Callable[[SimpleFilter, np.ndarray], Optional[np.ndarray]]] = {
+    FilterOperator.IS_NULL: SimpleFilter._null,
+    FilterOperator.IS_NOT_NULL: SimpleFilter._null,
+    FilterOperator.IS_EMPTY: SimpleFilter._empty,
+    FilterOperator.IS_NOT_EMPTY: SimpleFilter._empty,
+    FilterOperator.CONTAINS: SimpleFilter._contains,
+    FilterOperator.DOES_NOT_CONTAIN: SimpleFilter._contains,
+    FilterOperator.IS_TRUE: SimpleFilter._true,
+    FilterOperator.IS_FALSE: SimpleFilter._true,
+}
+
+
+def _date_range(tool: FilterTool, today: date) -> Tuple[datetime, datetime, bool]:
+    """Returns the start and end of the dates a date operator accepts and whether the end is included.
+
+    DateRange accepts the start date to the end date, PeriodAfter the period starting on the period date and
+    PeriodBefore the period ending on it. The period date is fixed, or today, yesterday or tomorrow.
+    """
+    if tool.operator == FilterOperator.DATE_RANGE:
+        return tool.start_date, tool.end_date, True
+
+    midnight: datetime = datetime(today.year, today.month, today.day)
+    base: datetime = _RELATIVE_DATES[tool.date_type](midnight) if tool.date_type in _RELATIVE_DATES \
+        else tool.period_date
+    units, days = _PERIOD_UNITS[tool.period_type]
+    count: int = tool.period_count * days
+    if tool.operator == FilterOperator.PERIOD_AFTER:
+        return base, add_period(base, count, units), False
+    return add_period(base, -count, units), base, True
+
+
+_RELATIVE_DATES: Dict[FilterDateType, Callable[[datetime], datetime]] = {
+    FilterDateType.TODAY: lambda midnight: midnight,
+    FilterDateType.YESTERDAY: lambda midnight: midnight - timedelta(days=1),
+    FilterDateType.TOMORROW: lambda midnight: midnight + timedelta(days=1),
+}
+
+# The units add_period works in for each period type, and how many of them make up one period
+_PERIOD_UNITS: Dict[FilterPeriodType, Tuple[str, int]] = {
+    FilterPeriodType.DAYS: ('days', 1),
+    FilterPeriodType.WEEKS: ('days', 7),
+    FilterPeriodType.MONTHS: ('months', 1),
+    FilterPeriodType.QUARTERS: ('months', 3),
+    FilterPeriodType.YEARS: ('years', 1),
+}
+
+
+def _strings(column: np.ndarray) -> Optional[np.ndarray]:
+    """Returns an object column of text as a fixed width string array with nulls as empty strings, or None if it
+    holds anything other than text.
+    """
+    values: List[Any] = column.tolist()
+    if not all(v is None or isinstance(v, str) for v in values):
+        return None
+    if not values:
+        return np.zeros(0, dtype='U1')
+    return np.array(['' if v is None else v for v in values], dtype=str)
+
+
+def _datetimes(column: np.ndarray) -> Optional[np.ndarray]:
+    """Returns a column as datetime64, parsing text once for the whole column. Text that is not a date or date
+    time becomes NaT.
+    """
+    kind: str = column.dtype.kind
+    if kind == 'M':
+        return column.astype('datetime64[s]')
+    if kind != 'O':
+        return None
+    values: Optional[np.ndarray] = _strings(column)
+    if values is None:
+        return None
+    values = np.char.strip(values)
+    values[values == ''] = 'NaT'
+    try:
+        return values.astype('datetime64[s]')
+    except ValueError:
+        parsed: List[Any] = list()
+        for v in values.tolist():
+            try:
+                parsed.append(np.datetime64(v, 's'))
+            except ValueError:
+                parsed.append(np.datetime64('NaT', 's'))
+        return np.array(parsed, dtype='datetime64[s]')
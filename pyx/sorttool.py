@@ -15,11 +15,35 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from .tool import Tool
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, List, Any
+from enum import Enum
+from dataclasses import dataclass
 
 from .decorators import newobj
 
 
+class SortOrder(Enum):
+    ASCENDING = 'Ascending'
+    DESCENDING = 'Descending'
+
+    def __str__(self) -> str:
+        return self.value
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """
+    A field records are sorted on, and in which direction.
+    """
+    field: str
+    order: SortOrder = SortOrder.ASCENDING
+
+    @property
+    def ascending(self) -> bool:
+        return self.order == SortOrder.ASCENDING
+
+
 class SortTool(Tool):
     """
     Represents a Sort tool in an Alteryx workflow.
@@ -29,4 +53,64 @@ class SortTool(Tool):
         super().__init__(tool_id)
         self.plugin = 'AlteryxBasePluginsGui.Sort.Sort'
         self.engine_dll = 'AlteryxBasePluginsEngine.dll'
-        self.engine_dll_entry_point = 'AlteryxSort'
\ No newline at end of file
+        self.engine_dll_entry_point = 'AlteryxSort'
+
+    @property
+    def sort_keys(self) -> List[SortKey]:
+        """The fields records are sorted on, most significant first.
+        """
+        fields: Any = self._sort_info.get('Field')
+        if fields is None:
+            return []
+        if not isinstance(fields, list):
+            fields = [fields]
+        return [SortKey(f['@field'], SortOrder(f.get('@order', 'Ascending'))) for f in fields]
+
+    @sort_keys.setter
+    def sort_keys(self, value: List[SortKey]) -> None:
+        self._writable_sort_info['Field'] = \
+            [OrderedDict([('@field', k.field), ('@order', str(k.order))]) for k in value]
+
+    @property
+    def dictionary_order(self) -> bool:
+        """Whether text is sorted in dictionary order for the locale rather than by character code.
+        """
+        return self._sort_info.get('@locale', '0') != '0'
+
+    @dictionary_order.setter
+    def dictionary_order(self, value: bool) -> None:
+        self._writable_sort_info['@locale'] = '1033' if value else '0'
+
+    @newobj
+    def add_sort_key(self, field: str, order: SortOrder = SortOrder.ASCENDING) -> '__class__':
+        """Adds a field to sort on after the existing ones, or changes its order if it is already sorted on.
+        """
+        keys: List[SortKey] = self.sort_keys
+        if any(k.field == field for k in keys):
+            keys = [SortKey(field, order) if k.field == field else k for k in keys]
+        else:
+            keys.append(SortKey(field, order))
+        self.sort_keys = keys
+
+    @newobj
+    def remove_sort_key(self, field: str) -> '__class__':
+        """Removes a field from the fields sorted on.
+        """
+        self.sort_keys = [k for k in self.sort_keys if k.field != field]
+
+    @property
+    def _sort_info(self) -> Dict[str, Any]:
+        if self.properties:
+            return self.properties['Configuration'].get('SortInfo') or dict({})
+        else:
+            raise NameError('Properties does not contain Configuration > SortInfo')
+
+    @property
+    def _writable_sort_info(self) -> Dict[str, Any]:
+        if self.properties:
+            configuration: Dict[str, Any] = self.properties['Configuration']
+            if not configuration.get('SortInfo'):
+                configuration['SortInfo'] = OrderedDict([('@locale', '0')])
+            return configuration['SortInfo']
+        else:
+            raise NameError('Properties does not contain Configuration > SortInfo')
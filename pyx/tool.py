@@ -14,13 +14,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import copy
+import hashlib
+import io
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass
 import xmltodict
 
 from .decorators import newobj
+from .field_schema import FieldSchema
+from .xml_writer import XmlWriter, to_elements
 
 
 @dataclass
@@ -36,6 +40,63 @@ class ToolPosition:
     y: int = 0
 
 
+@dataclass
+class ToolSource:
+    """
+    The Node XML a tool was read from, along with the values the tool had at that point.
+
+    Used to tell whether a tool has been modified since it was read, and to write untouched tools back verbatim.
+    """
+    xml: bytes = b''
+    properties_start: int = 0
+    properties_end: int = 0
+    tool_id: int = 0
+    plugin: str = ''
+    x: int = 0
+    y: int = 0
+    engine_dll: str = ''
+    engine_dll_entry_point: str = ''
+
+    def properties_xml(self) -> Optional[bytes]:
+        if self.properties_end > self.properties_start:
+            return self.xml[self.properties_start:self.properties_end]
+        return None
+
+
+class _LazyProperties:
+    """
+    Holds the raw Properties XML of a tool read from a file until it is first needed as nested dicts.
+
+    The holder is shared between copies of a tool made by newobj, so materializing the properties through any
+    copy makes the same dict visible to all of them.
+    """
+    __slots__ = ('_xml', '_start', '_end', 'loaded', 'value', 'digest', 'schemas')
+
+    def __init__(self, xml: bytes, start: int = 0, end: Optional[int] = None):
+        self._xml: Optional[bytes] = xml
+        self._start: int = start
+        self._end: int = len(xml) if end is None else end
+        self.loaded: bool = False
+        self.value: Any = None
+        self.digest: Optional[bytes] = None
+        self.schemas: Optional[Dict[str, FieldSchema]] = None
+
+    @property
+    def xml(self) -> Optional[bytes]:
+        if self.loaded:
+            return None
+        if self._start == 0 and self._end == len(self._xml):
+            return self._xml
+        return self._xml[self._start:self._end]
+
+    def load(self) -> Any:
+        if not self.loaded:
+            self.value = xmltodict.parse(self.xml)['Properties']
+            self.loaded = True
+            self._xml = None
+        return self.value
+
+
 class Tool:
     """
     Base class for representing an Alteryx tool (or Node in the workflow XML).
@@ -49,7 +110,8 @@ class Tool:
         self._engine_dll_entry_point: str = ''
         self._inputs: List[ToolConnection] = list()
         self._outputs: List[ToolConnection] = list()
-        self._properties: Dict[str, Any] = dict({})
+        self._properties: Union[Dict[str, Any], _LazyProperties] = dict({})
+        self._source: Optional[ToolSource] = None
         self._can_have_input: bool = True
         self._can_have_output: bool = True
 
@@ -111,12 +173,159 @@ class Tool:
 
     @property
     def properties(self) -> Dict[str, Any]:
+        if isinstance(self._properties, _LazyProperties):
+            return self._properties.load()
         return self._properties
 
     @properties.setter
     def properties(self, value: Dict[str, Any]) -> None:
         self._properties = value
 
+    @property
+    def raw_properties(self) -> Optional[bytes]:
+        """The Properties element as unparsed XML, or None once properties has been accessed or set.
+
+        Setting raw XML defers converting it into nested dicts until properties is first accessed. Until then
+        the tool is written back from the raw XML.
+        """
+        if isinstance(self._properties, _LazyProperties):
+            return self._properties.xml
+        return None
+
+    @raw_properties.setter
+    def raw_properties(self, value: bytes) -> None:
+        self._properties = _LazyProperties(value)
+
+    @property
+    def source(self) -> Optional[ToolSource]:
+        """The Node XML this tool was read from, or None for a tool created in code.
+
+        Setting a source also makes its Properties XML the lazily parsed properties of the tool.
+        """
+        return self._source
+
+    @source.setter
+    def source(self, value: Optional[ToolSource]) -> None:
+        self._source = value
+        if value is not None:
+            if value.properties_end > value.properties_start:
+                self._properties = _LazyProperties(value.xml, value.properties_start, value.properties_end)
+            else:
+                self._properties = None
+
+    def is_modified(self) -> bool:
+        """Returns True if the tool was created in code or has changed since it was read from a file.
+
+        Tools whose properties have never been accessed are checked in constant time. Otherwise the current
+        properties are compared with the Properties XML the tool was read from.
+        """
+        source: Optional[ToolSource] = self._source
+        if source is None:
+            return True
+        if (self.tool_id, self.plugin, self.position.x, self.position.y, self.engine_dll,
+                self.engine_dll_entry_point) != (source.tool_id, source.plugin, source.x, source.y,
+                                                 source.engine_dll, source.engine_dll_entry_point):
+            return True
+        if isinstance(self._properties, _LazyProperties) and not self._properties.loaded:
+            return False
+        xml: Optional[bytes] = source.properties_xml()
+        original: Any = xmltodict.parse(xml)['Properties'] if xml is not None else None
+        return self.properties != original
+
+    def output_schemas(self) -> Dict[str, FieldSchema]:
+        """Returns the fields of each output of the tool as recorded in its MetaInfo, keyed by output name.
+
+        MetaInfo is written by Designer when the workflow is saved and may be missing or out of date for tools
+        that were changed since. Workflow.output_schema infers schemas through the tools pyx knows instead. The
+        result for properties that have not been accessed since they were read is kept.
+        """
+        lazy: Union[Dict[str, Any], _LazyProperties, None] = self._properties
+        if isinstance(lazy, _LazyProperties) and not lazy.loaded:
+            if lazy.schemas is None:
+                lazy.schemas = FieldSchema.from_properties_xml(lazy.xml)
+            return dict(lazy.schemas)
+        if isinstance(self.properties, dict):
+            return FieldSchema.from_meta_info(self.properties.get('MetaInfo'))
+        return dict({})
+
+    def output_schema(self, output: str = 'Output') -> Optional[FieldSchema]:
+        """Returns the fields of one output of the tool as recorded in its MetaInfo, or None if not recorded.
+        """
+        return self.output_schemas().get(output)
+
+    def copy(self, tool_id: Optional[int] = None) -> 'Tool':
+        """Returns an independent copy of the tool with no inputs or outputs, optionally with a new tool ID.
+
+        Properties that have not been accessed are shared with the copy as raw XML, which costs nothing until
+        one of the two parses them.
+        """
+        tool: Tool = self.__class__.__new__(self.__class__)
+        tool.__dict__ = self.__dict__.copy()
+        tool._position = ToolPosition(x=self.position.x, y=self.position.y)
+        tool._inputs = list()
+        tool._outputs = list()
+        lazy: Union[Dict[str, Any], _LazyProperties, None] = self._properties
+        if isinstance(lazy, _LazyProperties) and not lazy.loaded:
+            tool._properties = _LazyProperties(lazy.xml)
+            tool._properties.digest = lazy.digest
+            tool._properties.schemas = lazy.schemas
+        else:
+            tool._properties = copy.deepcopy(self.properties)
+        if tool_id is not None:
+            tool._tool_id = tool_id
+        return tool
+
+    def content_hash(self, include_position: bool = False) -> str:
+        """Returns a hash of what the tool does: its plugin, properties and engine settings.
+
+        The tool ID is not included, so identical tools with different IDs have the same hash. Neither is the
+        position unless include_position is True. Properties are hashed in the form they are written in, so
+        formatting in the file they were read from does not matter. The hash of properties that have not been
+        accessed since they were read is kept, which makes hashing an untouched tool again constant time.
+        """
+        content = hashlib.sha1()
+        for value in (self.plugin, self.engine_dll, self.engine_dll_entry_point):
+            content.update(value.encode('utf-8'))
+            content.update(b'\0')
+        if include_position:
+            content.update(f"{self.position.x},{self.position.y}\0".encode('utf-8'))
+        content.update(self._properties_digest())
+        return content.hexdigest()
+
+    def same_content(self, other: 'Tool', include_position: bool = False) -> bool:
+        """Returns True if the two tools have the same content hash.
+
+        Tools whose unaccessed Properties XML is byte for byte the same are compared without hashing it.
+        """
+        if (self.plugin, self.engine_dll, self.engine_dll_entry_point) != \
+                (other.plugin, other.engine_dll, other.engine_dll_entry_point):
+            return False
+        if include_position and (self.position.x, self.position.y) != (other.position.x, other.position.y):
+            return False
+        raw_properties: Optional[bytes] = self.raw_properties
+        if raw_properties is not None and raw_properties == other.raw_properties:
+            return True
+        return self._properties_digest() == other._properties_digest()
+
+    def _properties_digest(self) -> bytes:
+        lazy: Union[Dict[str, Any], _LazyProperties, None] = self._properties
+        if isinstance(lazy, _LazyProperties) and not lazy.loaded and lazy.digest is not None:
+            return lazy.digest
+
+        text = io.StringIO()
+        writer = XmlWriter(text)
+        raw_properties: Optional[bytes] = self.raw_properties
+        if raw_properties is not None:
+            writer.element(ET.fromstring(raw_properties), 0)
+        elif self.properties is not None:
+            writer.value('Properties', self.properties, 0)
+        writer.flush()
+        digest: bytes = hashlib.sha1(text.getvalue().encode('utf-8')).digest()
+
+        if raw_properties is not None:
+            lazy.digest = digest
+        return digest
+
     def can_have_input(self) -> bool:
         return self._can_have_input
 
@@ -166,9 +375,16 @@ class Tool:
         pos.set('x', str(self.position.x))
         pos.set('y', str(self.position.y))
 
-        xml: str = xmltodict.unparse({'Root':{'Properties':self.properties}})
-        properties: ET.Element = ET.fromstring(xml)
-        tool.extend(properties)
+        raw_properties: Optional[bytes] = self.raw_properties
+        if raw_properties is not None:
+            properties: ET.Element = ET.fromstring(raw_properties)
+            for element in properties.iter():
+                if element.text is not None:
+                    element.text = element.text.strip() or None
+                element.tail = None
+            tool.append(properties)
+        else:
+            tool.extend(to_elements('Properties', self.properties))
 
         engine_settings: ET.SubElement = ET.SubElement(tool, 'EngineSettings')
         engine_settings.set('EngineDll', self.engine_dll)
@@ -176,8 +392,37 @@ class Tool:
 
         return root
 
+    def write_xml(self, writer: XmlWriter, depth: int = 0, preserve_source: bool = True) -> None:
+        """Writes the tool as an indented Node element without building an intermediate tree.
+
+        If preserve_source is True and the tool has not been modified since it was read, the Node XML it was
+        read from is copied verbatim instead.
+        """
+        if preserve_source and not self.is_modified():
+            writer.source(self._source.xml, depth)
+            return
+
+        writer.start('Node', {'ToolID': str(self.tool_id)}, depth)
+        writer.start('GuiSettings', {'Plugin': self.plugin}, depth + 1)
+        writer.empty('Position', {'x': str(self.position.x), 'y': str(self.position.y)}, depth + 2)
+        writer.end('GuiSettings', depth + 1)
+
+        raw_properties: Optional[bytes] = self.raw_properties
+        if raw_properties is not None:
+            writer.element(ET.fromstring(raw_properties), depth + 1)
+        else:
+            writer.value('Properties', self.properties, depth + 1)
+
+        writer.empty('EngineSettings', {'EngineDll': self.engine_dll,
+                                        'EngineDllEntryPoint': self.engine_dll_entry_point}, depth + 1)
+        writer.end('Node', depth)
+
     def __repr__(self) -> str:
-        xml = self.toxml()
-        text = ET.tostring(xml, 'utf-8')
-        parsed = minidom.parseString(text)
-        return parsed.toprettyxml(indent='  ').replace('&quot;', '"')
+        text = io.StringIO()
+        writer = XmlWriter(text)
+        writer.declaration()
+        writer.start('Root', {}, 0)
+        self.write_xml(writer, 1)
+        writer.end('Root', 0)
+        writer.flush()
+        return text.getvalue()
@@ -16,7 +16,7 @@
 
 from typing import Dict
 
-from .tool import Tool
+from .tool import Tool, ToolPosition, ToolSource
 from .inputtool import InputTool
 from .selecttool import SelectTool
 from .autofieldtool import AutofieldTool
@@ -43,4 +43,15 @@ class ToolFactory:
         if plugin in ToolFactory.registry:
             return ToolFactory.registry[plugin](tool_id)
         else:
-            return Tool(tool_id)
\ No newline at end of file
+            return Tool(tool_id)
+
+    @staticmethod
+    def create_from_source(source: ToolSource) -> Tool:
+        """Creates a tool configured from the Node XML and values recorded in a ToolSource.
+        """
+        tool: Tool = ToolFactory.create_tool(source.plugin, source.tool_id)
+        tool.position = ToolPosition(x=source.x, y=source.y)
+        tool.engine_dll = source.engine_dll
+        tool.engine_dll_entry_point = source.engine_dll_entry_point
+        tool.source = source
+        return tool
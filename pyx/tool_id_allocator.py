@@ -0,0 +1,61 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Container, Iterable, List
+
+
+class ToolIdAllocator:
+    """
+    Hands out tool IDs for a workflow in constant time.
+
+    The allocator keeps the next free ID, which is always greater than every ID it has seen or handed out. IDs
+    are never reused after the tool that had them is removed, so references to a removed tool cannot end up
+    pointing at a new one.
+    """
+
+    def __init__(self, tool_ids: Iterable[int] = ()):
+        self._next: int = max(tool_ids, default=0) + 1
+
+    @property
+    def next_id(self) -> int:
+        return self._next
+
+    def observe(self, tool_id: int) -> None:
+        """Records that a tool ID is in use.
+        """
+        if tool_id >= self._next:
+            self._next = tool_id + 1
+
+    def peek(self, used: Container[int] = ()) -> int:
+        """Returns the next free ID without reserving it, skipping any that are in used.
+        """
+        while self._next in used:
+            self._next += 1
+        return self._next
+
+    def reserve(self, count: int, used: Container[int] = ()) -> range:
+        """Reserves count consecutive IDs, none of which have been handed out or are in used.
+        """
+        if count < 0:
+            raise ValueError(f"Cannot reserve {count} tool IDs")
+        while True:
+            start: int = self.peek(used)
+            taken: List[int] = [i for i in range(start, start + count) if i in used]
+            if not taken:
+                break
+            self._next = taken[-1] + 1
+        self._next = start + count
+        return range(start, start + count)
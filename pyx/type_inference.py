@@ -0,0 +1,222 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import concurrent.futures
+import os
+import re
+from collections import deque
+from typing import Deque, List, Iterable, Optional, Set
+
+import numpy as np
+
+from .field_schema import Field, FieldSchema, FieldType
+from .record_batch import RecordBatch, null_mask
+
+_SEPARATOR: str = '\0'
+
+
+class TypeGuess:
+    """
+    Works out the smallest Alteryx type that can hold every value seen in a string field.
+
+    Empty strings and nulls are ignored. Whole numbers become Byte, Int16, Int32 or Int64 by range, unless any of
+    them has a leading zero, other numbers Double, True and False in any case Bool, and yyyy-mm-dd,
+    yyyy-mm-dd hh:mm:ss and hh:mm:ss values Date, DateTime and Time. Anything else stays a string: String or
+    WString if every value has the same length and V_String or V_WString otherwise, wide if any value is outside
+    Latin-1, sized to the longest value.
+
+    A column is checked as a whole rather than value by value: its values are joined into one string that each
+    pattern is matched against in a single pass, and numbers and dates are converted with numpy. Guesses for
+    separate chunks of a field can be made independently and combined with merge().
+    """
+    _BOOL = r'(?i:true|false)'
+    _INTEGER = r'[+-]?(?:0|[1-9]\d*)'
+    _DOUBLE = r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?'
+    _DATE = r'(?!0000)[0-9]{4}-[0-9]{2}-[0-9]{2}'
+    _TIME = r'(?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]'
+    _PATTERNS = {
+        FieldType.BOOL: re.compile(f"(?:{_BOOL}{_SEPARATOR})*"),
+        FieldType.INT64: re.compile(f"(?:{_INTEGER}{_SEPARATOR})*"),
+        FieldType.DOUBLE: re.compile(f"(?:{_DOUBLE}{_SEPARATOR})*"),
+        FieldType.DATE: re.compile(f"(?:{_DATE}{_SEPARATOR})*"),
+        FieldType.DATETIME: re.compile(f"(?:{_DATE} {_TIME}{_SEPARATOR})*"),
+        FieldType.TIME: re.compile(f"(?:{_TIME}{_SEPARATOR})*"),
+    }
+
+    def __init__(self):
+        self.count: int = 0
+        self.candidates: Set[FieldType] = {FieldType.BOOL, FieldType.INT64, FieldType.DOUBLE, FieldType.DATE,
+                                           FieldType.DATETIME, FieldType.TIME}
+        self.minimum: int = 0
+        self.maximum: int = 0
+        self.shortest: Optional[int] = None
+        self.longest: int = 0
+        self.wide: bool = False
+
+    @staticmethod
+    def of(column: np.ndarray) -> 'TypeGuess':
+        """Returns the guess for the values of one column.
+        """
+        guess: TypeGuess = TypeGuess()
+        nulls: np.ndarray = null_mask(column)
+        values: List[str] = (column[~nulls] if nulls.any() else column).tolist()
+        if '' in values:
+            values = [v for v in values if v]
+        if not values:
+            return guess
+
+        lengths: np.ndarray = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+        guess.count = len(values)
+        guess.shortest = int(lengths.min())
+        guess.longest = int(lengths.max())
+        text: str = _SEPARATOR.join(values) + _SEPARATOR
+        guess.wide = not text.isascii() and max(text) > '\xff'
+        if text.count(_SEPARATOR) != len(values):
+            # A value contains the separator itself, so it cannot be any of the other types
+            guess.candidates.clear()
+            return guess
+
+        for field_type, length in ((FieldType.DATE, 10), (FieldType.DATETIME, 19), (FieldType.TIME, 8)):
+            if not guess.shortest == guess.longest == length:
+                guess.candidates.discard(field_type)
+        if guess.shortest < 4 or guess.longest > 5:
+            guess.candidates.discard(FieldType.BOOL)
+        for field_type in [t for t in TypeGuess._PATTERNS if t in guess.candidates]:
+            if field_type == FieldType.DOUBLE and FieldType.INT64 in guess.candidates:
+                continue
+            if TypeGuess._PATTERNS[field_type].fullmatch(text) is None:
+                guess.candidates.discard(field_type)
+        if FieldType.INT64 in guess.candidates:
+            # Converted with int() value by value, so the range check is exact beyond 2^53
+            numbers: np.ndarray = np.array(values, dtype=object)
+            try:
+                numbers = numbers.astype(np.int64)
+            except OverflowError:
+                guess.candidates.discard(FieldType.INT64)
+            else:
+                guess.minimum = min(int(numbers.min()), 0)
+                guess.maximum = max(int(numbers.max()), 0)
+        for field_type, unit in ((FieldType.DATE, 'D'), (FieldType.DATETIME, 's')):
+            if field_type in guess.candidates:
+                try:
+                    np.array(text[:-1].replace(' ', 'T').split(_SEPARATOR), dtype=f"datetime64[{unit}]")
+                except ValueError:
+                    guess.candidates.discard(field_type)
+        return guess
+
+    def update(self, column: np.ndarray) -> None:
+        self.merge(TypeGuess.of(column))
+
+    def merge(self, other: 'TypeGuess') -> None:
+        """Combines the guess for another chunk of the same field into this one.
+        """
+        if not other.count:
+            return
+        if not self.count:
+            self.__dict__.update(other.__dict__, candidates=set(other.candidates))
+            return
+        self.count += other.count
+        self.candidates &= other.candidates
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.shortest = min(self.shortest, other.shortest)
+        self.longest = max(self.longest, other.longest)
+        self.wide = self.wide or other.wide
+
+    def field(self, source: Field) -> Field:
+        """Returns source changed to the type guessed for it, or unchanged if no values were seen.
+        """
+        if not self.count:
+            return source
+        if FieldType.INT64 in self.candidates:
+            for field_type, low, high in ((FieldType.BYTE, 0, 255), (FieldType.INT16, -1 << 15, (1 << 15) - 1),
+                                          (FieldType.INT32, -1 << 31, (1 << 31) - 1),
+                                          (FieldType.INT64, -1 << 63, (1 << 63) - 1)):
+                if low <= self.minimum and self.maximum <= high:
+                    return Field(source.name, field_type, 0, 0, source.source)
+        for field_type in (FieldType.BOOL, FieldType.DOUBLE, FieldType.DATE, FieldType.DATETIME, FieldType.TIME):
+            if field_type in self.candidates:
+                return Field(source.name, field_type, 0, 0, source.source)
+        if self.shortest == self.longest:
+            field_type = FieldType.WSTRING if self.wide else FieldType.STRING
+        else:
+            field_type = FieldType.V_WSTRING if self.wide else FieldType.V_STRING
+        return Field(source.name, field_type, self.longest, 0, source.source)
+
+
+class TypeInference:
+    """
+    Guesses the types of some string fields of a stream of record batches in a single pass.
+
+    Each batch is a chunk whose fields are guessed on their own, by a pool of worker processes when workers is
+    more than one, with a bounded number of chunks in flight. The guesses are merged as they come back, in any
+    order, since merging does not depend on it. Fields that are not listed are never looked at.
+    """
+
+    def __init__(self, schema: FieldSchema, fields: Iterable[int], workers: Optional[int] = None):
+        self._schema: FieldSchema = schema
+        self._fields: List[int] = list(fields)
+        self._guesses: List[TypeGuess] = [TypeGuess() for _ in self._fields]
+        self._workers: int = workers or os.cpu_count() or 1
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._pending: Deque[concurrent.futures.Future] = deque()
+        if self._workers > 1 and self._fields:
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self._workers)
+
+    @property
+    def fields(self) -> List[int]:
+        """The positions of the fields whose types are guessed.
+        """
+        return self._fields
+
+    def add(self, batch: RecordBatch) -> None:
+        if not self._fields or not len(batch):
+            return
+        columns: List[np.ndarray] = [batch.column_at(i) for i in self._fields]
+        if self._executor is None:
+            self._merge(_guess_columns(columns))
+            return
+        while len(self._pending) >= self._workers * 2:
+            self._merge(self._pending.popleft().result())
+        self._pending.append(self._executor.submit(_guess_columns, columns))
+
+    def schema(self) -> FieldSchema:
+        """Waits for every chunk to be guessed and returns the schema with the guessed types.
+        """
+        self.close()
+        fields: List[Field] = list(self._schema)
+        for i, guess in zip(self._fields, self._guesses):
+            fields[i] = guess.field(fields[i])
+        return FieldSchema(fields)
+
+    def close(self) -> None:
+        try:
+            while self._pending:
+                self._merge(self._pending.popleft().result())
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def _merge(self, guesses: List[TypeGuess]) -> None:
+        for guess, other in zip(self._guesses, guesses):
+            guess.merge(other)
+
+
+def _guess_columns(columns: List[np.ndarray]) -> List[TypeGuess]:
+    """Guesses the types of the columns of one chunk. Runs in a worker process.
+    """
+    return [TypeGuess.of(column) for column in columns]
@@ -14,17 +14,51 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import hashlib
+import io
 import os
 import subprocess
+from contextlib import contextmanager
 import xml.etree.ElementTree as ET
-from typing import Dict, OrderedDict, List, Any
-from xml.dom import minidom
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, OrderedDict, List, Any, Callable, Iterable, Iterator, Optional, Tuple, Union, TextIO
 import xmltodict
 
 from .connection import Connection
-from .decorators import newobj
-from .tool import Tool, ToolPosition
+from .connection_graph import ConnectionGraph
+from .decorators import in_place, newobj
+from .field_schema import FieldSchema
+from .schema_propagation import SchemaPropagator
+from .tool import Tool, ToolConnection, ToolPosition, ToolSource
 from .tool_factory import ToolFactory
+from .tool_id_allocator import ToolIdAllocator
+from .workflow_cache import WorkflowCache
+from .workflow_diff import WorkflowDiff
+from .workflow_graph import Lineage, WorkflowGraph
+from .workflow_layout import LayeredLayout
+from .workflow_reader import WorkflowReader, WorkflowSource
+from .xml_writer import XmlWriter, to_elements
+
+
+WORKFLOW_EXTENSIONS: Tuple[str, ...] = ('.yxmd', '.yxmc', '.yxwz')
+
+
+@dataclass
+class ReadResult:
+    """
+    The outcome of reading one file with Workflow.read_many: either the workflow or the error raised reading it.
+    """
+    filename: str = ''
+    workflow: Optional['Workflow'] = None
+    error: Optional[BaseException] = None
+
+
+def _read_state(filename: str, cache_dir: Optional[str], cache_size: int) -> Tuple:
+    """Reads a workflow in a worker process and returns it in the compact form used to send it back.
+    """
+    return Workflow.read(filename, cache_dir, cache_size)._state()
 
 
 class Workflow:
@@ -55,8 +89,13 @@ class Workflow:
         self._filename: str = ''
         self._yxmd_version: str = ''
         self._tools: Dict[int, Tool] = dict({})
-        self._connections: List[Connection] = list()
+        self._connections: ConnectionGraph = ConnectionGraph()
         self._properties: OrderedDict[Any, Any] = dict({})
+        self._source: Optional[WorkflowSource] = None
+        self._graph: Dict[str, Any] = dict({})
+        self._tool_ids: ToolIdAllocator = ToolIdAllocator()
+        self._boundary_connections: List[Connection] = list()
+        self._schemas: SchemaPropagator = SchemaPropagator()
 
     @property
     def name(self) -> str:
@@ -89,14 +128,19 @@ class Workflow:
     @tools.setter
     def tools(self, value: Dict[int, Tool]) -> None:
         self._tools = value
+        self._graph = dict({})
+        self._schemas = SchemaPropagator()
+        self._tool_ids = ToolIdAllocator(value)
 
     @property
-    def connections(self) -> List[Connection]:
+    def connections(self) -> ConnectionGraph:
         return self._connections
 
     @connections.setter
-    def connections(self, value: List[Connection]) -> None:
-        self._connections = value
+    def connections(self, value: Iterable[Connection]) -> None:
+        self._connections = value if isinstance(value, ConnectionGraph) else ConnectionGraph(value)
+        self._graph = dict({})
+        self._schemas = SchemaPropagator()
 
     @property
     def properties(self) -> OrderedDict[Any, Any]:
@@ -106,6 +150,63 @@ class Workflow:
     def properties(self, value: OrderedDict[Any, Any]) -> None:
         self._properties = value
 
+    @property
+    def source(self) -> Optional[WorkflowSource]:
+        """The XML around the nodes and connections of the file this workflow was read from, if any.
+        """
+        return self._source
+
+    @source.setter
+    def source(self, value: Optional[WorkflowSource]) -> None:
+        self._source = value
+
+    @property
+    def boundary_connections(self) -> List[Connection]:
+        """For a workflow made by extract, the connections between its tools and tools that were not extracted.
+
+        Tool IDs are those of the workflow it was extracted from. Empty for any other workflow.
+        """
+        return self._boundary_connections
+
+    @contextmanager
+    def batch(self) -> Iterator['Workflow']:
+        """Returns a context in which fluent methods edit the workflow and its tools in place.
+
+        Inside the context, methods such as add_tool, add_connection and Tool.add_input modify the object they
+        are called on and return it, instead of returning a modified copy. This avoids copying an object for
+        every edit when building or changing large workflows:
+
+            with workflow.batch() as wf:
+                for tool in tools:
+                    wf.add_tool(tool)
+
+        The context applies to every object in the current thread while it is open. Graph analysis results are
+        recomputed once on the next query after it closes.
+
+        If the block raises, the tools and connections of the workflow, and the inputs and outputs of its tools,
+        are put back as they were when the context was opened. Other changes made to tools in the block, such as
+        to their properties, are kept.
+        """
+        tools: Dict[int, Tool] = dict(self._tools)
+        connections: List[Connection] = list(self._connections)
+        links: List[Tuple[Tool, List[ToolConnection], List[ToolConnection]]] = \
+            [(tool, list(tool.inputs), list(tool.outputs)) for tool in tools.values()]
+        try:
+            with in_place():
+                yield self
+        except BaseException:
+            self._tools.clear()
+            self._tools.update(tools)
+            self._connections.clear()
+            self._connections.extend(connections)
+            for tool, inputs, outputs in links:
+                tool.inputs[:] = inputs
+                tool.outputs[:] = outputs
+            self._schemas.clear()
+            raise
+        finally:
+            self._graph.clear()
+
     @newobj
     def add_tool(self, tool: Tool) -> '__class__':
         """Adds the provided Tool instance to the workflow.
@@ -113,14 +214,23 @@ class Workflow:
         If a tool with the same ID exists in the workflow, the provided tool will replace it.
         """
         self.tools[tool.tool_id] = tool
+        self._tool_ids.observe(tool.tool_id)
+        self._graph.clear()
+        self._schemas.invalidate(tool.tool_id)
 
     @newobj
     def remove_tool(self, tool_id: int) -> '__class__':
         """Removes the tool with the provided ID from the workflow.
 
-        If a tool with the provided ID does not exist in the workflow, no action is taken.
+        Connections to and from the tool are removed along with it. If a tool with the provided ID does not exist
+        in the workflow, no action is taken.
         """
         self.tools.pop(tool_id, None)
+        self._graph.clear()
+        self._schemas.invalidate(tool_id)
+        for c in self.connections.remove_tool(tool_id):
+            self._unlink(c)
+            self._schemas.invalidate(c.destination_tool_id)
 
     @newobj
     def add_connection(self, origin_tool_id: int, origin_output: str,
@@ -128,25 +238,249 @@ class Workflow:
         """Adds a connection from the origin tool to the destination tool.
         """
         self.connections.append(Connection(origin_tool_id, origin_output, destination_tool_id, destination_input))
+        self._schemas.invalidate(destination_tool_id)
 
     @newobj
     def remove_connection(self, origin_tool_id: int, origin_output: str,
                           destination_tool_id: int, destination_input: str) -> '__class__':
         """Removes a connection from the workflow.
         """
-        for c in self.connections:
-            if c.origin_tool_id == origin_tool_id and c.origin_output == origin_output and \
-               c.destination_tool_id == destination_tool_id and c.destination_input == destination_input:
-                self.connections.remove(c)
+        for c in self.connections.remove_matching(origin_tool_id, origin_output, destination_tool_id,
+                                                  destination_input):
+            self._unlink(c)
+            self._schemas.invalidate(destination_tool_id)
+
+    def _unlink(self, connection: Connection) -> None:
+        """Drops a removed connection from the inputs and outputs lists of the tools it linked.
+        """
+        origin: Optional[Tool] = self.tools.get(connection.origin_tool_id)
+        if origin is not None:
+            origin.outputs[:] = [o for o in origin.outputs
+                                 if (o.tool_id, o.output, o.input) != (connection.destination_tool_id,
+                                                                      connection.origin_output,
+                                                                      connection.destination_input)]
+        destination: Optional[Tool] = self.tools.get(connection.destination_tool_id)
+        if destination is not None:
+            destination.inputs[:] = [i for i in destination.inputs
+                                     if (i.tool_id, i.output, i.input) != (connection.origin_tool_id,
+                                                                          connection.origin_output,
+                                                                          connection.destination_input)]
+
+    def connections_from(self, tool_id: int) -> List[Connection]:
+        """Returns the connections from the outputs of a tool.
+        """
+        return self.connections.outgoing(tool_id)
+
+    def connections_to(self, tool_id: int) -> List[Connection]:
+        """Returns the connections to the inputs of a tool.
+        """
+        return self.connections.incoming(tool_id)
+
+    def successors(self, tool_id: int) -> List[int]:
+        """Returns the IDs of the tools connected to the outputs of a tool, without duplicates.
+        """
+        return list(dict.fromkeys(c.destination_tool_id for c in self.connections.outgoing(tool_id)))
+
+    def predecessors(self, tool_id: int) -> List[int]:
+        """Returns the IDs of the tools connected to the inputs of a tool, without duplicates.
+        """
+        return list(dict.fromkeys(c.origin_tool_id for c in self.connections.incoming(tool_id)))
+
+    def graph(self) -> WorkflowGraph:
+        """Returns a graph analysis of the current tools and connections.
+
+        The analysis is kept and its results reused until tools or connections are added or removed.
+        """
+        key: Tuple[int, int, int] = (len(self.tools), id(self.connections), self.connections.version)
+        if self._graph.get('key') != key:
+            self._graph['graph'] = WorkflowGraph(self.tools, self.connections)
+            self._graph['key'] = key
+        return self._graph['graph']
+
+    def topological_order(self) -> List[int]:
+        """Returns the tool IDs ordered so that every tool comes after the tools connected to its inputs.
+
+        Raises ValueError if the workflow has a cycle.
+        """
+        return self.graph().topological_order()
+
+    def upstream(self, tool_id: int) -> FrozenSet[int]:
+        """Returns the IDs of every tool whose output reaches the given tool.
+        """
+        return self.graph().upstream(tool_id)
+
+    def downstream(self, tool_id: int) -> FrozenSet[int]:
+        """Returns the IDs of every tool the output of the given tool reaches.
+        """
+        return self.graph().downstream(tool_id)
+
+    def upstream_all(self) -> Lineage:
+        """Returns a mapping of every tool ID to upstream() of that tool, computed in a single pass.
+        """
+        return self.graph().upstream_all()
+
+    def downstream_all(self) -> Lineage:
+        """Returns a mapping of every tool ID to downstream() of that tool, computed in a single pass.
+        """
+        return self.graph().downstream_all()
+
+    def find_cycles(self) -> List[List[int]]:
+        """Returns the tool IDs of each group of tools that are connected in a cycle.
+        """
+        return self.graph().find_cycles()
+
+    def sources(self) -> List[int]:
+        """Returns the IDs of the tools with no incoming connections.
+        """
+        return self.graph().sources()
+
+    def sinks(self) -> List[int]:
+        """Returns the IDs of the tools with no outgoing connections.
+        """
+        return self.graph().sinks()
+
+    def extract(self, tool_ids: Iterable[int]) -> 'Workflow':
+        """Returns a new workflow containing copies of the given tools and the connections between them.
+
+        Connections between the given tools and the rest of the workflow are kept in boundary_connections of the
+        result, so that splice can wire the fragment up again. Tool IDs are unchanged. Takes time proportional to
+        the number of tools extracted and their connections.
+        """
+        fragment: Workflow = Workflow()
+        fragment.name = self.name
+        fragment.yxmd_version = self.yxmd_version
+        selected: Dict[int, Tool] = {tool_id: self.tools[tool_id] for tool_id in tool_ids}
+        with fragment.batch():
+            for tool_id, tool in selected.items():
+                fragment.add_tool(tool.copy())
+            for tool_id in selected:
+                for c in self.connections.outgoing(tool_id):
+                    if c.destination_tool_id in selected:
+                        fragment._add_items([Connection(*c._values(), source=c.source)])
+                    else:
+                        fragment.boundary_connections.append(Connection(*c._values()))
+                fragment.boundary_connections.extend(Connection(*c._values())
+                                                     for c in self.connections.incoming(tool_id)
+                                                     if c.origin_tool_id not in selected)
+        return fragment
+
+    def splice(self, fragment: 'Workflow', connect: Optional[Dict[int, int]] = None,
+               offset: Optional[ToolPosition] = None) -> Dict[int, int]:
+        """Adds copies of the tools and connections of fragment to this workflow, giving the tools new IDs.
+
+        Returns the table mapping each tool ID in fragment to the ID of its copy. If connect is given, it maps
+        the IDs of outside tools in fragment.boundary_connections to tools in this workflow, and each boundary
+        connection whose outside tool is in connect is recreated between the copy and the mapped tool. If offset
+        is given, it is added to the positions of the copies. Takes time proportional to the size of fragment,
+        independent of the size of this workflow.
+        """
+        mapping: Dict[int, int] = dict(zip(fragment.tools, self.reserve_tool_ids(len(fragment.tools))))
+        connections: List[Connection] = [Connection(mapping[c.origin_tool_id], c.origin_output,
+                                                    mapping[c.destination_tool_id], c.destination_input)
+                                         for c in fragment.connections]
+        for c in fragment.boundary_connections if connect else ():
+            if c.origin_tool_id in mapping and c.destination_tool_id in connect:
+                connections.append(Connection(mapping[c.origin_tool_id], c.origin_output,
+                                              connect[c.destination_tool_id], c.destination_input))
+            elif c.destination_tool_id in mapping and c.origin_tool_id in connect:
+                connections.append(Connection(connect[c.origin_tool_id], c.origin_output,
+                                              mapping[c.destination_tool_id], c.destination_input))
+
+        with self.batch():
+            for tool_id, tool in fragment.tools.items():
+                new_tool: Tool = tool.copy(mapping[tool_id])
+                if offset is not None:
+                    new_tool.position = ToolPosition(x=new_tool.position.x + offset.x,
+                                                     y=new_tool.position.y + offset.y)
+                self.add_tool(new_tool)
+            self._add_items(connections)
+        return mapping
+
+    def content_hash(self, include_position: bool = False) -> str:
+        """Returns a hash of the tools, connections, version and properties of the workflow.
+
+        Built from Tool.content_hash of each tool and its ID, so it is cheap to recompute after a few tools have
+        changed. Positions are only included if include_position is True. The name and file name are not
+        included.
+        """
+        content = hashlib.sha1()
+        content.update(f"{self.yxmd_version}\0".encode('utf-8'))
+        for tool_id in sorted(self.tools):
+            content.update(f"{tool_id}:{self.tools[tool_id].content_hash(include_position)}\0".encode('utf-8'))
+        for connection in sorted(c._values() for c in self.connections):
+            content.update(f"{connection}\0".encode('utf-8'))
+        text = io.StringIO()
+        writer = XmlWriter(text)
+        writer.value('Properties', self.properties, 0)
+        writer.flush()
+        content.update(text.getvalue().encode('utf-8'))
+        return content.hexdigest()
+
+    def diff(self, other: 'Workflow', include_position: bool = False) -> WorkflowDiff:
+        """Returns the tools and connections added, removed or changed in other compared with this workflow.
+
+        Tools are compared by content hash, so a tool counts as changed only if its plugin, properties or engine
+        settings differ, or its position if include_position is True. Takes time proportional to the number of
+        tools and connections, plus the time to hash any tools whose hash is not already known. Tools that were
+        read with identical Properties XML and not accessed since are compared without hashing.
+        """
+        result: WorkflowDiff = WorkflowDiff()
+        for tool_id, tool in self.tools.items():
+            other_tool: Optional[Tool] = other.tools.get(tool_id)
+            if other_tool is None:
+                result.removed_tools.append(tool_id)
+            elif other_tool is not tool and not tool.same_content(other_tool, include_position):
+                result.changed_tools.append(tool_id)
+        result.added_tools = [tool_id for tool_id in other.tools if tool_id not in self.tools]
+
+        before: Counter = Counter(c._values() for c in self.connections)
+        after: Counter = Counter(c._values() for c in other.connections)
+        result.removed_connections = [Connection(*values) for values in (before - after).elements()]
+        result.added_connections = [Connection(*values) for values in (after - before).elements()]
+        return result
+
+    def output_schemas(self, tool_id: int) -> Dict[str, FieldSchema]:
+        """Returns the fields on each output of a tool, keyed by output name.
+
+        Select, Autofield, Filter and Sort tools get their fields from their input and configuration, so the
+        result reflects changes made since the workflow was last saved by Designer. Other tools use their MetaInfo.
+        Results are kept, and recomputed only for tools downstream of a change. Changes made by editing the
+        properties of a tool in place are not seen until invalidate_schemas is called for that tool.
+        """
+        return self._schemas.schemas(tool_id, self.tools, self.connections)
+
+    def output_schema(self, tool_id: int, output: str = 'Output') -> Optional[FieldSchema]:
+        """Returns the fields on one output of a tool, or None if they are not known.
+        """
+        return self.output_schemas(tool_id).get(output)
+
+    def connection_schema(self, connection: Connection) -> Optional[FieldSchema]:
+        """Returns the fields passed along a connection, or None if they are not known.
+        """
+        return self.output_schema(connection.origin_tool_id, connection.origin_output)
+
+    def invalidate_schemas(self, tool_id: int) -> None:
+        """Makes the next schema query recompute the schemas of a tool and everything downstream of it.
+
+        Needed after the properties of a tool have been edited in place.
+        """
+        self._schemas.invalidate(tool_id)
 
     def get_new_tool_id(self) -> int:
         """Gets a new unique tool ID.
 
         The tool ID is unique at the time it is retrieved. If another tool with the same ID is added to the
-        workflow, this ID will no longer be unique.
+        workflow, this ID will no longer be unique. IDs of removed tools are not handed out again.
         """
-        max_tool_id: int = max(k for k, _ in self.tools.items())
-        return max_tool_id + 1
+        return self._tool_ids.peek(self.tools)
+
+    def reserve_tool_ids(self, count: int) -> range:
+        """Reserves count consecutive unique tool IDs for tools that will be added later.
+
+        Reserved IDs are not returned by get_new_tool_id or reserved again, even before tools using them are
+        added.
+        """
+        return self._tool_ids.reserve(count, self.tools)
 
     def position_left(self, tool_id: int, padding: int = 100) -> ToolPosition:
         return ToolPosition(x=self.tools[tool_id].position.x - padding, y=self.tools[tool_id].position.y)
@@ -160,6 +494,24 @@ class Workflow:
     def position_below(self, tool_id: int, padding: int = 100) -> ToolPosition:
         return ToolPosition(x=self.tools[tool_id].position.x, y=self.tools[tool_id].position.y + padding)
 
+    @newobj
+    def auto_layout(self, tool_ids: Optional[Iterable[int]] = None, horizontal_spacing: int = 100,
+                    vertical_spacing: int = 100, origin: Optional[ToolPosition] = None) -> '__class__':
+        """Positions tools automatically so that data flows from left to right with few crossing connections.
+
+        If tool_ids is None, every tool in the workflow is positioned in columns starting at origin. Otherwise
+        only the given tools are moved, typically ones just added, and are fitted in next to the tools they are
+        connected to without overlapping any other tool.
+        """
+        layout: LayeredLayout = LayeredLayout(horizontal_spacing, vertical_spacing, origin=origin)
+        if tool_ids is None:
+            positions: Dict[int, ToolPosition] = layout.layout(self.tools, self.connections)
+        else:
+            positions = layout.place({tool_id: tool.position for tool_id, tool in self.tools.items()},
+                                     (tool_id for tool_id in tool_ids if tool_id in self.tools), self.connections)
+        for tool_id, position in positions.items():
+            self.tools[tool_id].position = position
+
     def toxml(self) -> ET.Element:
         """Returns an XML representation of the workflow.
         """
@@ -174,89 +526,239 @@ class Workflow:
         for connection in self.connections:
             connections.extend(connection.toxml())
 
-        xml: str = xmltodict.unparse({'Root': {'Properties': self.properties}})
-        properties: ET.Element = ET.fromstring(xml)
-        ayx_doc.extend(properties)
+        ayx_doc.extend(to_elements('Properties', self.properties))
 
         return ayx_doc
 
+    def write_xml(self, stream: TextIO, preserve_source: bool = True) -> None:
+        """Writes the workflow as indented XML to a text stream in a single pass.
+
+        If preserve_source is True, every tool, connection and set of workflow properties that has not changed
+        since the workflow was read is copied verbatim from the file it was read from, so that saving an edited
+        workflow only changes the XML of what was edited.
+        """
+        source: Optional[WorkflowSource] = self._source if preserve_source else None
+
+        writer: XmlWriter = XmlWriter(stream)
+        if source is not None and source.prolog and source.yxmd_version == self.yxmd_version:
+            writer.source(source.prolog, 0)
+        else:
+            writer.declaration()
+            writer.start('AlteryxDocument', {'yxmdVer': self.yxmd_version}, 0)
+
+        if self.tools:
+            self._write_start_tag(writer, 'Nodes', source.nodes_tag if source is not None else b'')
+            for _, tool_val in self.tools.items():
+                tool_val.write_xml(writer, 2, preserve_source)
+            writer.end('Nodes', 1)
+        else:
+            self._write_empty_tag(writer, 'Nodes', source.nodes_tag if source is not None else b'')
+
+        if self.connections:
+            self._write_start_tag(writer, 'Connections', source.connections_tag if source is not None else b'')
+            for connection in self.connections:
+                connection.write_xml(writer, 2, preserve_source)
+            writer.end('Connections', 1)
+        else:
+            self._write_empty_tag(writer, 'Connections', source.connections_tag if source is not None else b'')
+
+        if source is not None and source.properties is not None and \
+           self.properties == xmltodict.parse(source.properties)['Properties']:
+            writer.source(source.properties, 1)
+        else:
+            writer.value('Properties', self.properties, 1)
+
+        if source is not None:
+            writer.raw('</AlteryxDocument>' + source.epilogue.decode('utf-8'))
+        else:
+            writer.end('AlteryxDocument', 0)
+        writer.flush()
+
+    @staticmethod
+    def _write_start_tag(writer: XmlWriter, tag: str, source_tag: bytes) -> None:
+        if source_tag and not source_tag.endswith(b'/>'):
+            writer.source(source_tag, 1)
+        else:
+            writer.start(tag, {}, 1)
+
+    @staticmethod
+    def _write_empty_tag(writer: XmlWriter, tag: str, source_tag: bytes) -> None:
+        if source_tag.endswith(b'/>'):
+            writer.source(source_tag, 1)
+        else:
+            writer.empty(tag, {}, 1)
+
     @staticmethod
-    def write(workflow: '__class__', filename: str, overwrite: bool = True) -> None:
+    def write(workflow: '__class__', filename: str, overwrite: bool = True, preserve_source: bool = True) -> None:
         """Writes the workflow to a file, overwriting an existing file desired.
 
         If no filename has been set, the workflow name is used. If overwrite
         is True, then any existing file with the same name will be overwritten.
         If overwrite is False and a file exists with the same name, this
         method will raise an exception.
+
+        If preserve_source is True, parts of the workflow that have not changed
+        since it was read are written exactly as they appeared in the source file.
         """
         if not overwrite and os.path.isfile(filename):
             raise FileExistsError(f"File '{filename}' already exists and overwrite is false")
 
-        pretty_xml = str(workflow)
-
         with open(filename, 'w') as f:
-            f.write(pretty_xml)
+            workflow.write_xml(f, preserve_source)
 
     @staticmethod
-    def read(filename: str) -> '__class__':
+    def read(filename: str, cache_dir: Optional[str] = None,
+             cache_size: int = WorkflowCache.DEFAULT_MAX_SIZE) -> '__class__':
         """Reads a workflow from the specified file and configures this instance accordingly.
-        """
-        workflow: Workflow = Workflow()
-        workflow.filename = filename
-        with open(filename) as wf:
-            xml = xmltodict.parse(wf.read())
 
-            ayx_doc = xml['AlteryxDocument']
-            try:
-                workflow.name = ayx_doc['Properties']['MetaInfo']['Name']
-            except KeyError:
-                workflow.name = 'New Workflow'
+        The file is parsed incrementally by a WorkflowReader, so peak memory grows with the largest node in the
+        file rather than with the size of the file.
 
-            workflow.yxmd_version = ayx_doc['@yxmdVer']
+        If cache_dir is provided, the parsed workflow is stored in a WorkflowCache in that directory, limited to
+        cache_size bytes. Later reads of the same unchanged file, from this or any other process, load the cached
+        form without parsing any XML.
+        """
+        cache: Optional[WorkflowCache] = WorkflowCache(cache_dir, cache_size) if cache_dir is not None else None
+        if cache is not None:
+            key: Tuple[str, int, int, str] = cache.key(filename)
+            state: Optional[Tuple] = cache.get(key)
+            if state is not None:
+                return Workflow._from_state(filename, state)
 
-            nodes = ayx_doc['Nodes']
-            for node in nodes['Node']:
-                tool_id: int = int(node['@ToolID'])
+        workflow: Workflow = Workflow()
+        workflow.filename = filename
 
-                gui_settings = node['GuiSettings']
-                plugin = gui_settings['@Plugin']
+        reader: WorkflowReader = WorkflowReader(filename)
+        workflow._add_items(reader)
+        workflow._set_document(reader.yxmd_version, reader.properties, reader.source)
 
-                tool: Tool = ToolFactory.create_tool(plugin, tool_id)
+        if cache is not None:
+            cache.put(key, workflow._state())
 
-                position = gui_settings['Position']
-                tool.position = ToolPosition(x=int(position['@x']), y=int(position['@y']))
+        return workflow
 
-                tool.properties = node['Properties']
+    def _add_items(self, items: Iterable[Union[Tool, Connection]]) -> None:
+        with self.batch():
+            for item in items:
+                if isinstance(item, Connection):
+                    self.connections.append(item)
+                    self._schemas.invalidate(item.destination_tool_id)
+                    self.tools[item.origin_tool_id].add_output(item.destination_tool_id,
+                                                               item.origin_output,
+                                                               item.destination_input)
+                    self.tools[item.destination_tool_id].add_input(item.origin_tool_id,
+                                                                   item.origin_output,
+                                                                   item.destination_input)
+                else:
+                    self.add_tool(item)
+
+    def _set_document(self, yxmd_version: str, properties: Any, source: Optional[WorkflowSource]) -> None:
+        self.yxmd_version = yxmd_version
+        self.properties = properties
+        self.source = source
+        try:
+            self.name = self.properties['MetaInfo']['Name']
+        except (KeyError, TypeError):
+            self.name = 'New Workflow'
+
+    def _state(self) -> Tuple:
+        """Returns a compact, picklable form of a workflow that has just been read from a file.
+
+        Tools are reduced to the fields of their ToolSource and connections to plain tuples, so restoring the
+        workflow from this form needs no XML parsing.
+        """
+        tools = tuple((s.xml, s.properties_start, s.properties_end, s.tool_id, s.plugin, s.x, s.y, s.engine_dll,
+                       s.engine_dll_entry_point) for s in (tool.source for tool in self.tools.values()))
+        connections = tuple((c.origin_tool_id, c.origin_output, c.destination_tool_id, c.destination_input,
+                             c.source) for c in self.connections)
+        source: WorkflowSource = self.source
+        return (self.yxmd_version, self.properties,
+                (source.prolog, source.yxmd_version, source.nodes_tag, source.connections_tag, source.properties,
+                 source.epilogue),
+                tools, connections)
 
-                engine_settings = node['EngineSettings']
-                tool.engine_dll = engine_settings['@EngineDll']
-                tool.engine_dll_entry_point = engine_settings['@EngineDllEntryPoint']
+    @staticmethod
+    def _from_state(filename: str, state: Tuple) -> '__class__':
+        """Restores a workflow from the form returned by _state.
+        """
+        yxmd_version, properties, source, tools, connections = state
 
-                workflow.add_tool(tool)
+        workflow: Workflow = Workflow()
+        workflow.filename = filename
+        workflow._add_items(ToolFactory.create_from_source(ToolSource(*tool)) for tool in tools)
+        workflow._add_items(Connection(*connection) for connection in connections)
+        workflow._set_document(yxmd_version, properties, WorkflowSource(*source))
+        return workflow
 
-            connections = ayx_doc['Connections']
-            for connection in connections['Connection']:
-                origin = connection['Origin']
-                origin_tool_id: int = int(origin['@ToolID'])
-                origin_connection: str = origin['@Connection']
+    @staticmethod
+    def iterread(filename: str) -> Iterator[Union[Tool, Connection]]:
+        """Yields each tool and connection in the specified file as soon as it has been parsed.
 
-                destination = connection['Destination']
-                destination_tool_id: int = int(destination['@ToolID'])
-                destination_connection: str = destination['@Connection']
+        Nothing is retained between items, which makes this suitable for scanning very large workflows without
+        building a Workflow instance.
+        """
+        return iter(WorkflowReader(filename))
 
-                workflow.add_connection(origin_tool_id, origin_connection,
-                                    destination_tool_id, destination_connection)
+    @staticmethod
+    def read_many(paths: Iterable[str], workers: Optional[int] = None, cache_dir: Optional[str] = None,
+                  cache_size: int = WorkflowCache.DEFAULT_MAX_SIZE) -> Iterator[ReadResult]:
+        """Reads many workflows in parallel, yielding a ReadResult for each file as soon as it has been read.
 
-                workflow.tools[origin_tool_id].add_output(destination_tool_id,
-                                                          origin_connection,
-                                                          destination_connection)
-                workflow.tools[destination_tool_id].add_input(origin_tool_id,
-                                                              origin_connection,
-                                                              destination_connection)
+        Any path that is a directory is searched recursively for workflow, macro and app files. Files are parsed
+        in a pool of worker processes (os.cpu_count() of them unless workers is given, or none at all if workers
+        is 1) and results arrive in completion order, not in the order of paths. An error reading one file is
+        returned in its ReadResult and does not stop the others.
 
-            workflow.properties = ayx_doc['Properties']
+        Workers send each workflow back in the same compact form used by WorkflowCache, which is much cheaper
+        to transfer than the Workflow object graph. cache_dir and cache_size are passed on to Workflow.read.
+        """
+        filenames: Iterator[str] = Workflow.find_files(paths)
+
+        if workers == 1:
+            for filename in filenames:
+                try:
+                    yield ReadResult(filename, Workflow.read(filename, cache_dir, cache_size))
+                except Exception as e:
+                    yield ReadResult(filename, error=e)
+            return
+
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: Dict[Future, str] = dict({})
+            exhausted: bool = False
+            while pending or not exhausted:
+                # Only keep a few files per worker in flight, so directories are walked as results are consumed
+                while not exhausted and len(pending) < workers * 4:
+                    filename: Optional[str] = next(filenames, None)
+                    if filename is None:
+                        exhausted = True
+                    else:
+                        pending[executor.submit(_read_state, filename, cache_dir, cache_size)] = filename
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    filename = pending.pop(future)
+                    try:
+                        yield ReadResult(filename, Workflow._from_state(filename, future.result()))
+                    except Exception as e:
+                        yield ReadResult(filename, error=e)
 
-        return workflow
+    @staticmethod
+    def find_files(paths: Iterable[str]) -> Iterator[str]:
+        """Yields each path that is a file, and every workflow, macro and app file in each path that is a directory.
+        """
+        for path in paths:
+            if os.path.isdir(path):
+                for directory, subdirectories, files in os.walk(path):
+                    subdirectories.sort()
+                    for file in sorted(files):
+                        if os.path.splitext(file)[1].lower() in WORKFLOW_EXTENSIONS:
+                            yield os.path.join(directory, file)
+            else:
+                yield path
 
     @staticmethod
     def run(filename: str, executable_path: str, overwrite: bool = True) -> None:
@@ -271,8 +773,25 @@ class Workflow:
         process = subprocess.Popen(cmd, stdout=subprocess.PIPE, creationflags=0x08000000)
         process.wait()
 
+    def run_local(self, batch_size: int = 65536, resolve_path: Optional[Callable[[str], str]] = None,
+                  threads: int = 1, cache_dir: Optional[str] = None, cache_size: Optional[int] = None) -> Any:
+        """Runs the workflow with the local engine, which needs numpy, and returns its ExecutionResult.
+
+        Only Input, Select, Autofield, Filter, Sort and Output tools reading and writing delimited text files are
+        supported. See Engine for how file names are resolved and how tools are run with more than one thread.
+
+        If cache_dir is provided, the result of every tool is stored in a ResultCache in that directory, limited
+        to cache_size bytes, and later runs only re-run the tools that changed since.
+        """
+        # Imported here so that numpy is only needed by code that runs workflows
+        from .engine import Engine
+        from .result_cache import ResultCache
+        cache: Optional[ResultCache] = None
+        if cache_dir is not None:
+            cache = ResultCache(cache_dir, cache_size or ResultCache.DEFAULT_MAX_SIZE)
+        return Engine(self, batch_size=batch_size, resolve_path=resolve_path, threads=threads, cache=cache).run()
+
     def __repr__(self) -> str:
-        xml = self.toxml()
-        text = ET.tostring(xml, 'utf-8')
-        parsed = minidom.parseString(text)
-        return parsed.toprettyxml(indent='  ').replace('&quot;', '"')
+        text = io.StringIO()
+        self.write_xml(text)
+        return text.getvalue()
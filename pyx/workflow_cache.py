@@ -0,0 +1,157 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Any, List, Optional, Tuple
+
+from . import __version__
+
+
+class WorkflowCache:
+    """
+    On-disk cache of parsed workflows, shared between processes.
+
+    Each entry is stored in its own file named after the absolute path of the workflow it was parsed from. An entry
+    is only used if the path, modification time and size of the workflow file and the pyx version all match the
+    ones it was stored with. Reading an entry marks it as recently used, and the least recently used entries are
+    removed whenever the cache grows beyond max_size bytes.
+
+    The size of the cache is counted once, on the first put, and then kept as a running total, so the directory is
+    only scanned again when that total goes over max_size. Entries added by other processes in the meantime are
+    picked up by that scan.
+    """
+    DEFAULT_MAX_SIZE: int = 256 * 1024 * 1024
+    SUFFIX: str = '.pyxc'
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE):
+        self._directory: str = directory
+        self._max_size: int = max_size
+        self._total: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @staticmethod
+    def key(filename: str) -> Tuple[str, int, int, str]:
+        """Returns the key a workflow file is cached under: its absolute path, mtime, size and the pyx version.
+        """
+        path: str = os.path.abspath(filename)
+        stat: os.stat_result = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size, __version__
+
+    def get(self, key: Tuple[str, int, int, str]) -> Optional[Any]:
+        """Returns the cached state stored under key, or None if there is no valid entry.
+        """
+        entry: str = self._entry(key)
+        try:
+            with open(entry, 'rb') as f:
+                stored_key, state = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+            return None
+
+        if stored_key != key:
+            return None
+
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return state
+
+    def put(self, key: Tuple[str, int, int, str], state: Any) -> None:
+        """Stores state under key, then evicts least recently used entries if the cache is over its size limit.
+
+        The entry is written to a temporary file and moved into place, so concurrent readers never see a
+        partially written entry.
+        """
+        if self._total is None:
+            self._total = sum(size for _, size, _ in self._entries())
+
+        entry: str = self._entry(key)
+        fd, temp = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((key, state), f, protocol=pickle.HIGHEST_PROTOCOL)
+                size: int = f.tell()
+            replaced: int = self._size(entry)
+            os.replace(temp, entry)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+
+        self._total += size - replaced
+        if self._total > self._max_size:
+            self._evict()
+
+    def clear(self) -> None:
+        """Removes every entry from the cache.
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._total = 0
+
+    def _entry(self, key: Tuple[str, int, int, str]) -> str:
+        name: str = hashlib.sha1(key[0].encode('utf-8')).hexdigest()
+        return os.path.join(self._directory, name + self.SUFFIX)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries: List[Tuple[float, int, str]] = list()
+        with os.scandir(self._directory) as it:
+            for entry in it:
+                if entry.name.endswith(self.SUFFIX):
+                    try:
+                        stat: os.stat_result = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return 0
+
+    def _evict(self) -> None:
+        entries: List[Tuple[float, int, str]] = self._entries()
+        total: int = sum(size for _, size, _ in entries)
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self._max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._total = total
@@ -0,0 +1,40 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from dataclasses import dataclass, field
+from typing import List
+
+from .connection import Connection
+
+
+@dataclass
+class WorkflowDiff:
+    """
+    The differences between two versions of a workflow, as returned by Workflow.diff.
+
+    Tools are matched by tool ID. A tool is changed if its content hash differs between the versions.
+    Connections are matched on all four of their values, so a connection that was moved shows up as one removed
+    and one added.
+    """
+    added_tools: List[int] = field(default_factory=list)
+    removed_tools: List[int] = field(default_factory=list)
+    changed_tools: List[int] = field(default_factory=list)
+    added_connections: List[Connection] = field(default_factory=list)
+    removed_connections: List[Connection] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not (self.added_tools or self.removed_tools or self.changed_tools or self.added_connections or
+                    self.removed_connections)
@@ -0,0 +1,264 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from collections import deque
+from collections.abc import Mapping
+from itertools import compress
+from typing import Deque, Dict, FrozenSet, List, Iterable, Iterator, Optional
+
+from .connection import Connection
+
+_BITS = bytes.maketrans(b'01', b'\x00\x01')
+
+
+class Lineage(Mapping):
+    """
+    Read-only mapping of tool ID to the set of tool IDs it reaches, as returned by WorkflowGraph.upstream_all and
+    downstream_all.
+
+    The sets are held as bitsets, one per strongly connected component, and only turned into sets of tool IDs
+    when looked up, so building the mapping does not cost time proportional to the total size of the sets.
+    """
+
+    def __init__(self, ids: List[int], component_of: List[int], reached: List[int]):
+        self._ids: List[int] = ids
+        self._index: Dict[int, int] = {tool_id: i for i, tool_id in enumerate(ids)}
+        self._component_of: List[int] = component_of
+        self._reached: List[int] = reached
+        self._decoded: Dict[int, FrozenSet[int]] = dict({})
+
+    def __getitem__(self, tool_id: int) -> FrozenSet[int]:
+        component: int = self._component_of[self._index[tool_id]]
+        result: Optional[FrozenSet[int]] = self._decoded.get(component)
+        if result is None:
+            digits: bytes = bin(self._reached[component])[:1:-1].encode('ascii').translate(_BITS)
+            result = self._decoded[component] = frozenset(compress(self._ids, digits))
+        return result
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def count(self, tool_id: int) -> int:
+        """Returns the number of tools in the set for tool_id without building the set.
+        """
+        return bin(self._reached[self._component_of[self._index[tool_id]]]).count('1')
+
+
+class WorkflowGraph:
+    """
+    Graph analysis of the tools and connections of a workflow at one point in time.
+
+    Tools are numbered in the order they appear in the workflow and the adjacency lists are built once, in time
+    proportional to the number of tools and connections. Every result is computed on first use and kept, so
+    repeated queries are cheap. Connections to tool IDs that are not in the workflow are ignored.
+
+    Lineage for all tools at once is computed in a single pass over the strongly connected components in
+    topological order. The set of tools reachable from each component is kept as an integer bitset, so merging
+    the sets of its neighbours costs one bitwise or per connection.
+    """
+
+    def __init__(self, tool_ids: Iterable[int], connections: Iterable[Connection]):
+        self._ids: List[int] = list(tool_ids)
+        self._index: Dict[int, int] = {tool_id: i for i, tool_id in enumerate(self._ids)}
+        self._successors: List[List[int]] = [list() for _ in self._ids]
+        self._predecessors: List[List[int]] = [list() for _ in self._ids]
+
+        index: Dict[int, int] = self._index
+        for c in connections:
+            origin: Optional[int] = index.get(c.origin_tool_id)
+            destination: Optional[int] = index.get(c.destination_tool_id)
+            if origin is not None and destination is not None:
+                self._successors[origin].append(destination)
+                self._predecessors[destination].append(origin)
+        for adjacency in (self._successors, self._predecessors):
+            for i, neighbours in enumerate(adjacency):
+                if len(neighbours) > 1:
+                    adjacency[i] = list(dict.fromkeys(neighbours))
+
+        self._topological_order: Optional[List[int]] = None
+        self._components: Optional[List[List[int]]] = None
+        self._component_of: Optional[List[int]] = None
+        self._upstream: Dict[int, FrozenSet[int]] = dict({})
+        self._downstream: Dict[int, FrozenSet[int]] = dict({})
+        self._upstream_all: Optional[Lineage] = None
+        self._downstream_all: Optional[Lineage] = None
+
+    def topological_order(self) -> List[int]:
+        """Returns the tool IDs ordered so that every tool comes after the tools connected to its inputs.
+
+        Ties are broken by the order of the tools in the workflow. Raises ValueError if the workflow has a cycle.
+        """
+        if self._topological_order is None:
+            remaining: List[int] = [len(p) for p in self._predecessors]
+            ready: Deque[int] = deque(i for i, count in enumerate(remaining) if count == 0)
+            order: List[int] = list()
+            while ready:
+                i: int = ready.popleft()
+                order.append(i)
+                for j in self._successors[i]:
+                    remaining[j] -= 1
+                    if remaining[j] == 0:
+                        ready.append(j)
+            if len(order) < len(self._ids):
+                raise ValueError(f"Workflow contains cycles: {self.find_cycles()}")
+            self._topological_order = [self._ids[i] for i in order]
+        return list(self._topological_order)
+
+    def sources(self) -> List[int]:
+        """Returns the IDs of the tools with no incoming connections.
+        """
+        return [self._ids[i] for i, p in enumerate(self._predecessors) if not p]
+
+    def sinks(self) -> List[int]:
+        """Returns the IDs of the tools with no outgoing connections.
+        """
+        return [self._ids[i] for i, s in enumerate(self._successors) if not s]
+
+    def find_cycles(self) -> List[List[int]]:
+        """Returns the tool IDs of each group of tools that are connected in a cycle, including self-loops.
+        """
+        return [[self._ids[i] for i in sorted(component)] for component in self._strong_components()
+                if len(component) > 1 or component[0] in self._successors[component[0]]]
+
+    def upstream(self, tool_id: int) -> FrozenSet[int]:
+        """Returns the IDs of every tool whose output reaches the given tool.
+        """
+        return self._lineage(tool_id, self._predecessors, self._upstream, self._upstream_all)
+
+    def downstream(self, tool_id: int) -> FrozenSet[int]:
+        """Returns the IDs of every tool the output of the given tool reaches.
+        """
+        return self._lineage(tool_id, self._successors, self._downstream, self._downstream_all)
+
+    def upstream_all(self) -> Lineage:
+        """Returns upstream() for every tool, computed in a single pass.
+        """
+        if self._upstream_all is None:
+            self._upstream_all = self._closures(self._predecessors, reverse=True)
+        return self._upstream_all
+
+    def downstream_all(self) -> Lineage:
+        """Returns downstream() for every tool, computed in a single pass.
+        """
+        if self._downstream_all is None:
+            self._downstream_all = self._closures(self._successors, reverse=False)
+        return self._downstream_all
+
+    def _lineage(self, tool_id: int, adjacency: List[List[int]], memo: Dict[int, FrozenSet[int]],
+                 bulk: Optional[Lineage]) -> FrozenSet[int]:
+        if bulk is not None:
+            return bulk[tool_id]
+        result: Optional[FrozenSet[int]] = memo.get(tool_id)
+        if result is None:
+            start: int = self._index[tool_id]
+            seen: List[bool] = [False] * len(self._ids)
+            stack: List[int] = list(adjacency[start])
+            reached: List[int] = list()
+            while stack:
+                i: int = stack.pop()
+                if not seen[i]:
+                    seen[i] = True
+                    reached.append(self._ids[i])
+                    stack.extend(adjacency[i])
+            result = memo[tool_id] = frozenset(reached)
+        return result
+
+    def _strong_components(self) -> List[List[int]]:
+        """Returns the strongly connected components in reverse topological order, using Tarjan's algorithm.
+        """
+        if self._components is None:
+            count: int = len(self._ids)
+            order: List[int] = [-1] * count
+            low: List[int] = [0] * count
+            on_stack: List[bool] = [False] * count
+            stack: List[int] = list()
+            components: List[List[int]] = list()
+            component_of: List[int] = [0] * count
+            counter: int = 0
+
+            for root in range(count):
+                if order[root] != -1:
+                    continue
+                work: List[List[int]] = [[root, 0]]
+                order[root] = low[root] = counter
+                counter += 1
+                stack.append(root)
+                on_stack[root] = True
+                while work:
+                    frame: List[int] = work[-1]
+                    i, position = frame
+                    successors: List[int] = self._successors[i]
+                    if position < len(successors):
+                        frame[1] += 1
+                        j: int = successors[position]
+                        if order[j] == -1:
+                            order[j] = low[j] = counter
+                            counter += 1
+                            stack.append(j)
+                            on_stack[j] = True
+                            work.append([j, 0])
+                        elif on_stack[j] and order[j] < low[i]:
+                            low[i] = order[j]
+                        continue
+
+                    work.pop()
+                    if work and low[i] < low[work[-1][0]]:
+                        low[work[-1][0]] = low[i]
+                    if low[i] == order[i]:
+                        component: List[int] = list()
+                        while True:
+                            j = stack.pop()
+                            on_stack[j] = False
+                            component_of[j] = len(components)
+                            component.append(j)
+                            if j == i:
+                                break
+                        components.append(component)
+
+            self._components = components
+            self._component_of = component_of
+        return self._components
+
+    def _closures(self, adjacency: List[List[int]], reverse: bool) -> Lineage:
+        components: List[List[int]] = self._strong_components()
+        component_of: List[int] = self._component_of
+        reached: List[int] = [0] * len(components)
+
+        # Components come out of Tarjan's algorithm with every component after those its tools connect to, so
+        # walking them forwards finishes successors first and walking them backwards finishes predecessors first
+        indices: Iterable[int] = range(len(components) - 1, -1, -1) if reverse else range(len(components))
+        for c in indices:
+            component: List[int] = components[c]
+            mask: int = 0
+            for i in component:
+                mask |= 1 << i
+            bits: int = 0
+            cyclic: bool = len(component) > 1
+            for i in component:
+                for j in adjacency[i]:
+                    other: int = component_of[j]
+                    if other == c:
+                        cyclic = True
+                    else:
+                        bits |= (1 << j) | reached[other]
+            if cyclic:
+                bits |= mask
+            reached[c] = bits
+
+        return Lineage(self._ids, component_of, reached)
@@ -0,0 +1,258 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import os
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
+
+from .filtertool import FilterMode, FilterTool
+from .inputtool import InputTool
+from .outputtool import OutputTool
+from .property_values import as_list
+from .tool import Tool
+from .workflow import Workflow
+
+INPUT_FILE: str = 'input_file'
+OUTPUT_FILE: str = 'output_file'
+FILTER_EXPRESSION: str = 'filter_expression'
+FIELD: str = 'field'
+
+_SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS workflows (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    yxmd_version TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tools (
+    workflow_id INTEGER NOT NULL REFERENCES workflows(id) ON DELETE CASCADE,
+    tool_id INTEGER NOT NULL,
+    plugin TEXT NOT NULL,
+    PRIMARY KEY (workflow_id, tool_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tools_plugin ON tools (plugin);
+CREATE TABLE IF NOT EXISTS attributes (
+    workflow_id INTEGER NOT NULL REFERENCES workflows(id) ON DELETE CASCADE,
+    tool_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attributes_key ON attributes (kind, key);
+CREATE INDEX IF NOT EXISTS attributes_workflow ON attributes (workflow_id);
+'''
+
+
+@dataclass
+class IndexMatch:
+    """
+    A tool found by a WorkflowIndex query, with the indexed value that matched.
+    """
+    filename: str = ''
+    tool_id: int = 0
+    plugin: str = ''
+    value: str = ''
+
+
+class WorkflowIndex:
+    """
+    SQLite index of the tools in a collection of workflow files, for finding where files, plugins, filter
+    expressions and fields are used without reading every workflow.
+
+    For each tool the index stores its plugin and, where present, the file an Input tool reads, the file an Output
+    tool writes, the expression of a custom Filter and the names of the fields in its MetaInfo. Lookups by file
+    name, plugin or field name use indexes and take milliseconds even for large collections.
+
+    update only re-reads files whose modification time or size changed since they were indexed and whose
+    contents hash differs, and removes files that no longer exist.
+    """
+
+    def __init__(self, database: str):
+        self._database: str = database
+        self._connection: sqlite3.Connection = sqlite3.connect(database)
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.executescript(_SCHEMA)
+
+    @property
+    def database(self) -> str:
+        return self._database
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> 'WorkflowIndex':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def update(self, paths: Iterable[str], workers: Optional[int] = 1) -> Dict[str, BaseException]:
+        """Brings the index up to date with the workflow files in paths, which may include directories.
+
+        Files that were indexed before under one of the directories in paths but no longer exist are removed.
+        Changed files are read with Workflow.read_many using the given number of workers. Returns the files
+        that could not be read, with the error raised for each.
+        """
+        paths = list(paths)
+        seen: Set[str] = set()
+        stale: List[str] = list()
+        cursor = self._connection.cursor()
+        for filename in Workflow.find_files(paths):
+            path: str = os.path.abspath(filename)
+            seen.add(path)
+            try:
+                stat: os.stat_result = os.stat(path)
+            except OSError:
+                stale.append(path)
+                continue
+            row: Optional[Tuple[int, int, str]] = cursor.execute(
+                'SELECT mtime_ns, size, sha1 FROM workflows WHERE path = ?', (path,)).fetchone()
+            if row is not None and row[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            if row is not None and row[2] == self._file_hash(path):
+                with self._connection:
+                    cursor.execute('UPDATE workflows SET mtime_ns = ?, size = ? WHERE path = ?',
+                                   (stat.st_mtime_ns, stat.st_size, path))
+                continue
+            stale.append(path)
+
+        errors: Dict[str, BaseException] = dict({})
+        for result in Workflow.read_many(stale, workers=workers):
+            if result.error is not None:
+                errors[result.filename] = result.error
+                with self._connection:
+                    self._connection.execute('DELETE FROM workflows WHERE path = ?', (result.filename,))
+            else:
+                self._add(result.filename, result.workflow)
+
+        directories: List[str] = [os.path.join(os.path.abspath(p), '') for p in paths if os.path.isdir(p)]
+        with self._connection:
+            for (path,) in cursor.execute('SELECT path FROM workflows').fetchall():
+                if path not in seen and any(path.startswith(d) for d in directories):
+                    cursor.execute('DELETE FROM workflows WHERE path = ?', (path,))
+        return errors
+
+    def remove(self, filename: str) -> None:
+        with self._connection:
+            self._connection.execute('DELETE FROM workflows WHERE path = ?', (os.path.abspath(filename),))
+
+    def filenames(self) -> List[str]:
+        return [path for (path,) in self._connection.execute('SELECT path FROM workflows ORDER BY path')]
+
+    def reading(self, file_name: str) -> List[IndexMatch]:
+        """Returns the Input tools that read file_name, which is matched on its base name if it has no directory.
+        """
+        return self._find(INPUT_FILE, file_name)
+
+    def writing(self, file_name: str) -> List[IndexMatch]:
+        """Returns the Output tools that write file_name, which is matched on its base name if it has no directory.
+        """
+        return self._find(OUTPUT_FILE, file_name)
+
+    def with_field(self, name: str) -> List[IndexMatch]:
+        """Returns the tools with a field of the given name, ignoring case, in their MetaInfo.
+        """
+        return self._query('a.kind = ? AND a.key = ?', (FIELD, name.lower()))
+
+    def using_plugin(self, plugin: str, expression: Optional[str] = None) -> List[IndexMatch]:
+        """Returns the tools using a plugin, or only the Filter tools whose expression contains expression.
+        """
+        if expression is None:
+            return [IndexMatch(path, tool_id, plugin, plugin) for path, tool_id in self._connection.execute(
+                'SELECT w.path, t.tool_id FROM tools t JOIN workflows w ON w.id = t.workflow_id '
+                'WHERE t.plugin = ? ORDER BY w.path, t.tool_id', (plugin,))]
+        return self._query("a.kind = ? AND t.plugin = ? AND instr(a.key, ?) > 0",
+                           (FILTER_EXPRESSION, plugin, expression.lower()))
+
+    def _find(self, kind: str, file_name: str) -> List[IndexMatch]:
+        if os.path.basename(file_name.replace('\\', '/')) == file_name:
+            return self._query('a.kind = ? AND a.key = ?', (kind, file_name.lower()))
+        return self._query('a.kind = ? AND a.key = ? AND a.value = ? COLLATE NOCASE',
+                           (kind, self._key(kind, file_name), file_name))
+
+    def _query(self, where: str, parameters: Tuple) -> List[IndexMatch]:
+        return [IndexMatch(*row) for row in self._connection.execute(
+            'SELECT w.path, a.tool_id, t.plugin, a.value FROM attributes a '
+            'JOIN workflows w ON w.id = a.workflow_id '
+            'JOIN tools t ON t.workflow_id = a.workflow_id AND t.tool_id = a.tool_id '
+            f'WHERE {where} ORDER BY w.path, a.tool_id', parameters)]
+
+    def _add(self, path: str, workflow: Workflow) -> None:
+        stat: os.stat_result = os.stat(path)
+        tools: List[Tuple[int, str]] = list()
+        attributes: List[Tuple[int, str, str, str]] = list()
+        for tool_id, tool in workflow.tools.items():
+            tools.append((tool_id, tool.plugin))
+            for kind, value in self._attributes(tool):
+                attributes.append((tool_id, kind, self._key(kind, value), value))
+
+        with self._connection:
+            self._connection.execute('DELETE FROM workflows WHERE path = ?', (path,))
+            workflow_id: int = self._connection.execute(
+                'INSERT INTO workflows (path, mtime_ns, size, sha1, yxmd_version) VALUES (?, ?, ?, ?, ?)',
+                (path, stat.st_mtime_ns, stat.st_size, self._file_hash(path), workflow.yxmd_version)).lastrowid
+            self._connection.executemany('INSERT OR REPLACE INTO tools VALUES (?, ?, ?)',
+                                         ((workflow_id, tool_id, plugin) for tool_id, plugin in tools))
+            self._connection.executemany('INSERT INTO attributes VALUES (?, ?, ?, ?, ?)',
+                                         ((workflow_id,) + attribute for attribute in attributes))
+
+    @staticmethod
+    def _attributes(tool: Tool) -> Iterator[Tuple[str, str]]:
+        """Yields the indexed (kind, value) pairs of a tool, skipping any that its properties do not contain.
+        """
+        try:
+            if isinstance(tool, InputTool):
+                yield INPUT_FILE, tool.input_file_name
+            elif isinstance(tool, OutputTool):
+                yield OUTPUT_FILE, tool.output_file_name
+            elif isinstance(tool, FilterTool):
+                if tool.filter_mode == FilterMode.CUSTOM:
+                    yield FILTER_EXPRESSION, tool.expression
+        except (KeyError, TypeError, ValueError, NameError):
+            pass
+
+        properties: Any = tool.properties
+        if not isinstance(properties, dict):
+            return
+        names: Dict[str, None] = dict({})
+        for meta_info in as_list(properties.get('MetaInfo')):
+            record_info: Any = meta_info.get('RecordInfo') if isinstance(meta_info, dict) else None
+            if isinstance(record_info, dict):
+                for field in as_list(record_info.get('Field')):
+                    if isinstance(field, dict) and field.get('@name'):
+                        names[field['@name']] = None
+        for name in names:
+            yield FIELD, name
+
+    @staticmethod
+    def _key(kind: str, value: str) -> str:
+        if kind in (INPUT_FILE, OUTPUT_FILE):
+            # Input files can name a table or sheet after |||, as in data.xlsx|||`Sheet1$`
+            value = value.split('|||', 1)[0].replace('\\', '/').rsplit('/', 1)[-1]
+        return value.lower()
+
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        content = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                content.update(chunk)
+        return content.hexdigest()
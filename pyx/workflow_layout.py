@@ -0,0 +1,222 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from collections import deque
+from typing import Deque, Dict, List, Iterable, Optional, Set, Tuple
+
+from .connection import Connection
+from .tool import ToolPosition
+
+
+class SpatialGrid:
+    """
+    Index of tool positions by grid cell, used to find free space for a tool in constant time per check.
+
+    Cells are the size of the minimum separation between tools, so any tool closer than that to a position is
+    in the cell of the position or one of its eight neighbours.
+    """
+
+    def __init__(self, width: int, height: int):
+        self._width: int = width
+        self._height: int = height
+        self._cells: Dict[Tuple[int, int], List[ToolPosition]] = dict({})
+
+    def add(self, position: ToolPosition) -> None:
+        self._cells.setdefault(self._cell(position.x, position.y), list()).append(position)
+
+    def overlaps(self, x: int, y: int) -> bool:
+        """Returns True if a tool in the grid is closer than the cell size to x, y in both directions.
+        """
+        cx, cy = self._cell(x, y)
+        for i in (cx - 1, cx, cx + 1):
+            for j in (cy - 1, cy, cy + 1):
+                for p in self._cells.get((i, j), ()):
+                    if abs(p.x - x) < self._width and abs(p.y - y) < self._height:
+                        return True
+        return False
+
+    def nearest_free(self, x: int, y: int) -> ToolPosition:
+        """Returns the position closest to x, y in the same column that does not overlap any tool in the grid.
+        """
+        step: int = 0
+        while True:
+            for candidate in ((y + step * self._height, y - step * self._height) if step else (y,)):
+                if not self.overlaps(x, candidate):
+                    return ToolPosition(x=x, y=candidate)
+            step += 1
+
+    def _cell(self, x: int, y: int) -> Tuple[int, int]:
+        return x // self._width, y // self._height
+
+
+class LayeredLayout:
+    """
+    Positions the tools of a workflow in columns so that data flows from left to right.
+
+    Tools are assigned to columns by the longest path from a source, with sources pulled right towards the tools
+    they feed. The order within each column is then refined by a few sweeps of the barycenter heuristic, which
+    moves each tool towards the average row of its neighbours in order to reduce connection crossings. Every step
+    takes time roughly proportional to the number of tools and connections.
+
+    Connections that would close a cycle are ignored when assigning columns.
+    """
+
+    def __init__(self, horizontal_spacing: int = 100, vertical_spacing: int = 100, sweeps: int = 8,
+                 origin: Optional[ToolPosition] = None):
+        self._horizontal_spacing: int = horizontal_spacing
+        self._vertical_spacing: int = vertical_spacing
+        self._sweeps: int = sweeps
+        self._origin: ToolPosition = origin if origin is not None else ToolPosition()
+
+    def layout(self, tool_ids: Iterable[int], connections: Iterable[Connection]) -> Dict[int, ToolPosition]:
+        """Returns a position for every tool.
+        """
+        ids: List[int] = list(tool_ids)
+        successors, predecessors = self._adjacency(ids, connections)
+        order: List[int] = self._acyclic_order(successors, predecessors)
+
+        column: List[int] = [0] * len(ids)
+        rank: List[int] = [0] * len(ids)
+        for position, i in enumerate(order):
+            rank[i] = position
+        for i in order:
+            for j in successors[i]:
+                if rank[j] > rank[i] and column[j] <= column[i]:
+                    column[j] = column[i] + 1
+        for i in reversed(order):
+            if not predecessors[i]:
+                following: List[int] = [column[j] for j in successors[i] if rank[j] > rank[i]]
+                if following:
+                    column[i] = min(following) - 1
+
+        columns: List[List[int]] = [list() for _ in range(max(column, default=-1) + 1)]
+        for i in order:
+            columns[column[i]].append(i)
+        self._reduce_crossings(columns, successors, predecessors)
+
+        positions: Dict[int, ToolPosition] = dict({})
+        for c, tools in enumerate(columns):
+            x: int = self._origin.x + c * self._horizontal_spacing
+            for row, i in enumerate(tools):
+                positions[ids[i]] = ToolPosition(x=x, y=self._origin.y + row * self._vertical_spacing)
+        return positions
+
+    def place(self, positions: Dict[int, ToolPosition], tool_ids: Iterable[int],
+              connections: Iterable[Connection]) -> Dict[int, ToolPosition]:
+        """Returns new positions for the given tools that fit around the tools that keep their positions.
+
+        Each tool is placed one column to the right of the tools that feed it, or one column to the left of the
+        tools it feeds, at their average row, and then moved up or down to the nearest space not taken by
+        another tool.
+        """
+        connections = list(connections)
+        moving: List[int] = list(dict.fromkeys(tool_ids))
+        moving_set: Set[int] = set(moving)
+        grid: SpatialGrid = SpatialGrid(self._horizontal_spacing, self._vertical_spacing)
+        placed: Dict[int, ToolPosition] = dict({})
+        for tool_id, position in positions.items():
+            if tool_id not in moving_set:
+                placed[tool_id] = position
+                grid.add(position)
+
+        successors, predecessors = self._adjacency(moving, (c for c in connections
+                                                            if c.origin_tool_id in moving_set and
+                                                            c.destination_tool_id in moving_set))
+        inputs: Dict[int, List[int]] = dict({})
+        outputs: Dict[int, List[int]] = dict({})
+        for c in connections:
+            inputs.setdefault(c.destination_tool_id, list()).append(c.origin_tool_id)
+            outputs.setdefault(c.origin_tool_id, list()).append(c.destination_tool_id)
+
+        result: Dict[int, ToolPosition] = dict({})
+        for i in self._acyclic_order(successors, predecessors):
+            tool_id: int = moving[i]
+            before: List[ToolPosition] = [placed[t] for t in inputs.get(tool_id, ()) if t in placed]
+            after: List[ToolPosition] = [placed[t] for t in outputs.get(tool_id, ()) if t in placed]
+            if before:
+                x: int = max(p.x for p in before) + self._horizontal_spacing
+                y: int = sum(p.y for p in before) // len(before)
+            elif after:
+                x = min(p.x for p in after) - self._horizontal_spacing
+                y = sum(p.y for p in after) // len(after)
+            else:
+                x, y = self._origin.x, self._origin.y
+            position: ToolPosition = grid.nearest_free(x, y)
+            grid.add(position)
+            placed[tool_id] = result[tool_id] = position
+        return result
+
+    @staticmethod
+    def _adjacency(ids: List[int], connections: Iterable[Connection]) -> Tuple[List[List[int]], List[List[int]]]:
+        index: Dict[int, int] = {tool_id: i for i, tool_id in enumerate(ids)}
+        successors: List[List[int]] = [list() for _ in ids]
+        predecessors: List[List[int]] = [list() for _ in ids]
+        for c in connections:
+            origin: Optional[int] = index.get(c.origin_tool_id)
+            destination: Optional[int] = index.get(c.destination_tool_id)
+            if origin is not None and destination is not None and origin != destination:
+                successors[origin].append(destination)
+                predecessors[destination].append(origin)
+        return successors, predecessors
+
+    @staticmethod
+    def _acyclic_order(successors: List[List[int]], predecessors: List[List[int]]) -> List[int]:
+        """Returns a topological order of the tools, breaking any cycle at the tool with fewest unplaced inputs.
+        """
+        remaining: List[int] = [len(p) for p in predecessors]
+        ready: Deque[int] = deque(i for i, count in enumerate(remaining) if count == 0)
+        done: List[bool] = [False] * len(successors)
+        order: List[int] = list()
+        while len(order) < len(successors):
+            if not ready:
+                stuck: int = min((i for i in range(len(successors)) if not done[i]), key=lambda i: remaining[i])
+                remaining[stuck] = 0
+                ready.append(stuck)
+            i: int = ready.popleft()
+            if done[i]:
+                continue
+            done[i] = True
+            order.append(i)
+            for j in successors[i]:
+                remaining[j] -= 1
+                if remaining[j] == 0 and not done[j]:
+                    ready.append(j)
+        return order
+
+    def _reduce_crossings(self, columns: List[List[int]], successors: List[List[int]],
+                          predecessors: List[List[int]]) -> None:
+        column: Dict[int, int] = dict({})
+        row: Dict[int, float] = dict({})
+        for c, tools in enumerate(columns):
+            for r, i in enumerate(tools):
+                column[i] = c
+                row[i] = r
+
+        for sweep in range(self._sweeps):
+            downward: bool = sweep % 2 == 0
+            neighbours: List[List[int]] = predecessors if downward else successors
+            for c in (range(1, len(columns)) if downward else range(len(columns) - 2, -1, -1)):
+                # Only neighbours in the adjacent column count, as the ones further away have rows that belong to
+                # a different ordering
+                adjacent_column: int = c - 1 if downward else c + 1
+                tools: List[int] = columns[c]
+                keys: Dict[int, float] = dict({})
+                for i in tools:
+                    adjacent: List[float] = [row[j] for j in neighbours[i] if column[j] == adjacent_column]
+                    keys[i] = sum(adjacent) / len(adjacent) if adjacent else row[i]
+                tools.sort(key=keys.__getitem__)
+                for r, i in enumerate(tools):
+                    row[i] = r
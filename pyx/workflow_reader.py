@@ -0,0 +1,276 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Dict, List, Any, Iterator, Optional, Union
+from dataclasses import dataclass
+from xml.parsers import expat
+import xmltodict
+
+from .connection import Connection
+from .tool import Tool, ToolPosition, ToolSource
+from .tool_factory import ToolFactory
+
+
+@dataclass
+class WorkflowSource:
+    """
+    The parts of a workflow file outside its nodes and connections, as read.
+
+    prolog holds everything up to and including the AlteryxDocument start tag and epilogue everything after its
+    end tag. Together with the Nodes and Connections start tags and the Properties XML they allow an unmodified
+    workflow to be written back verbatim.
+    """
+    prolog: bytes = b''
+    yxmd_version: str = ''
+    nodes_tag: bytes = b''
+    connections_tag: bytes = b''
+    properties: Optional[bytes] = None
+    epilogue: bytes = b''
+
+
+class WorkflowReader:
+    """
+    Streams the tools and connections of a workflow file one at a time.
+
+    The file is fed to an expat parser in chunks. Each Node and Connection is turned into a Tool or Connection as
+    soon as its closing tag has been parsed and only the bytes of the element currently being parsed are kept, so
+    memory use grows with the largest single node rather than with the size of the file.
+
+    Node Properties are not converted to nested dicts while reading. Each tool keeps the XML of its Node as a
+    ToolSource and only parses its Properties when Tool.properties is first accessed. Connections likewise keep
+    their XML, so that untouched parts of the workflow can be written back verbatim.
+    """
+
+    def __init__(self, filename: str, chunk_size: int = 1 << 16):
+        self._filename: str = filename
+        self._chunk_size: int = chunk_size
+        self._encoding: Optional[str] = None
+        self._yxmd_version: str = ''
+        self._properties: Any = None
+        self._source: WorkflowSource = WorkflowSource()
+        self._root_end: Optional[int] = None
+        self._skipped: int = 0
+
+        self._parser = None
+        self._stack: List[str] = list()
+        self._buffer: bytearray = bytearray()
+        self._buffer_start: int = 0
+        self._last_index: int = 0
+        self._last_was_start: bool = False
+        self._starts: List[int] = list()
+        self._mark: Optional[int] = None
+        self._node: Optional[Dict[str, Any]] = None
+        self._connection: Optional[Dict[str, Any]] = None
+        self._items: List[Union[Tool, Connection]] = list()
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    @property
+    def yxmd_version(self) -> str:
+        """The yxmdVer attribute of the document, available once iteration has started.
+        """
+        return self._yxmd_version
+
+    @property
+    def properties(self) -> Any:
+        """The workflow level Properties, available once iteration has finished.
+        """
+        return self._properties
+
+    @property
+    def source(self) -> WorkflowSource:
+        """The XML around the nodes and connections, available once iteration has finished.
+        """
+        return self._source
+
+    def __iter__(self) -> Iterator[Union[Tool, Connection]]:
+        self._parser = expat.ParserCreate()
+        self._parser.XmlDeclHandler = self._xml_decl
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+
+        with open(self._filename, 'rb') as f:
+            while True:
+                chunk: bytes = f.read(self._chunk_size)
+                self._buffer += chunk
+                self._parser.Parse(chunk, not chunk)
+                self._discard()
+
+                yield from self._items
+                self._items.clear()
+
+                if not chunk:
+                    if self._root_end is not None:
+                        self._source.epilogue = self._utf8(self._slice(self._root_end, self._buffer_start +
+                                                                       len(self._buffer)))
+                    break
+
+        self._parser = None
+
+    def _xml_decl(self, version: str, encoding: Optional[str], standalone: int) -> None:
+        self._encoding = encoding
+
+    def _start_element(self, name: str, attrs: Dict[str, str]) -> None:
+        index: int = self._parser.CurrentByteIndex
+        self._stack.append(name)
+        self._starts.append(index)
+        self._last_index = index
+        self._last_was_start = True
+        depth: int = len(self._stack)
+
+        if depth == 1:
+            self._yxmd_version = attrs.get('yxmdVer', '')
+            self._source.yxmd_version = self._yxmd_version
+            if self._utf8_encoded():
+                self._source.prolog = self._slice(0, index) + self._start_tag(index)
+        elif depth == 2:
+            if name == 'Properties':
+                self._mark = index
+            elif name == 'Nodes':
+                self._source.nodes_tag = self._start_tag(index)
+            elif name == 'Connections':
+                self._source.connections_tag = self._start_tag(index)
+        elif depth == 3:
+            if self._stack[1] == 'Nodes' and name == 'Node':
+                self._mark = index
+                self._node = {'ToolID': int(attrs['ToolID']), 'Plugin': '', 'Position': ToolPosition(),
+                              'Properties': (0, 0), 'EngineDll': '', 'EngineDllEntryPoint': ''}
+            elif self._stack[1] == 'Connections' and name == 'Connection':
+                self._mark = index
+                self._connection = dict({})
+        elif self._node is not None:
+            if depth == 4 and name == 'GuiSettings':
+                self._node['Plugin'] = attrs.get('Plugin', '')
+            elif depth == 4 and name == 'EngineSettings':
+                self._node['EngineDll'] = attrs.get('EngineDll', '')
+                self._node['EngineDllEntryPoint'] = attrs.get('EngineDllEntryPoint', '')
+            elif depth == 5 and name == 'Position' and self._stack[3] == 'GuiSettings':
+                self._node['Position'] = ToolPosition(x=int(attrs['x']), y=int(attrs['y']))
+            elif depth == 4 and name == 'Properties':
+                # Nothing inside the Properties of a node is needed until they are parsed on demand
+                self._skipped = 0
+                self._parser.StartElementHandler = self._skip_start_element
+                self._parser.EndElementHandler = self._skip_end_element
+        elif self._connection is not None:
+            if depth == 4 and name in ('Origin', 'Destination'):
+                self._connection[name] = (int(attrs['ToolID']), attrs['Connection'])
+
+    def _skip_start_element(self, name: str, attrs: Dict[str, str]) -> None:
+        self._skipped += 1
+        self._last_was_start = False
+
+    def _skip_end_element(self, name: str) -> None:
+        if self._skipped:
+            self._skipped -= 1
+        else:
+            self._parser.StartElementHandler = self._start_element
+            self._parser.EndElementHandler = self._end_element
+            self._end_element(name)
+
+    def _end_element(self, name: str) -> None:
+        index: int = self._parser.CurrentByteIndex
+        depth: int = len(self._stack)
+        start: int = self._starts.pop()
+        self._stack.pop()
+
+        if depth == 1:
+            self._root_end = self._element_end(start, index)
+        elif depth == 2 and name == 'Properties':
+            self._source.properties = self._utf8(self._slice(start, self._element_end(start, index)))
+            self._properties = xmltodict.parse(self._source.properties)['Properties']
+            self._mark = None
+        elif depth == 3 and self._node is not None:
+            self._items.append(self._create_tool(self._node, start, self._element_end(start, index)))
+            self._node = None
+            self._mark = None
+        elif depth == 3 and self._connection is not None:
+            origin_tool_id, origin_output = self._connection['Origin']
+            destination_tool_id, destination_input = self._connection['Destination']
+            self._items.append(Connection(origin_tool_id, origin_output, destination_tool_id, destination_input,
+                                          source=self._utf8(self._slice(start, self._element_end(start, index)))))
+            self._connection = None
+            self._mark = None
+        elif depth == 4 and self._node is not None and name == 'Properties':
+            self._node['Properties'] = (start, self._element_end(start, index))
+
+        self._last_index = index
+        self._last_was_start = False
+
+    def _create_tool(self, node: Dict[str, Any], start: int, end: int) -> Tool:
+        xml: bytes = self._slice(start, end)
+        properties_start, properties_end = node['Properties']
+        if properties_end:
+            properties_start = len(self._utf8(xml[:properties_start - start]))
+            properties_end = len(self._utf8(xml[:properties_end - start]))
+        position: ToolPosition = node['Position']
+        return ToolFactory.create_from_source(ToolSource(self._utf8(xml), properties_start, properties_end,
+                                                         node['ToolID'], node['Plugin'], position.x, position.y,
+                                                         node['EngineDll'], node['EngineDllEntryPoint']))
+
+    def _utf8(self, xml: bytes) -> bytes:
+        """Re-encodes XML in the declared encoding of the file as UTF-8.
+        """
+        if self._utf8_encoded():
+            return xml
+        return xml.decode(self._encoding).encode('utf-8')
+
+    def _utf8_encoded(self) -> bool:
+        return self._encoding is None or self._encoding.lower().replace('-', '') == 'utf8'
+
+    def _element_end(self, start: int, index: int) -> int:
+        """Returns the offset just past the element that started at start and whose end event fired at index.
+
+        Expat reports the end of an element at its closing tag, or just past the start tag for an empty element
+        written as <Name/>. The latter can only happen when no other element was seen in between.
+        """
+        offset: int = self._buffer_start
+        if self._last_was_start:
+            tag_end: int = self._tag_end(start - offset)
+            if self._buffer[tag_end - 2] == ord('/'):
+                return tag_end + offset
+        return self._buffer.index(b'>', index - offset) + 1 + offset
+
+    def _tag_end(self, position: int) -> int:
+        """Returns the buffer position just past the tag starting at position, skipping quoted attribute values.
+        """
+        quote: int = 0
+        buffer: bytearray = self._buffer
+        while True:
+            c: int = buffer[position]
+            position += 1
+            if quote:
+                if c == quote:
+                    quote = 0
+            elif c == 0x22 or c == 0x27:
+                quote = c
+            elif c == 0x3e:
+                return position
+
+    def _start_tag(self, index: int) -> bytes:
+        return self._utf8(self._slice(index, self._tag_end(index - self._buffer_start) + self._buffer_start))
+
+    def _slice(self, start: int, end: int) -> bytes:
+        return bytes(self._buffer[start - self._buffer_start:end - self._buffer_start])
+
+    def _discard(self) -> None:
+        """Drops buffered bytes that no element still being parsed can refer to.
+        """
+        keep: int = self._mark if self._mark is not None else self._last_index
+        if keep > self._buffer_start:
+            del self._buffer[:keep - self._buffer_start]
+            self._buffer_start = keep
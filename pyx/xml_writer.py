@@ -0,0 +1,210 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Tuple, Any, Optional, TextIO
+
+
+def _to_str(value: Any) -> str:
+    """Converts a value to text the same way xmltodict.unparse does.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).decode('utf-8', errors='replace')
+    return str(value)
+
+
+def _escape_text(value: str) -> str:
+    if '&' in value:
+        value = value.replace('&', '&amp;')
+    if '<' in value:
+        value = value.replace('<', '&lt;')
+    if '>' in value:
+        value = value.replace('>', '&gt;')
+    return value
+
+
+def _escape_attribute(value: str) -> str:
+    value = _escape_text(value)
+    if '"' in value:
+        value = value.replace('"', '&quot;')
+    if '\n' in value or '\r' in value or '\t' in value:
+        value = value.replace('\n', '&#10;').replace('\r', '&#13;').replace('\t', '&#9;')
+    return value
+
+
+def _split_value(value: Any) -> List[Tuple[List[Tuple[str, str]], List[Tuple[str, Any]], Optional[str]]]:
+    """Splits an xmltodict style value into (attributes, children, text) for each element it represents.
+
+    Follows the conventions of xmltodict.unparse: lists repeat the element, None is an empty element, keys
+    starting with '@' are attributes and '#text' is the text content.
+    """
+    if not hasattr(value, '__iter__') or isinstance(value, (str, bytes, bytearray, memoryview, dict)):
+        value = [value]
+
+    elements = list()
+    for v in value:
+        if v is None:
+            v = dict({})
+        elif not isinstance(v, (dict, str)):
+            v = _to_str(v)
+        if isinstance(v, str):
+            v = {'#text': v}
+
+        attributes: List[Tuple[str, str]] = list()
+        children: List[Tuple[str, Any]] = list()
+        text: Optional[str] = None
+        for key, item in v.items():
+            if key == '#text':
+                text = None if item is None else _to_str(item)
+            elif key == '#comment':
+                continue
+            elif key.startswith('@'):
+                attributes.append((key[1:], '' if item is None else _to_str(item)))
+            elif not (isinstance(item, list) and not item):
+                children.append((key, item))
+        elements.append((attributes, children, text))
+
+    return elements
+
+
+def _element_text(element: ET.Element) -> Optional[str]:
+    """Returns the text of an element the way xmltodict sees it: text and child tails joined, then stripped.
+    """
+    text: str = element.text or ''
+    for child in element:
+        if child.tail:
+            text += child.tail
+    return text.strip() or None
+
+
+def to_elements(tag: str, value: Any) -> List[ET.Element]:
+    """Builds ElementTree elements directly from an xmltodict style value.
+
+    Produces the same elements as running the value through xmltodict.unparse and parsing the result with
+    ElementTree, without the intermediate string.
+    """
+    elements: List[ET.Element] = list()
+    for attributes, children, text in _split_value(value):
+        element: ET.Element = ET.Element(tag, dict(attributes))
+        for child_tag, child_value in children:
+            element.extend(to_elements(child_tag, child_value))
+        if text:
+            if len(element):
+                element[-1].tail = text
+            else:
+                element.text = text
+        elements.append(element)
+    return elements
+
+
+class XmlWriter:
+    """
+    Writes indented XML to a text stream in a single pass.
+
+    The layout matches minidom's toprettyxml(indent='  '), which pyx used to produce its files, except that
+    empty elements are closed with ' />' as Alteryx Designer writes them, so rewritten tools look like the ones
+    copied from the source file. Output is collected in a list and handed to the stream in large pieces to keep
+    the number of write calls low.
+    """
+
+    def __init__(self, stream: TextIO, indent: str = '  ', buffer_size: int = 4096):
+        self._stream: TextIO = stream
+        self._indent: str = indent
+        self._buffer_size: int = buffer_size
+        self._parts: List[str] = list()
+
+    def declaration(self) -> None:
+        self._parts.append('<?xml version="1.0" ?>\n')
+
+    def start(self, tag: str, attributes: Dict[str, str], depth: int) -> None:
+        """Writes the opening tag of an element that has child elements.
+        """
+        self._parts.append(f"{self._indent * depth}<{tag}{self._attributes(attributes.items())}>\n")
+
+    def end(self, tag: str, depth: int) -> None:
+        self._parts.append(f"{self._indent * depth}</{tag}>\n")
+        self._maybe_flush()
+
+    def empty(self, tag: str, attributes: Dict[str, str], depth: int) -> None:
+        self._parts.append(f"{self._indent * depth}<{tag}{self._attributes(attributes.items())} />\n")
+
+    def value(self, tag: str, value: Any, depth: int) -> None:
+        """Writes an xmltodict style value as one or more elements.
+        """
+        prefix: str = self._indent * depth
+        for attributes, children, text in _split_value(value):
+            open_tag: str = f"{prefix}<{tag}{self._attributes(attributes)}"
+            if children:
+                self._parts.append(open_tag + '>\n')
+                for child_tag, child_value in children:
+                    self.value(child_tag, child_value, depth + 1)
+                if text:
+                    self._parts.append(f"{prefix}{self._indent}{_escape_text(text)}\n")
+                self._parts.append(f"{prefix}</{tag}>\n")
+            elif text:
+                self._parts.append(f"{open_tag}>{_escape_text(text)}</{tag}>\n")
+            else:
+                self._parts.append(open_tag + ' />\n')
+
+    def element(self, element: ET.Element, depth: int) -> None:
+        """Writes an ElementTree element, ignoring whitespace used for indentation in its source.
+        """
+        prefix: str = self._indent * depth
+        tag: str = element.tag
+        open_tag: str = f"{prefix}<{tag}{self._attributes(element.attrib.items())}"
+        text: Optional[str] = _element_text(element)
+        if len(element):
+            self._parts.append(open_tag + '>\n')
+            for child in element:
+                self.element(child, depth + 1)
+            if text:
+                self._parts.append(f"{prefix}{self._indent}{_escape_text(text)}\n")
+            self._parts.append(f"{prefix}</{tag}>\n")
+        elif text:
+            self._parts.append(f"{open_tag}>{_escape_text(text)}</{tag}>\n")
+        else:
+            self._parts.append(open_tag + ' />\n')
+
+    def source(self, xml: bytes, depth: int) -> None:
+        """Writes an element copied verbatim from the UTF-8 source of a workflow on a line of its own.
+        """
+        text: str = xml.decode('utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n')
+        self._parts.append(f"{self._indent * depth}{text}\n")
+        self._maybe_flush()
+
+    def raw(self, text: str) -> None:
+        """Writes text as is.
+        """
+        self._parts.append(text)
+
+    def flush(self) -> None:
+        if self._parts:
+            self._stream.write(''.join(self._parts))
+            self._parts.clear()
+
+    def _maybe_flush(self) -> None:
+        if len(self._parts) >= self._buffer_size:
+            self.flush()
+
+    @staticmethod
+    def _attributes(attributes) -> str:
+        return ''.join(f' {name}="{_escape_attribute(value)}"' for name, value in attributes)
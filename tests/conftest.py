@@ -0,0 +1,95 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+WORKFLOWS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'workflows')
+
+
+@pytest.fixture
+def example_path():
+    """Returns a function that gives the path of one of the example workflows by name.
+    """
+    return lambda name: os.path.join(WORKFLOWS, name + '.yxmd')
+
+
+@pytest.fixture
+def example(example_path):
+    """Returns a function that reads one of the example workflows by name.
+    """
+    from pyx.workflow import Workflow
+    return lambda name: Workflow.read(example_path(name))
+
+
+@pytest.fixture
+def run_workflow(tmp_path):
+    """Runs a workflow with its Input and Output files mapped to tmp_path and returns the ExecutionResult and
+    the text of output.csv.
+    """
+    from pyx.engine import Engine
+
+    def run(workflow, **kwargs):
+        engine = Engine(workflow, resolve_path=lambda p: str(tmp_path / p.split('\\')[-1]), workers=1, **kwargs)
+        result = engine.run()
+        output = tmp_path / 'output.csv'
+        return result, output.read_text(encoding='utf-8-sig') if output.exists() else None
+
+    return run
+
+
+@pytest.fixture
+def typed_batch():
+    """Returns a batch with a column of each type conditions are evaluated over, with nulls and empty strings,
+    and a text column of dates and other values.
+    """
+    from pyx.field_schema import Field, FieldType
+    from pyx.record_batch import RecordBatch
+    return RecordBatch.from_columns(
+        [Field('n', FieldType.INT64), Field('x', FieldType.DOUBLE), Field('s', FieldType.V_STRING, 254),
+         Field('d', FieldType.DATE), Field('t', FieldType.DATETIME), Field('b', FieldType.BOOL),
+         Field('ds', FieldType.V_STRING, 254)],
+        [[1, -5, None, 40, 7, 0],
+         [1.5, None, -2.25, 1e10, 7.0, 0.0],
+         ['Denver', '', None, 'golden', '7', 'DENVER'],
+         ['2020-01-31', None, '2019-12-31', '2020-02-29', '2021-06-01', '2020-01-01'],
+         ['2020-01-31 10:00:00', None, '2019-12-31 23:59:59', '2020-02-29 00:00:00', '2021-06-01 12:30:00',
+          '2020-01-01 00:00:00'],
+         [True, False, None, True, False, True],
+         ['2020-01-31', '', None, '2020-03-01 08:00:00', '2020-02-29', 'junk']])
+
+
+@pytest.fixture
+def scalar_predicate():
+    """Returns a function that evaluates an expression tree over a batch one record at a time with
+    expression.evaluate(), giving whether the condition holds for each record.
+    """
+    from pyx.expression import evaluate
+    from pyx.record_batch import to_objects
+
+    def predicate(tree, batch):
+        columns = {name.lower(): to_objects(batch.column(name)).tolist() for name in batch.schema.names()}
+        result = list()
+        for i in range(len(batch)):
+            value = evaluate(tree, {name: column[i] for name, column in columns.items()})
+            result.append(value.strip().lower() not in ('', 'false', '0') if isinstance(value, str) else bool(value))
+        return result
+
+    return predicate
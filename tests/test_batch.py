@@ -0,0 +1,83 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import pytest
+
+from pyx.connection import Connection
+from pyx.tool import Tool
+from pyx.workflow import Workflow
+
+
+def test_fluent_methods_return_copies_outside_a_batch(example):
+    workflow = example('Example-Simple')
+    edited = workflow.add_tool(Tool(7))
+    assert edited is not workflow
+    assert workflow.add_connection(6, 'Output', 7, 'Input') is not workflow
+
+
+def test_edits_in_a_batch_apply_in_place(example):
+    workflow = example('Example-Simple')
+    tool = Tool(7)
+    autofield = workflow.tools[3]
+    with workflow.batch() as wf:
+        assert wf is workflow
+        assert wf.add_tool(tool) is workflow
+        assert wf.add_connection(5, 'Output', 7, 'Input') is workflow
+        assert wf.remove_connection(5, 'Output', 6, 'Input') is workflow
+        assert autofield.set_field('Zip', False) is autofield
+
+    assert workflow.tools[7] is tool
+    assert workflow.connections_from(5) == [Connection(5, 'Output', 7, 'Input')]
+    assert workflow.tools[5].outputs == list()
+    assert workflow.tools[6].inputs == list()
+    assert workflow.sinks() == [6, 7]
+    assert workflow.tools[3].get_field_selection('Zip') is False
+
+    assert workflow.add_tool(Tool(8)) is not workflow
+
+
+def test_a_batch_that_raises_is_rolled_back(example):
+    workflow = example('Example-Simple')
+    before = (dict(workflow.tools), list(workflow.connections),
+              [(list(t.inputs), list(t.outputs)) for t in workflow.tools.values()])
+    assert workflow.sinks() == [6]
+
+    with pytest.raises(RuntimeError):
+        with workflow.batch() as wf:
+            wf.add_tool(Tool(7)).add_connection(6, 'Output', 7, 'Input')
+            wf.remove_tool(4)
+            wf.tools[5].add_input(1, 'Output', 'Input')
+            assert wf.sinks() == [2, 7]
+            raise RuntimeError
+
+    assert (dict(workflow.tools), list(workflow.connections),
+            [(list(t.inputs), list(t.outputs)) for t in workflow.tools.values()]) == before
+    assert workflow.sinks() == [6]
+    assert workflow.connections_to(5) == [Connection(4, 'True', 5, 'Input')]
+    assert workflow.add_tool(Tool(7)) is not workflow
+
+
+def test_nested_batches_roll_back_only_the_inner_block():
+    workflow = Workflow()
+    with workflow.batch():
+        workflow.add_tool(Tool(1))
+        with pytest.raises(ValueError):
+            with workflow.batch():
+                workflow.add_tool(Tool(2))
+                raise ValueError
+        workflow.add_tool(Tool(3))
+    assert list(workflow.tools) == [1, 3]
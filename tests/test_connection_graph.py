@@ -0,0 +1,94 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import pytest
+
+from pyx.connection import Connection
+from pyx.connection_graph import ConnectionGraph
+
+
+def test_connections_from_and_to_a_tool(example):
+    workflow = example('Example-Simple')
+    assert workflow.connections_from(4) == [Connection(4, 'True', 5, 'Input')]
+    assert workflow.connections_to(2) == [Connection(3, 'Output', 2, 'Input')]
+    assert workflow.connections_from(6) == list()
+    assert workflow.connections_to(1) == list()
+    assert workflow.successors(1) == [3]
+    assert workflow.predecessors(3) == [1]
+
+
+def test_behaves_like_the_list_it_replaces(example):
+    workflow = example('Example-Simple')
+    connections = list(workflow.connections)
+    assert len(workflow.connections) == 5
+    assert workflow.connections == connections
+    assert workflow.connections[1] == connections[1]
+    assert workflow.connections[-2:] == connections[-2:]
+    assert Connection(2, 'Output', 4, 'Input') in workflow.connections
+    assert Connection(2, 'Output', 4, 'False') not in workflow.connections
+
+
+def test_equal_connections_are_kept_like_list_entries():
+    graph = ConnectionGraph([Connection(1, 'Output', 2, 'Input')])
+    graph.append(Connection(1, 'Output', 2, 'Input'))
+    graph.append(Connection(1, 'Output', 3, 'Input'))
+    assert len(graph) == 3
+    assert graph.outgoing(1) == [Connection(1, 'Output', 2, 'Input')] * 2 + [Connection(1, 'Output', 3, 'Input')]
+    assert graph.incoming(2) == [Connection(1, 'Output', 2, 'Input')] * 2
+
+    graph.remove(Connection(1, 'Output', 2, 'Input'))
+    assert graph.incoming(2) == [Connection(1, 'Output', 2, 'Input')]
+    assert graph.remove_matching(1, 'Output', 2, 'Input') == [Connection(1, 'Output', 2, 'Input')]
+    assert list(graph) == [Connection(1, 'Output', 3, 'Input')]
+    with pytest.raises(ValueError):
+        graph.remove(Connection(1, 'Output', 2, 'Input'))
+
+
+def test_removing_a_tool_removes_its_connections(example):
+    workflow = example('Example-Simple')
+    with workflow.batch():
+        workflow.remove_tool(4)
+    assert workflow.connections_from(2) == list()
+    assert workflow.connections_to(5) == list()
+    assert len(workflow.connections) == 3
+    assert workflow.tools[2].outputs == list()
+    assert workflow.tools[5].inputs == list()
+
+
+def test_version_changes_with_every_edit():
+    graph = ConnectionGraph()
+    versions = [graph.version]
+    connection = Connection(1, 'Output', 1, 'Input')
+    graph.append(connection)
+    versions.append(graph.version)
+    assert graph.remove_tool(1) == [connection]
+    versions.append(graph.version)
+    assert graph.outgoing(1) == graph.incoming(1) == list()
+    graph.clear()
+    versions.append(graph.version)
+    assert len(set(versions)) == 4
+
+
+def test_the_same_connection_cannot_be_added_twice():
+    connection = Connection(1, 'Output', 2, 'Input')
+    graph = ConnectionGraph([connection])
+    with pytest.raises(ValueError):
+        graph.append(connection)
+    with pytest.raises(ValueError):
+        ConnectionGraph([connection, connection])
+    assert list(graph) == [connection]
+    assert graph.incoming(2) == [connection]
@@ -0,0 +1,120 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import csv
+
+import pytest
+
+from pyx.csv_reader import CsvReader, encoding_for_code_page, parse_delimiter
+from pyx.filtertool import FilterTool
+from pyx.simple_filter import SimpleFilter
+
+
+def read(path, **kwargs):
+    reader = CsvReader(str(path), **kwargs)
+    batches = list(reader.batches())
+    return reader.schema.names(), [list(row) for batch in batches for row in zip(*batch.columns)]
+
+
+def reference(path, encoding='latin-1'):
+    with open(path, newline='', encoding=encoding) as f:
+        rows = [row for row in csv.reader(f) if row]
+    return rows[0], rows[1:]
+
+
+@pytest.fixture(params=[1, 2], ids=['inline', 'workers'])
+def workers(request):
+    return request.param
+
+
+def test_ragged_rows_do_not_shift_fields(tmp_path, workers):
+    path = tmp_path / 'ragged.csv'
+    path.write_text('x,y,z\n1,2,3,4\n5,6\n7,8,9\n')
+    names, rows = read(path, workers=workers)
+    assert names == ['x', 'y', 'z']
+    assert rows == [['1', '2', '3'], ['5', '6', None], ['7', '8', '9']]
+
+
+def test_quoted_and_multiline_fields_across_chunks(tmp_path, workers):
+    path = tmp_path / 'quoted.csv'
+    records = [['id', 'text', 'n']]
+    for i in range(500):
+        text = [f"plain {i}", f"comma, {i}", f'say ""hi"" {i}', f"line\nbreak {i}", ''][i % 5]
+        records.append([str(i), text.replace('""', '"'), str(i * 2)])
+    with open(path, 'w', newline='', encoding='latin-1') as f:
+        csv.writer(f, lineterminator='\r\n').writerows(records)
+    expected = reference(path)
+    names, rows = read(path, workers=workers, chunk_size=97)
+    assert (names, rows) == (expected[0], expected[1])
+
+
+@pytest.mark.parametrize('settings', [dict(), dict({'record_limit': 333}), dict({'import_line': 42})])
+def test_parallel_reads_match_a_single_worker(tmp_path, settings):
+    path = tmp_path / 'mixed.csv'
+    with open(path, 'w', newline='', encoding='latin-1') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['id', 'name', 'amount', 'joined'])
+        writer.writerows([i, ['Golden', 'Den, ver', 'multi\nline', ''][i % 4], f"{i}.25", f"2020-01-{i % 28 + 1:02d}"]
+                         for i in range(2000))
+
+    def batches(workers):
+        reader = CsvReader(str(path), workers=workers, chunk_size=512, batch_size=100, **settings)
+        return reader.schema, [list(zip(*batch.columns)) for batch in reader.batches()]
+
+    expected = batches(1)
+    assert len(expected[1]) > 1
+    assert batches(3) == expected
+    path = tmp_path / 'blank.csv'
+    path.write_text('a,b\n1,2\n\n3,4\n')
+    assert read(path, workers=1)[1] == [['1', '2'], ['3', '4']]
+
+
+def test_settings_of_the_input_tool(tmp_path):
+    path = tmp_path / 'settings.csv'
+    path.write_text('skip me\n1;2\n3;4\n5;6\n', encoding='latin-1')
+    names, rows = read(path, delimiter=';', header_row=False, import_line=2, record_limit=2, workers=1)
+    assert names == ['Field_1', 'Field_2']
+    assert rows == [['1', '2'], ['3', '4']]
+    path.write_text('a,a,b\nlong value,2,3\n')
+    names, rows = read(path, field_length=4, workers=1)
+    assert names == ['a', 'a2', 'b']
+    assert rows == [['long', '2', '3']]
+
+
+def test_utf16_files_are_read_in_one_pass(tmp_path):
+    path = tmp_path / 'wide.csv'
+    path.write_text('a,b\n"x,y",Ā\n1,2\n', encoding='utf-16-le')
+    assert read(path, code_page=1200, workers=1) == (['a', 'b'], [['x,y', 'Ā'], ['1', '2']])
+
+
+def test_fields_and_predicates(tmp_path, workers):
+    path = tmp_path / 'cities.csv'
+    path.write_text('id,city,amount\n' + ''.join(f"{i},{['Golden', 'Denver'][i % 2]},{i}\n" for i in range(100)))
+    tool = FilterTool(2)
+    simple = dict({'Field': 'city', 'Operator': '=', 'Operands': dict({'Operand': 'Golden'})})
+    tool.properties = dict({'Configuration': dict({'Mode': 'Simple', 'Simple': simple})})
+    condition = SimpleFilter(tool)
+    names, rows = read(path, workers=workers, chunk_size=64, fields=lambda n: n != 'amount',
+                       predicates=[condition.mask], record_limit=10)
+    assert names == ['id', 'city']
+    assert rows == [[str(i), 'Golden'] for i in range(0, 20, 2)]
+
+
+def test_code_pages_and_delimiters():
+    assert encoding_for_code_page(65001) == 'utf-8'
+    assert encoding_for_code_page('1252') == 'cp1252'
+    assert parse_delimiter('\\t') == '\t'
+    assert parse_delimiter('|') == '|'
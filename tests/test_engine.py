@@ -0,0 +1,156 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyx.engine import Engine, UnsupportedToolError
+from pyx.sorttool import SortKey, SortOrder
+
+HEADER = 'CustomerID,Store Number,Customer Segment,Responder,First Name,Last Name,Address,City,State,Zip'
+ROWS = [
+    ('1', '10', 'Corporate', 'Yes', 'Ann', 'Lee', '1 Main St', 'Golden', 'CO', '80401'),
+    ('2', '9', 'Consumer', 'Yes', 'Bo', 'Diaz', '2 Elm St', 'DENVER', 'CO', '80202'),
+    ('3', '100', 'Consumer', 'No', 'Cy', 'Park', '3 Oak St', 'Golden', 'CO', '80401'),
+    ('4', '9', 'Home Office', 'Yes', 'Di', 'Ray', '4 Ash St', 'Arvada', 'CO', '80002'),
+    ('5', '10', 'Corporate', 'Yes', 'Ed', 'Fox', '5 Fir St', 'Lakewood', 'CO', '80226'),
+    ('6', '1', 'Consumer', 'No', 'Flo', 'Kim', '6 Bay St', 'DENVER', 'CO', '80203'),
+]
+
+
+@pytest.fixture
+def customers(tmp_path):
+    with open(tmp_path / 'Customers.csv', 'w') as f:
+        f.write(HEADER + ',Lat,Lon\n')
+        f.write(''.join(','.join(row) + ',39.75,-105.2\n' for row in ROWS))
+
+
+def expected(rows):
+    return '\n'.join([HEADER] + [','.join(row) for row in rows]) + '\n'
+
+
+def passes(row):
+    return row[7] != 'DENVER' and row[3] == 'Yes'
+
+
+def test_runs_every_tool(example, run_workflow, customers):
+    result, output = run_workflow(example('Example-Simple'))
+    # Autofield makes Store Number numeric, so it sorts as a number; the sort keeps equal records in order
+    assert output == expected(sorted(filter(passes, ROWS), key=lambda row: int(row[1])))
+    assert result.records == {1: {'Output': 6}, 3: {'Output': 6}, 2: {'Output': 6},
+                              4: {'True': 3, 'False': 3}, 5: {'Output': 3}, 6: {}}
+
+
+def test_filter_false_output(example, run_workflow, customers):
+    workflow = example('Example-Simple')
+    with workflow.batch():
+        workflow.remove_connection(4, 'True', 5, 'Input')
+        workflow.add_connection(4, 'False', 5, 'Input')
+    _, output = run_workflow(workflow)
+    assert output == expected(sorted((row for row in ROWS if not passes(row)), key=lambda row: int(row[1])))
+
+
+def test_sort_descending_on_several_fields(example, run_workflow, customers):
+    workflow = example('Example-Simple')
+    with workflow.batch():
+        workflow.remove_tool(4)
+        workflow.add_connection(2, 'Output', 5, 'Input')
+    workflow.tools[5].sort_keys = [SortKey('Store Number', SortOrder.DESCENDING), SortKey('Last Name')]
+    _, output = run_workflow(workflow)
+    assert output == expected(sorted(sorted(ROWS, key=lambda row: row[5]), key=lambda row: -int(row[1])))
+
+
+@pytest.mark.parametrize('order_changed', [False, True])
+def test_select_renames_drops_and_reorders_fields(example, run_workflow, customers, order_changed):
+    workflow = example('Example-Simple')
+    configuration = workflow.tools[2].properties['Configuration']
+    configuration['OrderChanged']['@value'] = str(order_changed)
+    configuration['SelectFields']['SelectField'] = [
+        dict({'@field': 'City', '@selected': 'True', '@rename': 'Town'}),
+        dict({'@field': 'Responder', '@selected': 'True'}),
+        dict({'@field': 'Store Number', '@selected': 'True'}),
+        dict({'@field': '*Unknown', '@selected': 'False'})]
+    workflow.tools[4].expression = '[Town] != "DENVER" AND [Responder] == "Yes"'
+    workflow.invalidate_schemas(2)
+    _, output = run_workflow(workflow)
+    rows = sorted(filter(passes, ROWS), key=lambda row: int(row[1]))
+    if order_changed:
+        lines = ['Town,Responder,Store Number'] + [f"{row[7]},{row[3]},{row[1]}" for row in rows]
+    else:
+        lines = ['Store Number,Responder,Town'] + [f"{row[1]},{row[3]},{row[7]}" for row in rows]
+    assert output == ''.join(f"{line}\n" for line in lines)
+
+
+def test_autofield_off_keeps_text_order(example, run_workflow, customers):
+    workflow = example('Example-Simple')
+    workflow.tools[3].set_field('Store Number', False)
+    _, output = run_workflow(workflow)
+    assert output == expected(sorted(filter(passes, ROWS), key=lambda row: row[1]))
+
+
+def test_input_record_limit(example, run_workflow, customers):
+    workflow = example('Example-Simple')
+    workflow.tools[1].record_limit = 3
+    result, output = run_workflow(workflow)
+    assert result.records[1] == {'Output': 3}
+    assert output == expected(sorted(filter(passes, ROWS[:3]), key=lambda row: int(row[1])))
+
+
+def test_output_writes_configured_format(example, run_workflow, customers, tmp_path):
+    workflow = example('Example-Simple')
+    workflow.tools[6].properties['Configuration']['FormatSpecificOptions']['Delimeter'] = '|'
+    run_workflow(workflow)
+    lines = (tmp_path / 'output.csv').read_bytes().split(b'\r\n')
+    assert lines[0] == HEADER.replace(',', '|').encode('latin-1')
+    assert lines[-1] == b''
+    assert len(lines) == 5
+
+
+def test_unsupported_tools_are_rejected(example, tmp_path):
+    workflow = example('Example-Simple')
+    workflow.tools[1].file_format = 19
+    with pytest.raises(UnsupportedToolError):
+        Engine(workflow, resolve_path=lambda p: str(tmp_path / p.split('\\')[-1]), workers=1).run()
+
+
+def test_output_without_records_writes_header(example, tmp_path):
+    (tmp_path / 'output.csv').write_text('stale\n')
+    workflow = example('Example-Simple')
+    engine = Engine(workflow, resolve_path=lambda p: str(tmp_path / p.split('\\')[-1]), workers=1)
+    output = engine.operator(workflow.tools[6])
+    output.finish()
+    assert output.files == [str(tmp_path / 'output.csv')]
+    assert (tmp_path / 'output.csv').read_text() == \
+        'CustomerID,Store Number,Customer Segment,Responder,First Name,Last Name,Address,City,State,Zip\n'
+
+
+@pytest.mark.parametrize('workers,threads,queue_size', [(2, 1, 4), (1, 4, 1), (3, 4, 2)])
+def test_parallel_runs_match_a_sequential_run(example, tmp_path, workers, threads, queue_size):
+    with open(tmp_path / 'Customers.csv', 'w') as f:
+        f.write(HEADER + ',Lat,Lon\n')
+        for i in range(3000):
+            row = list(ROWS[i % len(ROWS)])
+            row[0], row[1] = str(i), str(i * 7 % 101)
+            f.write(','.join(row) + ',39.75,-105.2\n')
+    workflow = example('Example-Simple')
+
+    def run(**kwargs):
+        engine = Engine(workflow, resolve_path=lambda p: str(tmp_path / p.split('\\')[-1]), batch_size=50, **kwargs)
+        result = engine.run()
+        return result.records, (tmp_path / 'output.csv').read_text(encoding='utf-8-sig')
+
+    expected = run(workers=1)
+    assert expected[0][4] == {'True': 1500, 'False': 1500}
+    assert run(workers=workers, threads=threads, queue_size=queue_size) == expected
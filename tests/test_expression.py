@@ -0,0 +1,49 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyx.expression import parse
+from pyx.expression_compiler import compile_expression
+
+
+@pytest.mark.parametrize('text', [
+    '[n] > 3',
+    '[n] = [x]',
+    '[x] / 2 < 1',
+    '[n] + [x] >= 8',
+    '[n] % 2 = 0',
+    'NOT [n] = 1',
+    '[n] IN (1, 7, 40)',
+    'Abs([n]) > 4',
+    'Round([x], 1) = 1.5',
+    'Min([n], [x]) < 0',
+    '[s] = "DENVER"',
+    '[s] != "Denver" AND [n] < 10',
+    'IsNull([s]) OR IsEmpty([s])',
+    'Contains([s], "en")',
+    'Length([s]) > 5',
+    'Uppercase([s]) = "DENVER"',
+    'Left([s], 2) = "De"',
+    '[s] + "x" = "7x"',
+    'ToNumber([s]) = 7',
+    'IIF([n] > 5, [x] > 5, [s] = "Denver")',
+    'IF [x] > 0 THEN [n] > 0 ELSEIF [x] < 0 THEN True ELSE False ENDIF',
+    '[d] >= "2020-01-01" AND [d] < "2021-01-01"',
+    'DateTimeYear([d]) = 2020',
+])
+def test_compiled_matches_scalar_evaluation(text, typed_batch, scalar_predicate):
+    assert compile_expression(text).predicate(typed_batch).tolist() == scalar_predicate(parse(text), typed_batch)
@@ -0,0 +1,70 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import random
+
+import pytest
+
+from pyx.external_sort import ExternalSorter
+from pyx.field_schema import Field, FieldType
+from pyx.record_batch import RecordBatch
+from pyx.sorttool import SortKey, SortOrder
+
+FIELDS = [Field('id', FieldType.INT64), Field('group', FieldType.INT32), Field('name', FieldType.V_STRING, 254),
+          Field('score', FieldType.DOUBLE)]
+
+
+def batches(count: int, size: int):
+    generator = random.Random(count)
+    names = ['alpha', 'Beta', 'gamma', 'Delta', '', None, 'éclair', 'zeta']
+    for b in range(count):
+        rows = [(b * size + i, generator.randrange(5), generator.choice(names),
+                 generator.choice([None, round(generator.uniform(-10, 10), 2)])) for i in range(size)]
+        yield RecordBatch.from_columns(FIELDS, [list(column) for column in zip(*rows)])
+
+
+def sort(keys, memory_budget: int, dictionary_order: bool = False):
+    sorter = ExternalSorter(keys, memory_budget, batch_size=7, dictionary_order=dictionary_order)
+    for batch in batches(20, 23):
+        sorter.add(batch)
+    result = [row for batch in sorter.sorted() for row in batch.rows()]
+    return result, sorter.runs
+
+
+@pytest.mark.parametrize('dictionary_order', [False, True])
+@pytest.mark.parametrize('keys', [
+    [SortKey('group')],
+    [SortKey('name'), SortKey('score', SortOrder.DESCENDING)],
+    [SortKey('score'), SortKey('group', SortOrder.DESCENDING)],
+])
+def test_spilled_sort_matches_in_memory_sort(keys, dictionary_order):
+    in_memory, runs = sort(keys, ExternalSorter.DEFAULT_MEMORY_BUDGET, dictionary_order)
+    assert runs == 0
+    spilled, runs = sort(keys, 1024, dictionary_order)
+    assert runs > 1
+    assert spilled == in_memory
+    assert sorted(row[0] for row in spilled) == list(range(20 * 23))
+
+
+def test_sort_is_stable_across_runs():
+    spilled, runs = sort([SortKey('group')], 1)
+    assert runs == 20
+    assert spilled == sorted(spilled, key=lambda row: (row[1], row[0]))
+
+
+def test_sorting_nothing_yields_nothing():
+    assert list(ExternalSorter([SortKey('id')], 1).sorted()) == []
@@ -0,0 +1,76 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from pyx.connection import Connection
+from pyx.tool import ToolConnection, ToolPosition
+
+
+def _structure(workflow, mapping=None):
+    """Returns the tools and connections of a workflow in a comparable form, with IDs renamed through mapping.
+    """
+    rename = (lambda i: mapping.get(i, i)) if mapping else (lambda i: i)
+    tools = {rename(i): (type(t), t.plugin, t.content_hash()) for i, t in workflow.tools.items()}
+    connections = sorted((rename(c.origin_tool_id), c.origin_output, rename(c.destination_tool_id),
+                          c.destination_input) for c in workflow.connections)
+    return tools, connections
+
+
+def test_extract_copies_tools_and_keeps_boundary_connections(example):
+    workflow = example('Example-Simple')
+    fragment = workflow.extract([2, 4])
+    assert sorted(fragment.tools) == [2, 4]
+    assert list(fragment.connections) == [Connection(2, 'Output', 4, 'Input')]
+    assert sorted(c._values() for c in fragment.boundary_connections) == [(3, 'Output', 2, 'Input'),
+                                                                          (4, 'True', 5, 'Input')]
+    assert fragment.tools[2] is not workflow.tools[2]
+    assert fragment.tools[2].outputs == [ToolConnection(4, 'Output', 'Input')]
+    assert fragment.tools[4].outputs == list()
+
+    fragment.tools[2].properties['Configuration']['OrderChanged']['@value'] = 'True'
+    assert workflow.tools[2].properties['Configuration']['OrderChanged']['@value'] == 'False'
+
+
+def test_splice_is_the_inverse_of_extract(example):
+    workflow = example('Example-Simple')
+    expected = _structure(workflow)
+
+    fragment = workflow.extract([2, 4])
+    with workflow.batch():
+        workflow.remove_tool(2)
+        workflow.remove_tool(4)
+    mapping = workflow.splice(fragment, connect={3: 3, 5: 5})
+
+    assert sorted(mapping) == [2, 4]
+    assert min(mapping.values()) > 6
+    assert _structure(workflow, {new: old for old, new in mapping.items()}) == expected
+    assert workflow.topological_order() == [1, 3, mapping[2], mapping[4], 5, 6]
+
+
+def test_splice_adds_copies_with_new_ids(example):
+    workflow = example('Example-Simple')
+    fragment = workflow.extract([3, 2])
+    mapping = workflow.splice(fragment, offset=ToolPosition(0, 200))
+
+    assert len(workflow.tools) == 8
+    assert workflow.connections_from(mapping[3]) == [Connection(mapping[3], 'Output', mapping[2], 'Input')]
+    assert workflow.connections_to(mapping[3]) == list()
+    assert workflow.tools[mapping[2]].position == ToolPosition(workflow.tools[2].position.x,
+                                                               workflow.tools[2].position.y + 200)
+    assert workflow.tools[mapping[2]].content_hash() == workflow.tools[2].content_hash()
+
+    again = workflow.splice(fragment)
+    assert set(again.values()).isdisjoint(mapping.values())
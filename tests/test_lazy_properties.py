@@ -0,0 +1,74 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+from types import SimpleNamespace
+
+import pytest
+import xmltodict
+
+from pyx import tool
+from pyx.tool import Tool
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Counts the Properties elements converted to dicts by pyx.tool.
+    """
+    calls = list()
+
+    def parse(xml, *args, **kwargs):
+        calls.append(xml)
+        return xmltodict.parse(xml, *args, **kwargs)
+
+    monkeypatch.setattr(tool, 'xmltodict', SimpleNamespace(parse=parse))
+    return calls
+
+
+def test_reading_and_writing_leave_properties_unparsed(example, parses):
+    workflow = example('Example-Simple')
+    workflow.write_xml(io.StringIO())
+    workflow.write_xml(io.StringIO(), preserve_source=False)
+    assert not any(t.is_modified() for t in workflow.tools.values())
+    assert all(t.raw_properties is not None for t in workflow.tools.values())
+    assert parses == list()
+
+
+def test_properties_are_parsed_once_on_first_access(example, parses):
+    workflow = example('Example-Simple')
+    select = workflow.tools[2]
+    assert select.properties['Configuration']['OrderChanged']['@value'] == 'False'
+    assert select.properties is select.properties
+    assert len(parses) == 1
+    assert select.raw_properties is None
+    assert workflow.tools[1].raw_properties is not None
+
+
+def test_parsed_properties_are_shared_with_copies(example):
+    workflow = example('Example-Simple')
+    copy = workflow.add_tool(Tool(7))
+    copy.tools[2].properties['Configuration']['OrderChanged']['@value'] = 'True'
+    assert workflow.tools[2].raw_properties is None
+    assert workflow.tools[2].is_modified()
+
+
+def test_raw_properties_are_parsed_when_accessed(parses):
+    created = Tool(1)
+    created.raw_properties = b'<Properties><Configuration><Value>1</Value></Configuration></Properties>'
+    assert parses == list()
+    assert created.properties == {'Configuration': {'Value': '1'}}
+    assert len(parses) == 1
@@ -0,0 +1,82 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import random
+
+import pytest
+
+from pyx.engine import Engine
+
+CITIES = ['Golden', 'DENVER', 'Denver', 'Lakewood', 'Arvada', '']
+
+
+@pytest.fixture
+def customers(tmp_path):
+    generator = random.Random(25)
+    with open(tmp_path / 'Customers.csv', 'w') as f:
+        f.write('Customer ID,Store Number,City,Responder,Joined,Amount,Lat,Lon\n')
+        for i in range(500):
+            f.write(f"{i},{generator.randrange(300)},{generator.choice(CITIES)},{generator.choice(['Yes', 'No'])},"
+                    f"2014-02-{generator.randrange(1, 29):02},{generator.uniform(0, 100):.2f},39.7,-105.2\n")
+
+
+def without_autofield(workflow, field='City', operator='!=', operand='DENVER', rename='', false_output=False):
+    """Connects the Input tool straight to the Select tool so the simple Filter can be pushed into the Input.
+    """
+    workflow.remove_tool(3)
+    workflow.add_connection(1, 'Output', 2, 'Input')
+    workflow.tools[2].properties['Configuration']['SelectFields']['SelectField'] = [
+        dict({'@field': 'City', '@selected': 'True', '@rename': rename}),
+        dict({'@field': 'Amount', '@selected': 'True'}),
+        dict({'@field': 'Store Number', '@selected': 'True'}),
+        dict({'@field': '*Unknown', '@selected': 'False'})]
+    simple = workflow.tools[4].properties['Configuration']['Simple']
+    simple['Field'] = field
+    simple['Operator'] = operator
+    simple['Operands']['Operand'] = operand
+    if false_output:
+        workflow.add_connection(4, 'False', 6, 'Input')
+    return workflow
+
+
+@pytest.mark.parametrize('name, changes', [
+    ('Example-Simple', None),
+    ('Example-Simple2', None),
+    ('Example-Simple2', dict()),
+    ('Example-Simple2', dict({'false_output': True})),
+    ('Example-Simple2', dict({'field': 'Town', 'operator': '=', 'operand': 'Golden', 'rename': 'Town'})),
+    ('Example-Simple2', dict({'field': 'Amount', 'operator': '>', 'operand': '50'})),
+    ('Example-Simple2', dict({'field': 'City', 'operator': 'IsEmpty'})),
+])
+def test_pushdown_gives_the_same_output(example, run_workflow, customers, name, changes):
+    outputs = list()
+    for optimize in (True, False):
+        workflow = example(name)
+        if changes is not None:
+            workflow = without_autofield(workflow, **changes)
+        result, output = run_workflow(workflow, optimize=optimize)
+        outputs.append((result.records[6], output))
+    assert outputs[0] == outputs[1]
+    assert outputs[0][1].count('\n') > 1
+
+
+def test_simple_filter_is_pushed_into_input(example, run_workflow, customers):
+    workflow = without_autofield(example('Example-Simple2'))
+    assert Engine(workflow).plan().input(1).filters
+    optimized, _ = run_workflow(workflow, optimize=True)
+    unoptimized, _ = run_workflow(workflow, optimize=False)
+    assert optimized.records[1]['Output'] < unoptimized.records[1]['Output'] == 500
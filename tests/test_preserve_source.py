@@ -0,0 +1,100 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+import re
+
+import pytest
+
+from pyx.tool import ToolPosition
+from pyx.workflow import Workflow
+
+NAMES = ['Example-Blank', 'Example-SingleTool', 'Example-Simple', 'Example-Simple2']
+NODE = re.compile(r'<Node ToolID="(\d+)">.*?</Node>', re.S)
+CONNECTION = re.compile(r'<Connection>.*?</Connection>', re.S)
+
+
+def _written(workflow, preserve_source=True):
+    text = io.StringIO()
+    workflow.write_xml(text, preserve_source)
+    return text.getvalue()
+
+
+def _nodes(text):
+    return {int(match.group(1)): match.group(0) for match in NODE.finditer(text)}
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_unedited_workflows_are_written_verbatim(example_path, name):
+    with open(example_path(name)) as f:
+        original = f.read()
+    workflow = Workflow.read(example_path(name))
+    assert _written(workflow) == original
+
+    for tool in workflow.tools.values():
+        tool.properties
+    assert _written(workflow) == original
+
+
+# Example-Simple2 was itself written by an earlier version of pyx
+@pytest.mark.parametrize('name', ['Example-Blank', 'Example-SingleTool', 'Example-Simple'])
+def test_rewritten_workflows_keep_the_designer_layout(example_path, name):
+    with open(example_path(name)) as f:
+        original = f.read()
+    written = _written(Workflow.read(example_path(name)), preserve_source=False)
+    assert written.splitlines()[1:] == original.splitlines()[1:]
+
+
+def test_only_edited_tools_are_rewritten(example_path):
+    with open(example_path('Example-Simple')) as f:
+        original = _nodes(f.read())
+    workflow = Workflow.read(example_path('Example-Simple'))
+    with workflow.batch():
+        workflow.tools[5].properties['Configuration']['SortInfo']['Field']['@order'] = 'Descending'
+        workflow.tools[6].position = ToolPosition(700, 54)
+
+    written = _nodes(_written(workflow))
+    assert {i for i in written if written[i] != original[i]} == {5, 6}
+    assert 'order="Descending"' in written[5]
+    assert '<Position x="700" y="54"' in written[6]
+    assert written[5] == _nodes(_written(workflow, preserve_source=False))[5]
+
+
+def test_only_edited_connections_are_rewritten(example_path, tmp_path):
+    # Source formatting that pyx would never write itself shows which connections were copied
+    with open(example_path('Example-Simple')) as f:
+        text = f.read().replace('<Origin ToolID="', '<Origin  ToolID="')
+    path = tmp_path / 'spaced.yxmd'
+    path.write_text(text)
+
+    workflow = Workflow.read(str(path))
+    with workflow.batch():
+        workflow.remove_connection(2, 'Output', 4, 'Input')
+        workflow.add_connection(2, 'Output', 4, 'Input')
+
+    connections = CONNECTION.findall(_written(workflow))
+    assert len(connections) == 5
+    assert [c for c in connections if '<Origin ToolID="' in c] == [connections[-1]]
+    assert CONNECTION.findall(text)[:1] + CONNECTION.findall(text)[2:] == connections[:-1]
+
+
+def test_edited_workflow_properties_are_rewritten(example_path):
+    workflow = Workflow.read(example_path('Example-Simple'))
+    workflow.properties['MetaInfo']['Name'] = 'Renamed'
+    written = _written(workflow)
+    assert '<Name>Renamed</Name>' in written
+    assert _nodes(written) == _nodes(_written(Workflow.read(example_path('Example-Simple'))))
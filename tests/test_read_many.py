@@ -0,0 +1,70 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+import shutil
+
+import pytest
+
+from pyx.workflow import Workflow
+
+
+@pytest.fixture
+def corpus(example_path, tmp_path):
+    """A directory of the example workflows in nested folders, along with a broken file and a file to skip.
+    """
+    for i, name in enumerate(['Example-Blank', 'Example-SingleTool', 'Example-Simple', 'Example-Simple2']):
+        folder = tmp_path / 'corpus' / f'folder{i % 2}'
+        folder.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(example_path(name), folder / (name + ('.yxmc' if i == 3 else '.yxmd')))
+    (tmp_path / 'corpus' / 'broken.yxmd').write_text('<AlteryxDocument><Nodes>')
+    (tmp_path / 'corpus' / 'notes.txt').write_text('not a workflow')
+    return str(tmp_path / 'corpus')
+
+
+def _written(workflow):
+    text = io.StringIO()
+    workflow.write_xml(text)
+    return text.getvalue()
+
+
+def test_find_files_walks_directories_in_order(corpus, example_path):
+    found = list(Workflow.find_files([corpus, example_path('Example-Blank')]))
+    assert [f[len(corpus) + 1:] for f in found[:-1]] == [
+        'broken.yxmd', 'folder0/Example-Blank.yxmd', 'folder0/Example-Simple.yxmd',
+        'folder1/Example-Simple2.yxmc', 'folder1/Example-SingleTool.yxmd']
+    assert found[-1] == example_path('Example-Blank')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_read_many_matches_serial_reads(corpus, tmp_path, workers):
+    results = {r.filename: r for r in Workflow.read_many([corpus], workers, cache_dir=str(tmp_path / 'cache'))}
+    assert sorted(results) == sorted(Workflow.find_files([corpus]))
+
+    for filename, result in results.items():
+        if filename.endswith('broken.yxmd'):
+            assert result.workflow is None
+            assert result.error is not None
+            continue
+        assert result.error is None
+        expected = Workflow.read(filename)
+        assert result.workflow.filename == filename
+        assert result.workflow.name == expected.name
+        assert result.workflow.connections == expected.connections
+        assert [t.properties for t in result.workflow.tools.values()] == \
+            [t.properties for t in expected.tools.values()]
+        assert _written(result.workflow) == _written(expected)
@@ -0,0 +1,72 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from pyx.field_schema import Field, FieldSchema, FieldType
+from pyx.record_batch import RecordBatch, cast, null_mask, to_objects
+
+
+def objects(*values):
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def test_cast_parses_large_integers_exactly():
+    column = cast(objects('9007199254740993', '12345678901234567', ' -3 ', '9223372036854775807'), FieldType.INT64)
+    assert column.dtype == np.int64
+    assert column.tolist() == [9007199254740993, 12345678901234567, -3, 9223372036854775807]
+
+
+def test_cast_integers_with_nulls_and_decimals_become_truncated_floats():
+    column = cast(objects('1.7', None, 'x', '-2.5'), FieldType.INT32)
+    assert column.dtype == np.float64
+    assert column[0] == 1.0 and column[3] == -2.0
+    assert null_mask(column).tolist() == [False, True, True, False]
+
+
+def test_cast_integer_columns_keep_their_values():
+    column = np.array([2 ** 62 + 1, -5], dtype=np.int64)
+    assert cast(column, FieldType.INT32) is column
+    assert cast(np.array([True, False]), FieldType.INT16).tolist() == [1, 0]
+    assert cast(np.array([1.9, np.nan]), FieldType.INT64)[0] == 1.0
+
+
+def test_cast_doubles_dates_and_bools():
+    assert cast(objects('1.5', ' 2e3 ', 'abc'), FieldType.DOUBLE)[:2].tolist() == [1.5, 2000.0]
+    dates = cast(objects('2020-01-31', 'not a date', None), FieldType.DATE)
+    assert dates.dtype == np.dtype('datetime64[D]')
+    assert dates[0] == np.datetime64('2020-01-31') and np.isnat(dates[1:]).all()
+    assert cast(objects('True', 'no', '1'), FieldType.BOOL).tolist() == [True, False, True]
+    assert cast(objects('yes', 'maybe'), FieldType.BOOL).tolist() == [True, None]
+
+
+def test_cast_to_text_round_trips():
+    assert cast(np.array([1.0, 2.5, np.nan]), FieldType.V_STRING).tolist() == ['1', '2.5', None]
+    assert cast(np.array([9007199254740993]), FieldType.V_STRING).tolist() == ['9007199254740993']
+    text = cast(np.array(['2020-01-02T03:04:05'], dtype='datetime64[s]'), FieldType.V_STRING)
+    assert text.tolist() == ['2020-01-02 03:04:05']
+    assert to_objects(np.array([1.0, np.nan])).tolist() == [1.0, None]
+
+
+def test_selections_gather_columns_lazily():
+    schema = FieldSchema([Field('a', FieldType.INT64), Field('b', FieldType.V_STRING)])
+    batch = RecordBatch(schema, [np.arange(5), objects('v', 'w', 'x', 'y', 'z')])
+    selected = batch.filter(batch.column('a') % 2 == 0).take(np.array([2, 0]))
+    assert selected.column('a').tolist() == [4, 0]
+    assert selected.column('b').tolist() == ['z', 'v']
+    assert len(batch.slice(1, 3)) == 2
@@ -0,0 +1,143 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+from datetime import date, timedelta
+
+from pyx.engine import Engine
+from pyx.field_schema import Field, FieldType
+from pyx.filtertool import FilterDateType, FilterMode, FilterOperator, FilterPeriodType
+from pyx.record_batch import RecordBatch
+from pyx.result_cache import ResultCache
+
+FIELDS = [Field('id', FieldType.INT64), Field('name', FieldType.V_STRING, 254)]
+
+
+def store(cache: ResultCache, key: str, count: int) -> None:
+    writer = cache.writer(key)
+    writer.add('True', RecordBatch.from_columns(FIELDS, [list(range(count)), ['a'] * count]))
+    writer.add('False', RecordBatch.from_columns(FIELDS, [[-1], [None]]))
+    writer.commit(dict({'True': count, 'False': 1}), list())
+
+
+def test_entries_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    assert cache.get('a') is None
+    store(cache, 'a', 3)
+    result = cache.get('a')
+    assert result.records == dict({'True': 3, 'False': 1})
+    assert [(output, list(batch.rows())) for output, batch in result.batches()] == \
+        [('True', [(0, 'a'), (1, 'a'), (2, 'a')]), ('False', [(-1, None)])]
+    cache.remove('a')
+    assert cache.get('a') is None
+
+
+def test_uncommitted_entries_are_not_visible(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    writer = cache.writer('a')
+    writer.add('Output', RecordBatch.from_columns(FIELDS, [[1], ['a']]))
+    assert cache.get('a') is None
+    writer.abort()
+    assert os.listdir(tmp_path) == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    store(cache, 'a', 1000)
+    store(cache, 'b', 1000)
+    os.utime(cache.entry('a'), (1, 1))
+    os.utime(cache.entry('b'), (2, 2))
+    cache.get('a')
+    small = ResultCache(str(tmp_path), max_size=os.path.getsize(cache.entry('a')) + 1)
+    small.evict()
+    assert small.get('a') is not None
+    assert small.get('b') is None
+
+
+def test_engine_reuses_results_until_something_changes(example, tmp_path):
+    with open(tmp_path / 'Customers.csv', 'w') as f:
+        f.write('Customer ID,Store Number,City,Responder,Joined,Amount\n')
+        f.write(''.join(f"{i},{i % 7},{['Golden', 'DENVER'][i % 2]},Yes,2014-02-17,{i}.50\n" for i in range(50)))
+    cache = ResultCache(str(tmp_path / 'cache'))
+    workflow = example('Example-Simple2')
+
+    def run():
+        engine = Engine(workflow, resolve_path=lambda p: str(tmp_path / p.split('\\')[-1]), workers=1, cache=cache)
+        return engine.run().executed, (tmp_path / 'output.csv').read_bytes()
+
+    executed, output = run()
+    assert sorted(executed) == [1, 2, 3, 4, 5, 6]
+    assert run() == ([], output)
+
+    workflow.tools[4].properties['Configuration']['Simple']['Operands']['Operand'] = 'Golden'
+    workflow.invalidate_schemas(4)
+    executed, changed = run()
+    assert executed == [4, 5, 6]
+    assert changed != output
+
+    os.remove(tmp_path / 'output.csv')
+    assert run() == ([6], changed)
+
+    Engine(workflow, resolve_path=lambda p: str(tmp_path / p.split('\\')[-1]), cache=cache).invalidate(5)
+    assert run()[0] == [5, 6]
+
+    with open(tmp_path / 'Customers.csv', 'a') as f:
+        f.write('50,1,Golden,Yes,2014-01-01,1.00\n')
+    executed, _ = run()
+    assert sorted(executed) == [1, 2, 3, 4, 5, 6]
+
+
+def test_engine_keys_depend_on_the_date_only_for_relative_filters(example, tmp_path, monkeypatch):
+    (tmp_path / 'Customers.csv').write_text('Customer ID,Store Number,City,Responder,Joined,Amount\n')
+    workflow = example('Example-Simple2')
+    day = [date(2020, 3, 1)]
+
+    class Today(date):
+        @classmethod
+        def today(cls):
+            return day[0]
+
+    def keys():
+        engine = Engine(workflow, resolve_path=lambda p: str(tmp_path / p.split('\\')[-1]), workers=1)
+        before = engine.keys()
+        day[0] += timedelta(days=1)
+        return before, Engine(workflow, resolve_path=lambda p: str(tmp_path / p.split('\\')[-1]), workers=1).keys()
+
+    monkeypatch.setattr('pyx.engine.date', Today)
+    before, after = keys()
+    assert before == after
+
+    tool = workflow.tools[4]
+    tool.field = 'Joined'
+    tool.operator = FilterOperator.PERIOD_AFTER
+    tool.period_type = FilterPeriodType.DAYS
+    tool.period_count = 7
+    tool.date_type = FilterDateType.FIXED
+    workflow.invalidate_schemas(4)
+    before, after = keys()
+    assert before == after
+    tool.date_type = FilterDateType.TODAY
+    before, after = keys()
+    assert before[4] != after[4]
+
+    tool.filter_mode = FilterMode.CUSTOM
+    tool.expression = '[Joined] > "2014-01-01"'
+    before, after = keys()
+    assert before == after
+    tool.expression = 'DateTimeAdd(DateTimeToday(), -7, "days") < [Joined]'
+    before, after = keys()
+    assert before[4] != after[4]
@@ -0,0 +1,74 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import threading
+
+import pytest
+
+from pyx.scheduler import DataflowScheduler
+
+
+def chain(scheduler, stages, sink):
+    """Builds a chain of stages that each add one to a number, ending in sink, and returns its first inbox.
+    """
+    inbox = scheduler.inbox(sink)
+    for _ in range(stages):
+        inbox = scheduler.inbox(lambda n, target=inbox: target.put(n + 1))
+    return inbox
+
+
+@pytest.mark.parametrize('threads,queue_size', [(1, 1), (2, 1), (4, 3)])
+def test_many_consumers_share_a_small_pool(threads, queue_size):
+    scheduler = DataflowScheduler(threads, queue_size)
+    results = [list() for _ in range(50)]
+    names = set()
+
+    def sink(results_of_chain):
+        def receive(n):
+            names.add(threading.current_thread().name)
+            results_of_chain.append(n)
+        return receive
+
+    heads = [chain(scheduler, 5, sink(r)) for r in results]
+
+    def produce(head):
+        for n in range(100):
+            head.put(n)
+
+    scheduler.run([lambda head=head: produce(head) for head in heads])
+    assert all(r == list(range(5, 105)) for r in results)
+    assert len(names) <= threads
+
+
+def test_first_error_is_raised_and_waiting_senders_are_cancelled():
+    scheduler = DataflowScheduler(2, 1)
+    slow = threading.Event()
+
+    def fail(n):
+        raise ValueError('bad message')
+
+    def block(n):
+        slow.wait(0.5)
+
+    failing = scheduler.inbox(fail)
+    blocked = scheduler.inbox(block)
+
+    def flood():
+        for n in range(1000):
+            blocked.put(n)
+
+    with pytest.raises(ValueError, match='bad message'):
+        scheduler.run([lambda: failing.put(1), flood])
@@ -0,0 +1,102 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from collections import OrderedDict
+
+from pyx.field_schema import Field, FieldSchema, FieldType
+from pyx.schema_propagation import select_fields
+
+CUSTOMER_FIELDS = ['CustomerID', 'Store Number', 'Customer Segment', 'Responder', 'First Name', 'Last Name',
+                   'Address', 'City', 'State', 'Zip']
+
+
+def _types(schema):
+    return [(f.name, f.type, f.size) for f in schema]
+
+
+def test_schemas_follow_the_workflow(example):
+    workflow = example('Example-Simple')
+    assert workflow.output_schema(1).names() == CUSTOMER_FIELDS + ['Lat', 'Lon']
+    assert {f.type for f in workflow.output_schema(1)} == {FieldType.V_STRING}
+
+    autofield = workflow.output_schema(3)
+    assert _types(autofield)[:2] == [('CustomerID', FieldType.INT16, 0), ('Store Number', FieldType.BYTE, 0)]
+    assert autofield.get('Lat').type == FieldType.DOUBLE
+
+    select = workflow.output_schema(2)
+    assert select.names() == CUSTOMER_FIELDS
+    assert _types(select) == _types(autofield)[:10]
+
+    assert workflow.output_schemas(4) == {'True': select, 'False': select}
+    assert workflow.output_schema(5) == select
+    assert workflow.connection_schema(workflow.connections_to(6)[0]) == select
+    assert workflow.output_schemas(6) == dict({})
+
+
+def test_edits_are_seen_once_the_tool_is_invalidated(example):
+    workflow = example('Example-Simple')
+    assert workflow.output_schema(5).names() == CUSTOMER_FIELDS
+
+    entries = workflow.tools[2].properties['Configuration']['SelectFields']['SelectField']
+    entries.insert(0, OrderedDict([('@field', 'City'), ('@selected', 'True'), ('@rename', 'Town')]))
+    entries.insert(0, OrderedDict([('@field', 'Zip'), ('@selected', 'False')]))
+    assert workflow.output_schema(5).names() == CUSTOMER_FIELDS
+
+    workflow.invalidate_schemas(2)
+    assert workflow.output_schema(5).names() == [n if n != 'City' else 'Town' for n in CUSTOMER_FIELDS[:-1]]
+    assert workflow.output_schema(3).names() == CUSTOMER_FIELDS + ['Lat', 'Lon']
+
+
+def test_autofield_keeps_input_types_of_fields_it_does_not_change(example):
+    workflow = example('Example-Simple')
+    workflow.tools[3].set_field('Zip', False)
+    workflow.invalidate_schemas(3)
+    assert workflow.output_schema(3).get('Zip').type == FieldType.V_STRING
+    assert workflow.output_schema(2).get('Zip').type == FieldType.V_STRING
+    assert workflow.output_schema(2).get('CustomerID').type == FieldType.INT16
+
+
+def test_connection_changes_update_schemas(example):
+    workflow = example('Example-Simple')
+    assert workflow.output_schema(5) is not None
+    with workflow.batch():
+        workflow.remove_connection(3, 'Output', 2, 'Input')
+    assert workflow.output_schema(2) is None
+    assert workflow.output_schema(5) is None
+
+    with workflow.batch():
+        workflow.add_connection(1, 'Output', 2, 'Input')
+    assert workflow.output_schema(5).names() == CUSTOMER_FIELDS
+    assert {f.type for f in workflow.output_schema(5)} == {FieldType.V_STRING}
+
+
+def test_select_fields_renames_retypes_and_reorders():
+    schema = FieldSchema([Field('a', FieldType.V_STRING, 10), Field('b', FieldType.INT32),
+                          Field('c', FieldType.DOUBLE)])
+    configuration = OrderedDict([
+        ('OrderChanged', OrderedDict([('@value', 'True')])),
+        ('SelectFields', OrderedDict([('SelectField', [
+            OrderedDict([('@field', 'c'), ('@selected', 'True'), ('@type', 'FixedDecimal'), ('@size', '19.2')]),
+            OrderedDict([('@field', '*Unknown'), ('@selected', 'True')]),
+            OrderedDict([('@field', 'a'), ('@selected', 'True'), ('@rename', 'A')])])]))])
+    fields = [output for _, output in select_fields(configuration, schema)]
+    assert [(f.name, f.type, f.size, f.scale) for f in fields] == [
+        ('c', FieldType.FIXED_DECIMAL, 19, 2), ('b', FieldType.INT32, 0, 0), ('A', FieldType.V_STRING, 10, 0)]
+
+    configuration['OrderChanged']['@value'] = 'False'
+    configuration['SelectFields']['SelectField'][1]['@selected'] = 'False'
+    assert [output.name for _, output in select_fields(configuration, schema)] == ['A', 'c']
@@ -0,0 +1,99 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from datetime import date, datetime
+
+import pytest
+
+from pyx.filtertool import FilterDateType, FilterOperator, FilterPeriodType, FilterTool
+from pyx.simple_filter import SimpleFilter
+
+TODAY = date(2020, 3, 1)
+
+COMPARISONS = (FilterOperator.EQUAL, FilterOperator.NOT_EQUAL, FilterOperator.LESS_THAN,
+               FilterOperator.LESS_THAN_OR_EQUAL, FilterOperator.GREATER_THAN, FilterOperator.GREATER_THAN_OR_EQUAL)
+
+
+def filter_tool(field: str, operator: FilterOperator, operand: str = '', **operands) -> FilterTool:
+    tool = FilterTool(1)
+    tool.properties = dict({'Configuration': dict({'Mode': 'Simple', 'Simple': dict({
+        'Field': field, 'Operator': None, 'Operands': dict({'Operand': operand})})})})
+    tool.operator = operator
+    for name, value in operands.items():
+        setattr(tool, name, value)
+    return tool
+
+
+def cases():
+    for field in ('n', 'x'):
+        for operator in COMPARISONS:
+            for operand in ('7', '-2.25', '0'):
+                yield filter_tool(field, operator, operand)
+    for field in ('s', 'd', 't', 'ds'):
+        for operator in COMPARISONS:
+            for operand in ('Denver', '7', '2020-01-31', '2020-01-01 00:00:00', ' 2020-01-31', '2020-2-29'):
+                yield filter_tool(field, operator, operand)
+    for field in ('n', 'x', 's', 'd', 'b', 'ds'):
+        for operator in (FilterOperator.IS_NULL, FilterOperator.IS_NOT_NULL, FilterOperator.IS_EMPTY,
+                         FilterOperator.IS_NOT_EMPTY, FilterOperator.IS_TRUE, FilterOperator.IS_FALSE):
+            yield filter_tool(field, operator)
+    for field, operand in (('s', 'en'), ('ds', '-29'), ('n', '4')):
+        for operator in (FilterOperator.CONTAINS, FilterOperator.DOES_NOT_CONTAIN):
+            yield filter_tool(field, operator, operand)
+    for field in ('d', 't', 'ds'):
+        for ignore_time in (True, False):
+            yield filter_tool(field, FilterOperator.DATE_RANGE, ignore_time_in_datetime=ignore_time,
+                              start_date=datetime(2020, 1, 1), end_date=datetime(2020, 2, 29))
+            yield filter_tool(field, FilterOperator.PERIOD_AFTER, ignore_time_in_datetime=ignore_time,
+                              date_type=FilterDateType.FIXED, period_date=datetime(2020, 1, 31),
+                              period_type=FilterPeriodType.MONTHS, period_count=1)
+            yield filter_tool(field, FilterOperator.PERIOD_BEFORE, ignore_time_in_datetime=ignore_time,
+                              date_type=FilterDateType.TODAY, period_type=FilterPeriodType.WEEKS, period_count=2)
+            yield filter_tool(field, FilterOperator.PERIOD_BEFORE, ignore_time_in_datetime=ignore_time,
+                              date_type=FilterDateType.FIXED, period_date=datetime(2021, 6, 1),
+                              period_type=FilterPeriodType.YEARS, period_count=2)
+
+
+@pytest.mark.parametrize('tool', list(cases()), ids=lambda t: f"{t.field} {t.operator} {t.properties}")
+def test_mask_matches_condition(tool, typed_batch, scalar_predicate):
+    simple_filter = SimpleFilter(tool, TODAY)
+    assert simple_filter.mask(typed_batch).tolist() == scalar_predicate(simple_filter.condition(), typed_batch)
+
+
+def test_split_partitions_records(typed_batch):
+    passed, failed = SimpleFilter(filter_tool('n', FilterOperator.GREATER_THAN, '1')).split(typed_batch)
+    assert passed.tolist() == [3, 4]
+    assert failed.tolist() == [0, 1, 2, 5]
+
+
+def test_field_can_be_renamed(typed_batch):
+    simple_filter = SimpleFilter(filter_tool('Amount', FilterOperator.GREATER_THAN, '1'), field='n')
+    assert simple_filter.field == 'n'
+    assert simple_filter.mask(typed_batch).tolist() == [False, False, False, True, True, False]
+
+
+def test_configuration_read_from_a_workflow(example, typed_batch):
+    tool = example('Example-Simple2').tools[4]
+    tool.field = 's'
+    assert SimpleFilter(tool, TODAY).mask(typed_batch).tolist() == [True, True, True, True, True, False]
+
+
+def test_unsupported_operator_is_rejected():
+    tool = filter_tool('n', FilterOperator.EQUAL)
+    tool.properties['Configuration']['Simple']['Operator'] = 'Between'
+    with pytest.raises(ValueError):
+        SimpleFilter(tool)
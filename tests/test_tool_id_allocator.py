@@ -0,0 +1,32 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import pytest
+
+from pyx.tool_id_allocator import ToolIdAllocator
+
+
+def test_reserve_skips_ranges_with_used_ids():
+    allocator = ToolIdAllocator([1, 2])
+    assert allocator.reserve(3, used={4, 9}) == range(5, 8)
+    assert allocator.reserve(3, used={9}) == range(10, 13)
+    assert allocator.next_id == 13
+
+
+def test_reserve_rejects_negative_counts():
+    with pytest.raises(ValueError):
+        ToolIdAllocator().reserve(-1)
@@ -0,0 +1,93 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+from collections import OrderedDict
+from datetime import datetime
+
+from pyx.autofieldtool import AutofieldTool
+from pyx.filtertool import FilterDateType, FilterMode, FilterOperator, FilterPeriodType
+from pyx.sorttool import SortKey, SortOrder, SortTool
+
+
+def autofield(fields) -> AutofieldTool:
+    tool = AutofieldTool(1)
+    tool.properties = dict({'Configuration': dict({'Fields': fields})})
+    return tool
+
+
+def test_autofield_reads_leave_properties_unchanged():
+    single = OrderedDict([('@field', 'A'), ('@selected', 'True')])
+    tool = autofield(OrderedDict([('Field', single)]))
+    assert tool.get_all_fields() == [('A', True)]
+    assert tool.get_field_selection('B') is False
+    assert tool.properties['Configuration']['Fields'] == OrderedDict([('Field', single)])
+
+    empty = autofield(OrderedDict())
+    assert empty.get_all_fields() == []
+    assert empty.properties['Configuration']['Fields'] == OrderedDict()
+
+
+def test_autofield_setters_write_fields_back():
+    tool = autofield(OrderedDict([('Field', OrderedDict([('@field', 'A'), ('@selected', 'True')]))]))
+    tool = tool.set_field('B', False).set_field('A', False)
+    assert tool.get_all_fields() == [('A', False), ('B', False)]
+    assert tool.remove_field('A').get_all_fields() == [('B', False)]
+
+
+def test_sort_reads_leave_properties_unchanged():
+    tool = SortTool(1)
+    tool.properties = dict({'Configuration': OrderedDict()})
+    assert tool.sort_keys == []
+    assert tool.dictionary_order is False
+    assert tool.properties['Configuration'] == OrderedDict()
+
+    tool = tool.add_sort_key('A', SortOrder.DESCENDING)
+    assert tool.sort_keys == [SortKey('A', SortOrder.DESCENDING)]
+    assert tool.properties['Configuration']['SortInfo']['@locale'] == '0'
+
+
+def test_filter_accessors_read_a_workflow(example):
+    tool = example('Example-Simple2').tools[4]
+    assert tool.filter_mode == FilterMode.SIMPLE
+    assert (tool.field, tool.operator, tool.operand) == ('City', FilterOperator.NOT_EQUAL, 'DENVER')
+    assert tool.ignore_time_in_datetime is True
+    assert tool.date_type == FilterDateType.FIXED
+    assert tool.period_type == FilterPeriodType.DAYS
+    assert tool.period_count == 0
+    assert tool.start_date == datetime(2019, 12, 19, 14, 33, 35)
+
+    custom = example('Example-Simple').tools[4]
+    assert custom.filter_mode == FilterMode.CUSTOM
+    assert custom.expression == '[City] != "DENVER" AND [Responder] == "Yes"'
+
+
+def test_filter_setters_write_the_file_format(example):
+    workflow = example('Example-Simple2')
+    tool = workflow.tools[4]
+    tool.operator = FilterOperator.GREATER_THAN_OR_EQUAL
+    tool.operand = '50'
+    tool.date_type = FilterDateType.TODAY
+    tool.period_type = FilterPeriodType.WEEKS
+    tool.period_count = 2
+    assert tool.operator == FilterOperator.GREATER_THAN_OR_EQUAL
+    assert (tool.operand, tool.date_type, tool.period_type, tool.period_count) == \
+        ('50', FilterDateType.TODAY, FilterPeriodType.WEEKS, 2)
+
+    stream = io.StringIO()
+    workflow.write_xml(stream)
+    assert '<Operator>&gt;=</Operator>' in stream.getvalue()
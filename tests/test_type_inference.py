@@ -0,0 +1,106 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+from pyx.field_schema import Field, FieldSchema, FieldType
+from pyx.record_batch import RecordBatch
+from pyx.type_inference import TypeGuess, TypeInference
+
+
+def objects(*values):
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def guess(*values) -> Field:
+    return TypeGuess.of(objects(*values)).field(Field('f', FieldType.V_STRING, 254))
+
+
+def test_integers_get_the_smallest_type_by_range():
+    assert guess('1', '255', '', None).type == FieldType.BYTE
+    assert guess('-1', '300').type == FieldType.INT16
+    assert guess('70000').type == FieldType.INT32
+    assert guess('9007199254740993', '1').type == FieldType.INT64
+
+
+def test_other_types():
+    assert guess('1.5', '2').type == FieldType.DOUBLE
+    assert guess('99999999999999999999').type == FieldType.DOUBLE
+    assert guess('2020-01-31', '1999-12-01').type == FieldType.DATE
+    assert guess('2020-01-31 10:11:12').type == FieldType.DATETIME
+    assert guess('10:11:12').type == FieldType.TIME
+    assert guess('True', 'false', 'TRUE', '').type == FieldType.BOOL
+    assert guess('Truth', 'False').type == FieldType.STRING
+    assert guess('True', '1').type == FieldType.V_STRING
+    assert guess('2020-02-30').type == FieldType.STRING
+    assert guess('007', '8').type == FieldType.DOUBLE
+    field = guess('abc', 'de')
+    assert (field.type, field.size) == (FieldType.V_STRING, 3)
+    assert guess('ab', 'cd').type == FieldType.STRING
+    assert guess('Āx').type == FieldType.WSTRING
+
+
+def test_guesses_merge_across_chunks():
+    first = TypeGuess.of(objects('1', '2'))
+    first.merge(TypeGuess.of(objects('2.5')))
+    assert first.field(Field('f', FieldType.V_STRING)).type == FieldType.DOUBLE
+
+    flags = TypeGuess.of(objects('True', 'False'))
+    flags.merge(TypeGuess.of(objects('false')))
+    assert flags.field(Field('f', FieldType.V_STRING)).type == FieldType.BOOL
+    flags.merge(TypeGuess.of(objects('0')))
+    assert flags.field(Field('f', FieldType.V_STRING)).type == FieldType.V_STRING
+
+
+def test_inference_guesses_only_listed_fields():
+    schema = FieldSchema([Field('a', FieldType.V_STRING, 254), Field('b', FieldType.V_STRING, 254)])
+    inference = TypeInference(schema, [1], workers=1)
+    inference.add(RecordBatch(schema, [objects('1', '2'), objects('3', 'x')]))
+    inference.add(RecordBatch(schema, [objects('1'), objects('4')]))
+    result = inference.schema()
+    assert result[0] == schema[0]
+    assert (result[1].type, result[1].size) == (FieldType.STRING, 1)
+
+
+def test_worker_processes_guess_the_same_types_as_one():
+    columns = [[str(i) for i in range(300)], [str(i * 1000) for i in range(300)], ['True', 'false'] * 149 + ['', '0'],
+               [f"2020-01-{i % 28 + 1:02d}" for i in range(299)] + ['x' * 40], [f"{i}.5" for i in range(300)],
+               ['Ā' if i == 250 else 'ab' for i in range(300)]]
+    schema = FieldSchema([Field(f"f{i}", FieldType.V_STRING, 254) for i in range(len(columns))])
+
+    def infer(workers):
+        inference = TypeInference(schema, range(len(columns)), workers=workers)
+        for start in range(0, 300, 7):
+            inference.add(RecordBatch(schema, [objects(*column[start:start + 7]) for column in columns]))
+        return [(field.type, field.size, field.scale) for field in inference.schema()]
+
+    expected = infer(1)
+    assert [guessed[0] for guessed in expected] == [FieldType.INT16, FieldType.INT32, FieldType.V_STRING,
+                                                    FieldType.V_STRING, FieldType.DOUBLE, FieldType.V_WSTRING]
+    assert infer(2) == expected
+    assert infer(4) == expected
+
+
+def test_autofield_keeps_large_integers_exact(example, run_workflow, tmp_path):
+    ids = [9007199254740993, 12345678901234567, 9007199254740995]
+    (tmp_path / 'Customers.csv').write_text('CustomerID,Store Number,City,Responder\n' + ''.join(
+        f"{i},{n},Golden,Yes\n" for n, i in enumerate(ids)))
+    _, output = run_workflow(example('Example-Simple'))
+    lines = output.splitlines()
+    assert lines[0] == 'CustomerID,Store Number,City,Responder'
+    assert [int(line.split(',')[0]) for line in lines[1:]] == ids
@@ -0,0 +1,131 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+import os
+import shutil
+
+import pytest
+
+from pyx import workflow as workflow_module
+from pyx.workflow import Workflow
+from pyx.workflow_cache import WorkflowCache
+
+
+@pytest.fixture
+def source(example_path, tmp_path):
+    path = tmp_path / 'workflow.yxmd'
+    shutil.copyfile(example_path('Example-Simple'), path)
+    return str(path)
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Records the files parsed by Workflow.read.
+    """
+    parsed = list()
+    reader = workflow_module.WorkflowReader
+
+    def read(filename, *args, **kwargs):
+        parsed.append(filename)
+        return reader(filename, *args, **kwargs)
+
+    monkeypatch.setattr(workflow_module, 'WorkflowReader', read)
+    return parsed
+
+
+def _written(workflow):
+    text = io.StringIO()
+    workflow.write_xml(text)
+    return text.getvalue()
+
+
+def test_unchanged_files_are_read_from_the_cache(source, tmp_path, reads):
+    cache_dir = str(tmp_path / 'cache')
+    first = Workflow.read(source, cache_dir)
+    second = Workflow.read(source, cache_dir)
+    assert reads == [source]
+    assert _written(second) == _written(first)
+    assert second.name == first.name
+    assert second.connections == first.connections
+    assert second.tools[4].properties == first.tools[4].properties
+
+
+def test_changed_mtime_or_size_is_a_miss(source, tmp_path, reads):
+    cache_dir = str(tmp_path / 'cache')
+    Workflow.read(source, cache_dir)
+
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    Workflow.read(source, cache_dir)
+    assert len(reads) == 2
+
+    with open(source, 'a') as f:
+        f.write('\n')
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    Workflow.read(source, cache_dir)
+    assert len(reads) == 3
+
+    Workflow.read(source, cache_dir)
+    assert len(reads) == 3
+
+
+def test_stale_and_corrupt_entries_are_ignored(source, tmp_path):
+    cache = WorkflowCache(str(tmp_path / 'cache'))
+    key = cache.key(source)
+    cache.put(key, 'state')
+    assert cache.get(key) == 'state'
+    assert cache.get(key[:3] + ('0.0.0',)) is None
+
+    with open(cache._entry(key), 'wb') as f:
+        f.write(b'not a pickle')
+    assert cache.get(key) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = WorkflowCache(str(tmp_path / 'cache'), max_size=2500)
+    keys = [(str(tmp_path / name), 1, 1, 'v') for name in 'abc']
+    cache.put(keys[0], b'x' * 1000)
+    cache.put(keys[1], b'x' * 1000)
+    os.utime(cache._entry(keys[0]), (1, 1))
+    os.utime(cache._entry(keys[1]), (2, 2))
+    assert cache.get(keys[0]) is not None
+
+    cache.put(keys[2], b'x' * 1000)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+    cache.clear()
+    assert os.listdir(cache.directory) == []
+
+
+def test_directory_is_only_scanned_when_over_the_limit(tmp_path, monkeypatch):
+    cache = WorkflowCache(str(tmp_path / 'cache'), max_size=2500)
+    scans = list()
+    entries = cache._entries
+    monkeypatch.setattr(cache, '_entries', lambda: scans.append(1) or entries())
+
+    keys = [(str(tmp_path / name), 1, 1, 'v') for name in 'abc']
+    cache.put(keys[0], b'x' * 1000)
+    cache.put(keys[1], b'x' * 1000)
+    cache.put(keys[1], b'x' * 1000)
+    assert len(scans) == 1
+
+    cache.put(keys[2], b'x' * 1000)
+    assert len(scans) == 2
+    assert sum(os.path.getsize(os.path.join(cache.directory, name)) for name in os.listdir(cache.directory)) <= 2500
@@ -0,0 +1,78 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+from pyx.connection import Connection
+from pyx.tool import Tool, ToolPosition
+from pyx.workflow import Workflow
+
+
+def test_unchanged_workflows_have_equal_hashes_and_an_empty_diff(example):
+    workflow = example('Example-Simple')
+    again = example('Example-Simple')
+    assert workflow.content_hash() == again.content_hash()
+    assert workflow.content_hash(include_position=True) == again.content_hash(include_position=True)
+    assert workflow.diff(again).is_empty()
+
+
+def test_hashes_ignore_formatting_of_the_source(example, tmp_path):
+    workflow = example('Example-Simple')
+    path = str(tmp_path / 'rewritten.yxmd')
+    Workflow.write(workflow, path, preserve_source=False)
+    rewritten = Workflow.read(path)
+    assert rewritten.content_hash(include_position=True) == workflow.content_hash(include_position=True)
+    assert rewritten.diff(workflow).is_empty()
+    assert [t.content_hash() for t in rewritten.tools.values()] == [t.content_hash() for t in workflow.tools.values()]
+
+
+def test_diff_lists_added_removed_and_changed_tools_and_connections(example):
+    workflow = example('Example-Simple')
+    edited = example('Example-Simple')
+    with edited.batch():
+        edited.tools[5].properties['Configuration']['SortInfo']['Field']['@order'] = 'Descending'
+        edited.tools[6].position = ToolPosition(0, 0)
+        edited.remove_tool(4)
+        edited.add_tool(Tool(7))
+        edited.add_connection(2, 'Output', 7, 'Input')
+
+    diff = workflow.diff(edited)
+    assert diff.added_tools == [7]
+    assert diff.removed_tools == [4]
+    assert diff.changed_tools == [5]
+    assert diff.added_connections == [Connection(2, 'Output', 7, 'Input')]
+    assert diff.removed_connections == [Connection(2, 'Output', 4, 'Input'), Connection(4, 'True', 5, 'Input')]
+    assert workflow.diff(edited, include_position=True).changed_tools == [5, 6]
+    assert edited.diff(workflow).added_tools == [4]
+    assert workflow.content_hash() != edited.content_hash()
+
+
+def test_positions_only_count_when_asked(example):
+    workflow = example('Example-Simple')
+    moved = example('Example-Simple')
+    moved.tools[1].position = ToolPosition(1, 1)
+    assert workflow.content_hash() == moved.content_hash()
+    assert workflow.content_hash(include_position=True) != moved.content_hash(include_position=True)
+    assert workflow.diff(moved).is_empty()
+    assert workflow.diff(moved, include_position=True).changed_tools == [1]
+
+
+def test_duplicate_connections_are_counted(example):
+    workflow = example('Example-Simple')
+    doubled = example('Example-Simple')
+    doubled.connections.append(Connection(1, 'Output', 3, 'Input'))
+    assert workflow.diff(doubled).added_connections == [Connection(1, 'Output', 3, 'Input')]
+    assert doubled.diff(workflow).removed_connections == [Connection(1, 'Output', 3, 'Input')]
+    assert workflow.content_hash() != doubled.content_hash()
@@ -0,0 +1,120 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import random
+
+import pytest
+
+from pyx.connection import Connection
+from pyx.tool import Tool
+from pyx.workflow import Workflow
+from pyx.workflow_graph import WorkflowGraph
+
+
+def _reached(tool_id, edges):
+    """Returns the tools reached from tool_id by following one or more edges, by breadth first search.
+    """
+    reached = set()
+    frontier = [tool_id]
+    while frontier:
+        frontier = [d for o in frontier for d in edges.get(o, ()) if d not in reached]
+        reached.update(frontier)
+    return reached
+
+
+def _random_graph(seed, size=40):
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, 1000), size)
+    connections = [Connection(rng.choice(ids), 'Output', rng.choice(ids), 'Input') for _ in range(size + size // 2)]
+    return ids, connections
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_lineage_and_cycles_match_a_brute_force_search(seed):
+    ids, connections = _random_graph(seed)
+    successors = dict({})
+    predecessors = dict({})
+    for c in connections:
+        successors.setdefault(c.origin_tool_id, set()).add(c.destination_tool_id)
+        predecessors.setdefault(c.destination_tool_id, set()).add(c.origin_tool_id)
+
+    graph = WorkflowGraph(ids, connections)
+    downstream_all = graph.downstream_all()
+    upstream_all = graph.upstream_all()
+    for tool_id in ids:
+        assert graph.downstream(tool_id) == downstream_all[tool_id] == _reached(tool_id, successors)
+        assert graph.upstream(tool_id) == upstream_all[tool_id] == _reached(tool_id, predecessors)
+        assert downstream_all.count(tool_id) == len(downstream_all[tool_id])
+
+    cyclic = {t for t in ids if t in _reached(t, successors)}
+    cycles = graph.find_cycles()
+    assert {t for cycle in cycles for t in cycle} == cyclic
+    for cycle in cycles:
+        assert all(set(cycle) - {t} <= _reached(t, successors) for t in cycle)
+
+    assert graph.sources() == [t for t in ids if t not in predecessors]
+    assert graph.sinks() == [t for t in ids if t not in successors]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_topological_order_of_acyclic_graphs(seed):
+    ids, connections = _random_graph(seed)
+    rank = {tool_id: i for i, tool_id in enumerate(ids)}
+    connections = [c for c in connections if rank[c.origin_tool_id] < rank[c.destination_tool_id]]
+
+    order = WorkflowGraph(ids, connections).topological_order()
+    position = {tool_id: i for i, tool_id in enumerate(order)}
+    assert sorted(order) == sorted(ids)
+    assert all(position[c.origin_tool_id] < position[c.destination_tool_id] for c in connections)
+
+
+def test_cycles_are_reported(example):
+    workflow = example('Example-Simple')
+    assert workflow.topological_order() == [1, 3, 2, 4, 5, 6]
+    assert workflow.find_cycles() == list()
+
+    with workflow.batch():
+        workflow.add_connection(5, 'Output', 3, 'Input')
+        workflow.add_tool(Tool(7))
+        workflow.add_connection(7, 'Output', 7, 'Input')
+    assert workflow.find_cycles() == [[2, 3, 4, 5], [7]]
+    with pytest.raises(ValueError):
+        workflow.topological_order()
+
+
+def test_results_follow_edits(example):
+    workflow = example('Example-Simple')
+    assert workflow.upstream(6) == {1, 2, 3, 4, 5}
+    assert workflow.downstream(3) == {2, 4, 5, 6}
+    assert workflow.sources() == [1]
+    assert workflow.sinks() == [6]
+
+    with workflow.batch():
+        workflow.remove_connection(2, 'Output', 4, 'Input')
+    assert workflow.upstream(6) == {4, 5}
+    assert workflow.downstream(3) == {2}
+    assert workflow.sources() == [1, 4]
+    assert workflow.sinks() == [2, 6]
+
+
+def test_connections_to_missing_tools_are_ignored():
+    workflow = Workflow()
+    with workflow.batch():
+        workflow.add_tool(Tool(1))
+        workflow.add_connection(1, 'Output', 2, 'Input')
+    assert workflow.downstream(1) == frozenset()
+    assert workflow.topological_order() == [1]
@@ -0,0 +1,123 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+
+import pytest
+
+from pyx.workflow import Workflow
+from pyx.workflow_index import WorkflowIndex
+
+INPUT = 'AlteryxBasePluginsGui.DbFileInput.DbFileInput'
+FILTER = 'AlteryxBasePluginsGui.Filter.Filter'
+
+
+@pytest.fixture
+def corpus(example_path, tmp_path):
+    folder = tmp_path / 'corpus'
+    for name in ['Example-Blank', 'Example-SingleTool', 'Example-Simple', 'Example-Simple2']:
+        (folder / name).mkdir(parents=True)
+        shutil.copyfile(example_path(name), folder / name / 'workflow.yxmd')
+    return folder
+
+
+@pytest.fixture
+def index(tmp_path):
+    with WorkflowIndex(str(tmp_path / 'index.db')) as index:
+        yield index
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Records the files Workflow.read_many is asked to read.
+    """
+    paths = list()
+    read_many = Workflow.read_many
+
+    def record(files, *args, **kwargs):
+        files = list(files)
+        paths.extend(files)
+        return read_many(files, *args, **kwargs)
+
+    monkeypatch.setattr(Workflow, 'read_many', staticmethod(record))
+    return paths
+
+
+def _found(matches):
+    return [(os.path.basename(os.path.dirname(m.filename)), m.tool_id) for m in matches]
+
+
+def test_queries(corpus, index):
+    assert index.update([str(corpus)]) == dict({})
+    assert len(index.filenames()) == 4
+
+    assert _found(index.reading('customers.CSV')) == [('Example-Simple', 1), ('Example-Simple2', 1)]
+    assert _found(index.reading(r'C:\Program Files\Alteryx\Samples\en\SampleData\Customers.csv')) == \
+        [('Example-Simple', 1), ('Example-Simple2', 1)]
+    assert index.reading(r'D:\Elsewhere\Customers.csv') == list()
+    assert _found(index.reading('Drug_Thefts.yxdb')) == [('Example-SingleTool', 1)]
+    assert _found(index.writing('output.csv')) == [('Example-Simple', 6), ('Example-Simple2', 6)]
+
+    assert _found(index.using_plugin(INPUT)) == \
+        [('Example-Simple', 1), ('Example-Simple2', 1), ('Example-SingleTool', 1)]
+    assert _found(index.using_plugin(FILTER, '[city] != "denver"')) == [('Example-Simple', 4)]
+    assert index.using_plugin(FILTER, 'no such text') == list()
+
+    assert ('Example-Simple', 3) in _found(index.with_field('ZIP'))
+    assert index.with_field('no such field') == list()
+
+
+def test_update_only_rereads_changed_files(corpus, index, reads):
+    index.update([str(corpus)])
+    assert len(reads) == 4
+
+    simple = corpus / 'Example-Simple' / 'workflow.yxmd'
+    stat = os.stat(simple)
+    os.utime(simple, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    index.update([str(corpus)])
+    assert len(reads) == 4
+
+    workflow = Workflow.read(str(simple))
+    workflow.tools[4].expression = '[City] = "Golden"'
+    Workflow.write(workflow, str(simple))
+    index.update([str(corpus)])
+    assert reads[4:] == [str(simple)]
+    assert _found(index.using_plugin(FILTER, 'golden')) == [('Example-Simple', 4)]
+    assert index.using_plugin(FILTER, 'denver') == list()
+
+
+def test_update_removes_deleted_and_broken_files(corpus, index, tmp_path):
+    index.update([str(corpus)])
+    shutil.rmtree(corpus / 'Example-Simple2')
+    (corpus / 'Example-Blank' / 'workflow.yxmd').write_text('<AlteryxDocument><Nodes>')
+
+    errors = index.update([str(corpus)])
+    assert list(errors) == [str(corpus / 'Example-Blank' / 'workflow.yxmd')]
+    assert [os.path.basename(os.path.dirname(f)) for f in index.filenames()] == ['Example-Simple',
+                                                                                 'Example-SingleTool']
+    assert _found(index.writing('output.csv')) == [('Example-Simple', 6)]
+
+    index.remove(str(corpus / 'Example-Simple' / 'workflow.yxmd'))
+    assert index.writing('output.csv') == list()
+
+
+def test_the_index_persists(corpus, index):
+    index.update([str(corpus)])
+    with WorkflowIndex(index.database) as reopened:
+        assert reopened.filenames() == index.filenames()
+        assert len(reopened.reading('Customers.csv')) == 2
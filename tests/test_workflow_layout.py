@@ -0,0 +1,89 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import random
+from itertools import combinations
+
+import pytest
+
+from pyx.connection import Connection
+from pyx.tool import Tool, ToolPosition
+from pyx.workflow import Workflow
+from pyx.workflow_layout import LayeredLayout
+
+
+def _overlapping(positions, width=100, height=100):
+    return [(a, b) for a, b in combinations(positions, 2) if abs(a.x - b.x) < width and abs(a.y - b.y) < height]
+
+
+def _random_workflow(seed, size=150, acyclic=True):
+    rng = random.Random(seed)
+    workflow = Workflow()
+    with workflow.batch():
+        for tool_id in range(1, size + 1):
+            workflow.add_tool(Tool(tool_id))
+        for _ in range(size * 3 // 2):
+            origin, destination = rng.sample(range(1, size + 1), 2)
+            if acyclic and origin > destination:
+                origin, destination = destination, origin
+            workflow.add_connection(origin, 'Output', destination, 'Input')
+    return workflow
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('acyclic', [True, False])
+def test_layout_has_no_overlaps(seed, acyclic):
+    workflow = _random_workflow(seed, acyclic=acyclic)
+    with workflow.batch():
+        workflow.auto_layout(origin=ToolPosition(50, 60))
+    positions = [t.position for t in workflow.tools.values()]
+    assert not _overlapping(positions)
+    assert min(p.x for p in positions) == 50
+    assert min(p.y for p in positions) == 60
+    if acyclic:
+        assert all(workflow.tools[c.origin_tool_id].position.x < workflow.tools[c.destination_tool_id].position.x
+                   for c in workflow.connections)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_placed_tools_fit_around_the_others(seed):
+    workflow = _random_workflow(seed)
+    with workflow.batch():
+        workflow.auto_layout()
+        moved = random.Random(seed).sample(sorted(workflow.tools), 30)
+        for tool_id in moved:
+            workflow.tools[tool_id].position = ToolPosition()
+    kept = {tool_id: tool.position for tool_id, tool in workflow.tools.items() if tool_id not in moved}
+
+    with workflow.batch():
+        workflow.auto_layout(moved)
+    assert {tool_id: workflow.tools[tool_id].position for tool_id in kept} == kept
+    assert not _overlapping([t.position for t in workflow.tools.values()])
+
+
+def test_spacing_is_respected():
+    positions = LayeredLayout(150, 80).layout([1, 2, 3], [Connection(1, 'Output', 2, 'Input'),
+                                                          Connection(1, 'Output', 3, 'Input')])
+    assert positions[1].x == 0
+    assert positions[2].x == positions[3].x == 150
+    assert abs(positions[2].y - positions[3].y) == 80
+
+
+def test_auto_layout_lays_out_a_chain_in_a_row(example):
+    laid_out = example('Example-Simple').auto_layout()
+    assert [laid_out.tools[i].position for i in laid_out.topological_order()] == \
+        [ToolPosition(x, 0) for x in range(0, 600, 100)]
@@ -0,0 +1,87 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import pytest
+import xmltodict
+
+from pyx.connection import Connection
+from pyx.tool_factory import ToolFactory
+from pyx.workflow import Workflow
+from pyx.workflow_reader import WorkflowReader
+
+NAMES = ['Example-Blank', 'Example-SingleTool', 'Example-Simple', 'Example-Simple2']
+
+
+def _parse(filename):
+    """Reads a workflow the way Workflow.read did before streaming, by parsing the whole document at once.
+    """
+    with open(filename) as f:
+        document = xmltodict.parse(f.read(), force_list=('Node', 'Connection'))['AlteryxDocument']
+    tools = list()
+    for node in (document['Nodes'] or dict({})).get('Node', list()):
+        gui_settings = node['GuiSettings']
+        engine_settings = node['EngineSettings']
+        tools.append((type(ToolFactory.create_tool(gui_settings['@Plugin'], 0)), int(node['@ToolID']),
+                      gui_settings['@Plugin'], int(gui_settings['Position']['@x']),
+                      int(gui_settings['Position']['@y']), node.get('Properties'), engine_settings['@EngineDll'],
+                      engine_settings['@EngineDllEntryPoint']))
+    connections = [(int(c['Origin']['@ToolID']), c['Origin']['@Connection'], int(c['Destination']['@ToolID']),
+                    c['Destination']['@Connection'])
+                   for c in (document['Connections'] or dict({})).get('Connection', list())]
+    return document['@yxmdVer'], document['Properties'], tools, connections
+
+
+def _model(items):
+    tools = list()
+    connections = list()
+    for item in items:
+        if isinstance(item, Connection):
+            connections.append((item.origin_tool_id, item.origin_output, item.destination_tool_id,
+                                item.destination_input))
+        else:
+            tools.append((type(item), item.tool_id, item.plugin, item.position.x, item.position.y,
+                          item.properties, item.engine_dll, item.engine_dll_entry_point))
+    return tools, connections
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_read_matches_a_full_parse(example_path, name):
+    yxmd_version, properties, tools, connections = _parse(example_path(name))
+    workflow = Workflow.read(example_path(name))
+    assert workflow.yxmd_version == yxmd_version
+    assert workflow.properties == properties
+    assert _model(workflow.tools.values()) == (tools, list())
+    assert _model(workflow.connections) == (list(), connections)
+
+
+@pytest.mark.parametrize('name', NAMES)
+@pytest.mark.parametrize('chunk_size', [1, 7, 512])
+def test_small_chunks_give_the_same_items(example_path, name, chunk_size):
+    reader = WorkflowReader(example_path(name), chunk_size)
+    assert _model(reader) == _model(Workflow.iterread(example_path(name)))
+    assert reader.yxmd_version == _parse(example_path(name))[0]
+    assert reader.source.prolog.startswith(b'<?xml')
+
+
+def test_iterread_yields_tools_before_their_connections(example_path):
+    seen = set()
+    for item in Workflow.iterread(example_path('Example-Simple')):
+        if isinstance(item, Connection):
+            assert {item.origin_tool_id, item.destination_tool_id} <= seen
+        else:
+            seen.add(item.tool_id)
+    assert seen == {1, 2, 3, 4, 5, 6}
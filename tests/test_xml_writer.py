@@ -0,0 +1,99 @@
+# Pyx, a Python module for creating, reading, and editing Alteryx Designer workflows entirely in code
+# Copyright (C) 2020  David T. Wilcox
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import io
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from xml.dom import minidom
+
+import pytest
+import xmltodict
+
+from pyx.tool import Tool, ToolPosition
+from pyx.workflow import Workflow
+from pyx.xml_writer import to_elements
+
+NAMES = ['Example-Blank', 'Example-SingleTool', 'Example-Simple', 'Example-Simple2']
+
+
+def _unparse(tag, value):
+    return list(ET.fromstring(xmltodict.unparse({'Root': {tag: value}})))
+
+
+def _baseline(workflow):
+    """Writes a workflow the way pyx did before XmlWriter, through xmltodict.unparse and minidom.
+
+    The old writer replaced every &quot; with a raw quote, which gave malformed XML for attribute values
+    containing quotes. XmlWriter escapes quotes in attributes only, so output is compared after the same
+    replacement. XmlWriter also closes empty elements with ' />' where minidom writes '/>'.
+    """
+    document = ET.Element('AlteryxDocument', {'yxmdVer': workflow.yxmd_version})
+    nodes = ET.SubElement(document, 'Nodes')
+    for tool in workflow.tools.values():
+        node = ET.SubElement(nodes, 'Node', {'ToolID': str(tool.tool_id)})
+        gui_settings = ET.SubElement(node, 'GuiSettings', {'Plugin': tool.plugin})
+        ET.SubElement(gui_settings, 'Position', {'x': str(tool.position.x), 'y': str(tool.position.y)})
+        node.extend(_unparse('Properties', tool.properties))
+        ET.SubElement(node, 'EngineSettings', {'EngineDll': tool.engine_dll,
+                                               'EngineDllEntryPoint': tool.engine_dll_entry_point})
+    connections = ET.SubElement(document, 'Connections')
+    for connection in workflow.connections:
+        element = ET.SubElement(connections, 'Connection')
+        ET.SubElement(element, 'Origin', {'ToolID': str(connection.origin_tool_id),
+                                          'Connection': connection.origin_output})
+        ET.SubElement(element, 'Destination', {'ToolID': str(connection.destination_tool_id),
+                                               'Connection': connection.destination_input})
+    document.extend(_unparse('Properties', workflow.properties))
+    text = minidom.parseString(ET.tostring(document, 'utf-8')).toprettyxml(indent='  ')
+    return text.replace('&quot;', '"').replace('/>', ' />')
+
+
+def _written(workflow):
+    text = io.StringIO()
+    workflow.write_xml(text, preserve_source=False)
+    return text.getvalue().replace('&quot;', '"')
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_output_matches_the_baseline_writer(example, name):
+    workflow = example(name)
+    assert _written(workflow) == _baseline(workflow)
+
+    for tool in workflow.tools.values():
+        tool.properties
+    assert _written(workflow) == _baseline(workflow)
+
+
+def test_tools_created_in_code_match_the_baseline_writer():
+    workflow = Workflow()
+    workflow.yxmd_version = '2020.1'
+    tool = Tool(1)
+    tool.plugin = 'Example.Plugin'
+    tool.position = ToolPosition(10, 20)
+    tool.properties = OrderedDict([('Configuration', OrderedDict([
+        ('Value', [OrderedDict([('@name', 'a & b'), ('#text', '1 < 2')]), None, 3, True]),
+        ('Empty', OrderedDict()),
+        ('Mixed', OrderedDict([('Child', 'x'), ('#text', 'tail')]))]))])
+    workflow = workflow.add_tool(tool)
+    assert _written(workflow) == _baseline(workflow)
+
+
+@pytest.mark.parametrize('value', [
+    None, 'text', 3, False, [1, 2], OrderedDict([('@a', '1'), ('B', OrderedDict([('C', None)]))]),
+    OrderedDict([('A', 'x'), ('#text', 'y')]), OrderedDict([('A', list())])])
+def test_to_elements_matches_unparse(value):
+    assert [ET.tostring(e) for e in to_elements('Value', value)] == [ET.tostring(e) for e in _unparse('Value', value)]